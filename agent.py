@@ -0,0 +1,183 @@
+# streams this machine's samples to fleet views: python agent.py --listen 0.0.0.0:7010
+# (or python app.py --agent ...). every subscriber gets the same batches, see agent_protocol.py.
+# like the headless collector it never imports customtkinter or matplotlib
+import argparse
+import asyncio
+import math
+import os
+import random
+import signal
+import socket
+import sys
+import threading
+import time
+
+from agent_protocol import batch_message, hello_message
+from exporter import parse_address
+
+BATCH_SIZE = 10  # samples per batch at most
+FLUSH_INTERVAL = 1.0  # seconds a sample waits for its batch at most
+MAX_BUFFERED = 256 * 1024  # bytes queued for one subscriber before it is dropped as too slow
+
+
+class AgentServer:
+    # publish() is called from any thread, batches are encoded once on the event loop and
+    # written to every subscriber without waiting on any of them
+    def __init__(self, address, info, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.address = address
+        self.kind, self.bind_address = parse_address(address)
+        self.info = info
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self.pending = []
+        self.subscribers = set()
+        self.loop = None
+        self.server = None
+        self._batch_ready = None
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        self._batch_ready = asyncio.Event()
+        if self.kind == "unix":
+            if os.path.exists(self.bind_address):
+                os.unlink(self.bind_address)
+            self.server = await asyncio.start_unix_server(self.subscribe, self.bind_address)
+        else:
+            host, port = self.bind_address
+            self.server = await asyncio.start_server(self.subscribe, host, port)
+
+    async def close(self):
+        self.server.close()
+        for writer in list(self.subscribers):
+            writer.close()
+        await self.server.wait_closed()
+        if self.kind == "unix" and os.path.exists(self.bind_address):
+            os.unlink(self.bind_address)
+
+    def publish(self, timestamp, record):
+        self.loop.call_soon_threadsafe(self.add, timestamp, record)
+
+    def add(self, timestamp, record):
+        self.pending.append((timestamp, record))
+        if len(self.pending) >= self.batch_size:
+            self._batch_ready.set()
+
+    async def subscribe(self, reader, writer):
+        writer.write(hello_message(self.info))
+        self.subscribers.add(writer)
+        try:
+            # subscribers never send anything, this only notices them leaving
+            while await reader.read(1024):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            self.subscribers.discard(writer)
+            writer.close()
+
+    async def flush_forever(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        batch = batch_message(self.pending)
+        self.pending = []
+        for writer in list(self.subscribers):
+            if writer.transport.get_write_buffer_size() > MAX_BUFFERED:
+                self.subscribers.discard(writer)
+                writer.close()
+                continue
+            writer.write(batch)
+
+
+def synthetic_samples(server, interval, stop_event):
+    # generated load, for trying the fleet view with many local agents on one machine
+    phase = random.random() * 2 * math.pi
+    while not stop_event.wait(interval):
+        now = time.time()
+        server.publish(now, {
+            "cpu": 50 + 40 * math.sin(now / 20 + phase) + random.uniform(-5, 5),
+            "memory": 40 + 10 * math.sin(now / 300 + phase),
+            "upload": random.uniform(0, 5),
+            "download": random.uniform(0, 50),
+            "gpu": None,
+        })
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Stream this machine's samples to dashboard fleet views.")
+    parser.add_argument("--agent", action="store_true", help=argparse.SUPPRESS)  # passed through from app.py
+    parser.add_argument("--listen", required=True, metavar="HOST:PORT|unix:PATH", help="address to accept fleet views on")
+    parser.add_argument("--name", default=socket.gethostname(), help="name shown on the fleet view (default: hostname)")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between samples")
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE, help="samples per batch at most")
+    parser.add_argument("--flush", type=float, default=FLUSH_INTERVAL, help="seconds a sample waits for its batch at most")
+    parser.add_argument(
+        "--interface",
+        action="append",
+        default=[],
+        help="interface to sum into upload/download, repeat for several (default: every non-loopback one)",
+    )
+    parser.add_argument("--synthetic", action="store_true", help="send generated samples instead of this machine's")
+    return parser.parse_args(argv)
+
+
+async def serve(args):
+    server = AgentServer(args.listen, {"host": args.name, "interval": args.interval}, args.batch, args.flush)
+    await server.start()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+
+    stop_event = threading.Event()
+    sampler = None
+    if args.synthetic:
+        threading.Thread(target=synthetic_samples, args=(server, args.interval, stop_event), daemon=True).start()
+    else:
+        from collector import NetworkThroughput, snapshot_record
+        from sampler import Sampler
+
+        # sampled like the headless collector, the records are published from the sampler thread
+        throughput = NetworkThroughput(args.interface)
+        sampler = Sampler(interval=args.interval)
+        sampler.subscribe(lambda snapshot: server.publish(snapshot.timestamp, snapshot_record(snapshot, throughput)))
+        sampler.start()
+
+    flusher = asyncio.create_task(server.flush_forever())
+    await stop.wait()
+
+    stop_event.set()
+    if sampler is not None:
+        sampler.stop()
+    flusher.cancel()
+    server.flush()
+    await server.close()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        parse_address(args.listen)
+    except ValueError as e:
+        print(f"agent: {e}", file=sys.stderr)
+        return 2
+    try:
+        asyncio.run(serve(args))
+    except OSError as e:
+        print(f"agent: can't listen on {args.listen}: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+# wire format between agent.py and the fleet view. every message is
+#   <I length> <B type> payload            (little endian, length counts the type byte)
+# HELLO  utf-8 json describing the agent, e.g. {"host": "node-07", "interval": 1.0}
+# BATCH  <H count>, then per sample: <B mask of the fields present>, the timestamp in ms and
+#        one value per present field, each a zigzag varint of the change since the previous
+#        sample of the batch. the first sample is relative to zero, so every batch decodes on
+#        its own and one encoded batch can be sent to every subscriber as it is
+import json
+import struct
+
+FIELDS = ("cpu", "memory", "upload", "download", "gpu")
+SCALES = (100, 100, 1000, 1000, 100)  # % to 0.01, Mbps to kbps
+
+HELLO = 1
+BATCH = 2
+
+HEADER = struct.Struct("<IB")
+COUNT = struct.Struct("<H")
+MAX_MESSAGE = 1 << 20  # anything longer is a corrupt stream, not a batch
+MAX_BATCH = 0xFFFF
+
+
+class ProtocolError(ValueError):
+    pass
+
+
+def message(type, payload):
+    return HEADER.pack(len(payload) + 1, type) + payload
+
+
+def hello_message(info):
+    return message(HELLO, json.dumps(info).encode())
+
+
+def write_varint(out, value):
+    # zigzag, so small negative changes stay small too
+    value = (value << 1) ^ (value >> 63)
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, offset):
+    result = shift = 0
+    while True:
+        try:
+            byte = data[offset]
+        except IndexError:
+            raise ProtocolError("batch ends inside a value") from None
+        offset += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return (result >> 1) ^ -(result & 1), offset
+        shift += 7
+        if shift > 70:
+            raise ProtocolError("varint too long")
+
+
+def batch_message(samples):
+    # samples are (timestamp, record) pairs, record keyed like FIELDS with None for missing values
+    if len(samples) > MAX_BATCH:
+        raise ValueError(f"at most {MAX_BATCH} samples per batch")
+
+    out = bytearray(COUNT.pack(len(samples)))
+    previous_time = 0
+    previous = [0] * len(FIELDS)
+    for timestamp, record in samples:
+        mask = 0
+        changes = []
+        for index, field in enumerate(FIELDS):
+            value = record.get(field)
+            if value is None or value != value:  # missing or nan
+                continue
+            mask |= 1 << index
+            quantized = round(value * SCALES[index])
+            changes.append(quantized - previous[index])
+            previous[index] = quantized
+
+        milliseconds = round(timestamp * 1000)
+        out.append(mask)
+        write_varint(out, milliseconds - previous_time)
+        previous_time = milliseconds
+        for change in changes:
+            write_varint(out, change)
+    return message(BATCH, bytes(out))
+
+
+def decode_batch(payload):
+    # the (timestamp, record) pairs of a BATCH payload, only the present fields are in each record
+    if len(payload) < COUNT.size:
+        raise ProtocolError("batch without a sample count")
+    (count,) = COUNT.unpack_from(payload)
+    offset = COUNT.size
+
+    samples = []
+    milliseconds = 0
+    previous = [0] * len(FIELDS)
+    for _ in range(count):
+        if offset >= len(payload):
+            raise ProtocolError("batch ends before its last sample")
+        mask = payload[offset]
+        offset += 1
+        change, offset = read_varint(payload, offset)
+        milliseconds += change
+
+        record = {}
+        for index, field in enumerate(FIELDS):
+            if mask & (1 << index):
+                change, offset = read_varint(payload, offset)
+                previous[index] += change
+                record[field] = previous[index] / SCALES[index]
+        samples.append((milliseconds / 1000, record))
+    return samples
+
+
+async def read_message(reader):
+    # (type, payload) of the next message, IncompleteReadError once the agent hangs up
+    length, type = HEADER.unpack(await reader.readexactly(HEADER.size))
+    if not 1 <= length <= MAX_MESSAGE:
+        raise ProtocolError(f"message of {length} bytes")
+    return type, await reader.readexactly(length - 1)
@@ -0,0 +1,283 @@
+import math
+import re
+from collections import namedtuple
+
+import numpy as np
+
+# one alert condition on a series of the shared store, e.g.
+#   AlertRule("cpu busy", "cpu", "mean", 30, ">", 90, clear=80, sustain=3)
+# stat is "last", "mean", "rate" (change per second) or a percentile like "p95", computed over
+# the last `window` seconds. the rule fires once the condition has held for `sustain` samples
+# and can only fire again after the stat has come back past `clear` (defaults to the threshold)
+AlertRule = namedtuple(
+    "AlertRule",
+    ["name", "metric", "stat", "window", "op", "threshold", "clear", "sustain"],
+    defaults=("last", 0, ">", 100.0, None, 1),
+)
+
+# row is the core/device index for matrix series like cpu_cores, None for plain series
+Alert = namedtuple("Alert", ["rule", "row", "value", "timestamp"])
+
+OPERATORS = {">": 1.0, "<": -1.0}
+PERCENTILE = re.compile(r"p(\d+(?:\.\d+)?)$")
+
+# percentiles come from a histogram of the window, in half-point bins for % series and in
+# roughly 5% steps across nine decades for everything else (Mbps, MB/s, iops)
+PERCENT_METRICS = ("cpu", "cpu_cores", "memory", "gpu", "disk.utilization")
+PERCENT_EDGES = np.linspace(0, 100, 201)
+RATE_EDGES = np.geomspace(1e-3, 1e6, 400)
+
+
+# the series the dashboard puts in the store, plus one gpu.N per gpu. a rule on anything else
+# would never fire, so it is rejected when the rules are loaded
+RULE_METRICS = (
+    "cpu", "cpu_cores", "memory", "gpu", "network.upload", "network.download",
+    "disk.read", "disk.write", "disk.utilization",
+)
+GPU_DEVICE = re.compile(r"gpu\.\d+$")
+
+
+def is_percent_metric(metric):
+    return metric in PERCENT_METRICS or metric.startswith("gpu.")
+
+
+class WindowStats:
+    # running sum, count and histogram over the last `seconds` of one series, for every row of it
+    # (one for a plain series, one per core for a matrix). samples are added when appended and
+    # subtracted when they fall out of the window, so a tick only touches the samples that moved.
+    # the histogram is only kept when a percentile rule needs it, edges=None skips it
+    def __init__(self, buffer, seconds, edges=None):
+        self.buffer = buffer
+        self.seconds = seconds
+        self.rows = getattr(buffer, "rows", 1)
+
+        self.sum = np.zeros(self.rows)
+        self.count = 0
+
+        self.edges = edges
+        if edges is not None:
+            self.bin_values = np.append(edges, edges[-1])  # upper edge of every bin, the overflow bin included
+            self.bins = len(self.bin_values)
+            self.offsets = (np.arange(self.rows) * self.bins)[:, None]
+            self.histogram = np.zeros((self.rows, self.bins), dtype=np.int64)
+            self.flat_histogram = self.histogram.reshape(-1)
+
+        # absolute buffer indices, samples in [start, end) are the ones counted
+        self.start = self.end = buffer.appended - len(buffer)
+        self.new = 0  # samples taken in by the last update
+
+    def add(self, values, sign):
+        values = values.reshape(self.rows, -1)
+        self.sum += sign * values.sum(axis=1)
+        self.count += sign * values.shape[1]
+        if self.edges is None:
+            return
+
+        bins = np.searchsorted(self.edges, values) + self.offsets
+        if values.shape[1] == 1:
+            # the usual tick, one sample per row can't hit the same bin twice
+            self.flat_histogram[bins.ravel()] += sign
+        else:
+            counts = np.bincount(bins.ravel(), minlength=self.rows * self.bins)
+            self.histogram += sign * counts.reshape(self.rows, self.bins)
+
+    def update(self):
+        buffer = self.buffer
+
+        # samples the ring overwrote before they left the window can't be subtracted any more
+        if buffer.appended - self.start > len(buffer):
+            self.sum[:] = 0
+            self.count = 0
+            if self.edges is not None:
+                self.histogram[:] = 0
+            self.start = self.end = buffer.appended - len(buffer)
+
+        timestamps, values = buffer.since(self.end)
+        self.new = len(timestamps)
+        if not self.new:
+            return
+        self.add(values, 1)
+        self.end = buffer.appended
+
+        window_timestamps, window_values = buffer.since(self.start)
+        expired = np.searchsorted(window_timestamps, timestamps[-1] - self.seconds, side="left")
+        if expired:
+            self.add(window_values.reshape(self.rows, -1)[:, :expired], -1)
+            self.start += expired
+        if self.count == 0:
+            self.sum[:] = 0
+
+    def latest(self):
+        _, values = self.buffer.last(1)
+        return values.reshape(self.rows, -1)[:, -1]
+
+    def mean(self):
+        return self.sum / max(self.count, 1)
+
+    def percentile(self, q):
+        target = max(math.ceil(q / 100 * self.count), 1)
+        below = (self.histogram.cumsum(axis=1) < target).sum(axis=1)
+        return self.bin_values[below]
+
+    def rate(self):
+        timestamps, values = self.buffer.since(self.start)
+        if len(timestamps) < 2 or timestamps[-1] == timestamps[0]:
+            return np.zeros(self.rows)
+        values = values.reshape(self.rows, -1)
+        return (values[:, -1] - values[:, 0]) / (timestamps[-1] - timestamps[0])
+
+    def value(self, stat):
+        if stat == "last":
+            return self.latest()
+        if stat == "mean":
+            return self.mean()
+        if stat == "rate":
+            return self.rate()
+        return self.percentile(float(PERCENTILE.match(stat).group(1)))
+
+
+class RuleGroup:
+    # every rule on the same metric, stat and window, evaluated together as (rules x rows) arrays
+    def __init__(self, rules):
+        self.rules = rules
+        signs = np.array([OPERATORS[rule.op] for rule in rules])
+        self.signs = signs[:, None]
+        self.thresholds = (signs * [rule.threshold for rule in rules])[:, None]
+        self.clears = (signs * [rule.threshold if rule.clear is None else rule.clear for rule in rules])[:, None]
+        self.sustains = np.array([rule.sustain for rule in rules])[:, None]
+
+        self.rows = None
+        self.streaks = None
+        self.active = None
+
+    def carry_over(self, previous):
+        # the streaks and active rows of rules that are still here unchanged, so saving the
+        # thresholds or reloading the config doesn't clear a firing alert and fire it again
+        if previous.rows is None:
+            return
+        self.rows = previous.rows
+        self.streaks = np.zeros((len(self.rules), self.rows), dtype=np.int64)
+        self.active = np.zeros((len(self.rules), self.rows), dtype=bool)
+
+        indices = {}
+        for index, rule in enumerate(previous.rules):
+            indices.setdefault(rule, []).append(index)
+        for index, rule in enumerate(self.rules):
+            if indices.get(rule):
+                old = indices[rule].pop(0)
+                self.streaks[index] = previous.streaks[old]
+                self.active[index] = previous.active[old]
+
+    def evaluate(self, values, new):
+        # (rule, row) pairs that became active
+        if self.rows != len(values):
+            self.rows = len(values)
+            self.streaks = np.zeros((len(self.rules), self.rows), dtype=np.int64)
+            self.active = np.zeros((len(self.rules), self.rows), dtype=bool)
+
+        values = self.signs * values
+        above = values > self.thresholds
+        self.streaks = np.where(above, self.streaks + new, 0)
+        fired = ~self.active & (self.streaks >= self.sustains)
+        self.active = (self.active & (values > self.clears)) | fired
+        return np.nonzero(fired)
+
+
+def validate_rule(rule):
+    if rule.metric not in RULE_METRICS and not GPU_DEVICE.match(rule.metric):
+        raise ValueError(f"rule {rule.name!r}: unknown metric {rule.metric!r}, expected one of {', '.join(RULE_METRICS)} or gpu.N")
+    if rule.op not in OPERATORS:
+        raise ValueError(f"rule {rule.name!r}: op must be one of {', '.join(OPERATORS)}")
+    if rule.stat not in ("last", "mean", "rate") and not PERCENTILE.match(rule.stat):
+        raise ValueError(f"rule {rule.name!r}: stat must be last, mean, rate or a percentile like p95")
+    if rule.stat != "last" and rule.window <= 0:
+        raise ValueError(f"rule {rule.name!r}: {rule.stat} needs a window in seconds")
+    if rule.sustain < 1:
+        raise ValueError(f"rule {rule.name!r}: sustain must be at least 1 sample")
+
+
+class RuleEngine:
+    # evaluates alert rules over the shared TimeSeriesStore once per ui tick. rules sharing a
+    # metric and window share one WindowStats, rules sharing a stat too are compared in one
+    # numpy pass, so the per-tick cost grows with distinct windows rather than with rules
+    def __init__(self, store, rules=(), notify=None):
+        self.store = store
+        self.notify = notify
+
+        self.rules = []
+        self.groups = {}  # (metric, stat, window) -> RuleGroup
+        self.windows = {}  # (metric, window) -> WindowStats
+        self.set_rules(rules)
+
+    def set_rules(self, rules):
+        for rule in rules:
+            validate_rule(rule)
+        self.rules = list(rules)
+
+        grouped = {}
+        for rule in self.rules:
+            window = rule.window if rule.stat != "last" else 0
+            grouped.setdefault((rule.metric, rule.stat, window), []).append(rule)
+        groups = {}
+        for key, rules in grouped.items():
+            groups[key] = RuleGroup(rules)
+            if key in self.groups:
+                groups[key].carry_over(self.groups[key])
+        self.groups = groups
+
+        # windows nobody uses any more are dropped, the others keep their running stats
+        self.window_keys = sorted({(metric, window) for metric, _, window in self.groups})
+        self.percentile_windows = {(metric, window) for metric, stat, window in self.groups if PERCENTILE.match(stat)}
+        self.windows = {
+            key: stats for key, stats in self.windows.items()
+            if key in self.window_keys and (stats.edges is not None) == (key in self.percentile_windows)
+        }
+
+    def window_stats(self, metric, window):
+        if metric not in self.store:
+            return None
+        buffer = self.store.series(metric)
+
+        # matrices are replaced when e.g. the number of cores changes
+        stats = self.windows.get((metric, window))
+        if stats is None or stats.buffer is not buffer:
+            edges = None
+            if (metric, window) in self.percentile_windows:
+                edges = PERCENT_EDGES if is_percent_metric(metric) else RATE_EDGES
+            stats = self.windows[(metric, window)] = WindowStats(buffer, window, edges)
+        return stats
+
+    def evaluate(self):
+        # alerts that fired this tick, each also handed to notify
+        for metric, window in self.window_keys:
+            stats = self.window_stats(metric, window)
+            if stats is not None and stats.end != stats.buffer.appended:
+                stats.update()
+
+        alerts = []
+        for (metric, stat, window), group in self.groups.items():
+            stats = self.windows.get((metric, window))
+            if stats is None or not stats.new or not stats.count:
+                continue
+
+            values = stats.value(stat)
+            fired_rules, fired_rows = group.evaluate(values, stats.new)
+            if not len(fired_rules):
+                continue
+
+            timestamp = float(stats.buffer.last(1)[0][-1])
+            for rule_index, row in zip(fired_rules, fired_rows):
+                alert = Alert(
+                    group.rules[rule_index],
+                    int(row) if stats.rows > 1 else None,
+                    float(values[row]),
+                    timestamp,
+                )
+                alerts.append(alert)
+                if self.notify is not None:
+                    self.notify(alert)
+
+        # stats.new only counts for the tick it was taken in
+        for stats in self.windows.values():
+            stats.new = 0
+        return alerts
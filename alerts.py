@@ -0,0 +1,51 @@
+from alert_rules import AlertRule, RuleEngine
+
+# on top of the panel thresholds: sustained load, slow memory creep and saturated single cores
+DEFAULT_RULES = (
+    AlertRule("cpu sustained", "cpu", "mean", 60, ">", 90, 80),
+    AlertRule("memory p95", "memory", "p95", 300, ">", 95, 90),
+    AlertRule("core saturated", "cpu_cores", "mean", 30, ">", 98, 90),
+)
+
+
+class AlertMonitor:
+    # the per-metric thresholds of the alerts panel and the headless flags, run as rules on the
+    # engine next to any other rules: a threshold fires once the metric has stayed above it for
+    # `sustain` samples, and again only after it has dropped `hysteresis` points below it.
+    # notify gets every alert as it fires, normally NotificationDispatcher.submit
+    def __init__(self, store, thresholds=None, notify=None, rules=(), sustain=3, hysteresis=5.0):
+        self.threshold_dict = {"cpu": 100, "gpu": 100, "memory": 100}
+        if thresholds:
+            self.threshold_dict.update(thresholds)
+        self.notify = notify
+        self.sustain = sustain
+        self.hysteresis = hysteresis
+
+        self.rules = list(rules)
+        self.engine = RuleEngine(store, notify=notify)
+        self.update_rules()
+
+    def update_rules(self):
+        threshold_rules = [
+            AlertRule(type, type, "last", 0, ">", threshold, threshold - self.hysteresis, self.sustain)
+            for type, threshold in self.threshold_dict.items()
+            if threshold is not None
+        ]
+        self.engine.set_rules(threshold_rules + self.rules)
+
+    def set_threshold(self, type, threshold):
+        self.threshold_dict[type] = threshold
+        self.update_rules()
+
+    def set_thresholds(self, thresholds):
+        # updated in place, the sampler reads the same dict for its adaptive intervals
+        self.threshold_dict.update(thresholds)
+        self.update_rules()
+
+    def set_rules(self, rules):
+        self.rules = list(rules)
+        self.update_rules()
+
+    def check(self):
+        # evaluates every rule against the samples appended since the last check
+        return self.engine.evaluate()
@@ -1,18 +1,18 @@
 import customtkinter as ctk
-from plyer import notification
-import time
+
+from alerts import DEFAULT_RULES, AlertMonitor
+from config import validate_threshold
 
 
 class AlertsFrame(ctk.CTkFrame):
-    def __init__(self, parent, cpu_frame, gpu_frame, memory_frame):
+    # on_save gets the thresholds after every successful save, so they can be persisted
+    def __init__(self, parent, store, notify=None, rules=DEFAULT_RULES, thresholds=None, on_save=None):
         super().__init__(parent, fg_color="white")
 
-        self.cpu_frame = cpu_frame
-        self.gpu_frame = gpu_frame
-        self.memory_frame = memory_frame
-
-        self.last_alert_time_dict = {"cpu": 0, "gpu" : 0, "memory":0}
-        self.threshold_dict = {"cpu": 100, "gpu" : 100, "memory": 100}
+        # the thresholds below plus the windowed rules, all evaluated over the shared store
+        self.alert_monitor = AlertMonitor(store, thresholds, notify=notify, rules=rules)
+        self.threshold_dict = self.alert_monitor.threshold_dict
+        self.on_save = on_save
 
         self.grid_columnconfigure(0, weight=0)
 
@@ -67,74 +67,56 @@ class AlertsFrame(ctk.CTkFrame):
         self.gpu_status_label.grid(row=6, column=0, padx=10, pady=5, sticky="w")
         self.memory_status_label.grid(row=7, column=0, padx=10, pady=5, sticky="w")
 
-        self.monitor()
+        self.entries = {
+            "cpu": (self.cpu_threshold_entry, self.cpu_status_label),
+            "gpu": (self.gpu_threshold_entry, self.gpu_status_label),
+            "memory": (self.memory_threshold_entry, self.memory_status_label),
+        }
+        self.show_thresholds()
+
+    def show_thresholds(self):
+        # thresholds of 100% (the default) never fire, they count as not set
+        for type, (_, status_label) in self.entries.items():
+            threshold = self.threshold_dict.get(type)
+            if threshold is None or threshold >= 100:
+                status_label.configure(text=f"No {type.upper()} threshold set.", text_color="gray")
+            else:
+                status_label.configure(text=f"{type.upper()} Alert threshold set to {threshold:g}%.", text_color="green")
+
+    def set_thresholds(self, thresholds):
+        # thresholds from a reloaded config file
+        self.alert_monitor.set_thresholds(thresholds)
+        self.show_thresholds()
 
     def save_thresholds(self):
-        try:
-            cpu_threshold = self.cpu_threshold_entry.get()
-            if cpu_threshold.strip():
-                self.threshold_dict["cpu"] = float(cpu_threshold)
-                self.cpu_status_label.configure(
-                    text=f"CPU Alert threshold set to {self.threshold_dict['cpu']}%.",
-                    text_color="green",
-                )
-
-            gpu_threshold = self.gpu_threshold_entry.get()
-            if gpu_threshold.strip():
-                self.threshold_dict["gpu"] = float(gpu_threshold)
-                self.gpu_status_label.configure(
-                    text=f"GPU Alert threshold set to {self.threshold_dict['gpu']}%.",
-                    text_color="green",
-                )
-
-            memory_threshold = self.memory_threshold_entry.get()
-            if memory_threshold.strip():
-                self.threshold_dict["memory"] = float(memory_threshold)
-                self.memory_status_label.configure(
-                    text=f"MEMORY Alert threshold set to {self.threshold_dict['memory']}%.",
-                    text_color="green",
-                )
-
-        except ValueError:
-            pass
-
-    def monitor(self):
-        if self.threshold_dict["cpu"] is not None:
+        # each entry is checked on its own, a bad one is reported next to it and the others still apply
+        changed = False
+        for type, (entry, status_label) in self.entries.items():
+            text = entry.get().strip()
+            if not text:
+                continue
             try:
-                usage = self.cpu_frame.cpu_usage_data[-1]
-                if usage > self.threshold_dict["cpu"]:
-                    self.check_and_send_alert(usage, "cpu")
-            except (ValueError, IndexError):
-                pass
+                threshold = validate_threshold(type, float(text))
+            except ValueError:
+                status_label.configure(
+                    text=f"Invalid {type.upper()} threshold {text!r}, enter 0 to 100.",
+                    text_color="red",
+                )
+                continue
+            self.alert_monitor.set_threshold(type, threshold)
+            status_label.configure(text=f"{type.upper()} Alert threshold set to {threshold:g}%.", text_color="green")
+            changed = True
 
-        if self.threshold_dict["gpu"] is not None:
+        if changed and self.on_save is not None:
             try:
-                current_usage = self.gpu_frame.gpu_usage_data[-1]
-                usage = current_usage
-                if usage > self.threshold_dict["gpu"]:
-                    self.check_and_send_alert(usage, "gpu")
-            except (ValueError, IndexError):
-                pass
-
-        if self.threshold_dict["memory"] is not None:
-            try:
-                current_usage = self.memory_frame.memory_data[-1]
-                if current_usage > self.threshold_dict["memory"]:
-                    self.check_and_send_alert(current_usage, "memory")
-            except (ValueError, IndexError):
-                pass
-
-        self.after(1000, self.monitor)
-
-    def check_and_send_alert(self, usage, type):
-        current_time = time.time()
-        if current_time - self.last_alert_time_dict[type] >= 10:
-            self.send_alert(usage, type)
-            self.last_alert_time_dict[type] = current_time
-
-    def send_alert(self, usage, type):
-        notification.notify(
-            title="CPU Alert",
-            message=f"{type.upper()} usage is at {usage:.1f}%, exceeding the threshold!",
-            app_name="PC Dashboard",
-        )
+                self.on_save(dict(self.threshold_dict))
+            except (OSError, ValueError) as e:
+                # e.g. the config file was edited into something invalid, it is left as it is
+                self.instruction_label.configure(text="Thresholds not saved, see the console.", text_color="red")
+                print(f"thresholds not saved: {e}")
+            else:
+                self.instruction_label.configure(text="Set System Alerts for Usage", text_color="black")
+
+    # called once per ui tick after the other frames have appended the new snapshots to the store
+    def monitor(self):
+        self.alert_monitor.check()
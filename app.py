@@ -1,40 +1,513 @@
-import customtkinter as ctk
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 
-from alerts_frame import AlertsFrame
-from cpu_frame import CPUFrame
-from gpu_frame import GPUFrame
-from memory_frame import MemoryFrame
-from network_frame import NetworkFrame
+from startup import StartupTimer
 
-ctk.set_appearance_mode("System")
-ctk.set_default_color_theme("blue")
+startup = StartupTimer()
 
-root = ctk.CTk()
-root.title("PC Dashboard")
-root.geometry("960x540")
+# the headless collector has to be picked before customtkinter/matplotlib get imported
+if __name__ == "__main__" and "--headless" in sys.argv:
+    from headless import main
 
-root.grid_columnconfigure(0, weight=1)  # cpu frame column
-root.grid_columnconfigure(1, weight=1)  # network frame column
-root.grid_rowconfigure(0, weight=1)
-root.grid_rowconfigure(1, weight=1)
+    sys.exit(main(sys.argv[1:]))
 
-#cpu frame
-cpu_frame = CPUFrame(root)
-cpu_frame.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
+# agent mode streams the samples to fleet views elsewhere, also without any ui
+if __name__ == "__main__" and "--agent" in sys.argv:
+    from agent import main
 
-#network frame - works kinda; scalings off
-network_frame = NetworkFrame(root)
-network_frame.grid(row=0, column=1, sticky="nsew", padx=10, pady=10)
+    sys.exit(main(sys.argv[1:]))
 
-gpu_frame = GPUFrame(root)
-gpu_frame.grid(row=1, column=0, sticky="nsew", padx=10, pady=10)
+UI_TICK_MS = 100  # how often the tk thread drains the sampler queue
+HISTORY_DIR = "~/.system_dashboard/history"  # memory-mapped history segments, kept for a week
+STARTUP_REPORT_PATH = os.environ.get("DASHBOARD_STARTUP_REPORT")  # optional json copy of the startup times
+ALERT_LOG = "~/.system_dashboard/alerts.log"  # every notification is also appended here
 
-memory_frame = MemoryFrame(root)
-memory_frame.grid(row=1, column=1, sticky="nsew", padx=10, pady=10)
+# (row, column) of each chart frame in the window, and of its axes in the shared figure
+CHART_CELLS = {"cpu": (0, 0), "network": (0, 1), "gpu": (1, 0), "memory": (1, 1), "disk": (1, 2)}
 
-#alerts frame
-alerts_frame = AlertsFrame(root, cpu_frame=cpu_frame, gpu_frame=gpu_frame, memory_frame=memory_frame)
-alerts_frame.grid(row=0, column=2, rowspan=2, sticky="nsew", padx=10, pady=10)
+with startup.phase("import customtkinter"):
+    import customtkinter as ctk
 
+# the empty window goes up first. it needs nothing from the config, whose validators pull in
+# numpy (alert_rules), http.server (exporter), psutil (sampler) and the metrics bus
+with startup.phase("window shell"):
+    ctk.set_appearance_mode("System")
+    ctk.set_default_color_theme("blue")
 
+    root = ctk.CTk()
+    root.title("PC Dashboard")
+    root.geometry("1440x800")
+
+    root.grid_columnconfigure(0, weight=1)  # cpu frame column
+    root.grid_columnconfigure(1, weight=1)  # network frame column
+    root.grid_columnconfigure(2, weight=1)  # alerts and disk frame column
+
+    # show the empty window now, the frames fill it in as they are built
+    root.update()
+
+# thresholds, sampling intervals, time range and the frames to show, see config.py
+with startup.phase("load config"):
+    from config import CONFIG_PATH, ConfigError, ConfigWatcher, default_config, interval_changes, load_config, save_config
+
+    try:
+        config = load_config(CONFIG_PATH)
+    except ConfigError as e:
+        print(f"config error, using the defaults: {e}")
+        config = default_config()
+    enabled_frames = set(config["frames"])
+
+# with a bus configured the first dashboard on this machine samples and probes for all the
+# others, which only map its shared memory. without one, or off linux, every dashboard samples
+bus_writer = bus_reader = None
+if config["bus"]:
+    from metrics_bus import BusReader, BusWriter, SharedProcesses
+
+    with startup.phase("attach bus"):
+        try:
+            bus_writer = BusWriter(config["bus"])
+        except FileExistsError:
+            try:
+                bus_reader = BusReader(config["bus"])
+            except OSError as e:
+                print(f"metrics bus {config['bus']} unavailable, sampling here: {e}")
+        except OSError as e:
+            print(f"metrics bus {config['bus']} unavailable, sampling here: {e}")
+
+# hardware probes (lshw can take over a second) run while the frames are imported and built. a
+# collector probes for every frame since its viewers may show ones it doesn't
+from hardware_info import get_cpu_info, get_gpu_info, get_network_info
+
+if bus_reader is not None:
+    probe_names = ()
+elif bus_writer is not None:
+    probe_names = ("cpu", "network", "gpu")
+else:
+    probe_names = enabled_frames
+probe_pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix="probe")
+probes = {
+    name: probe_pool.submit(startup.timed, f"probe {name}", probe)
+    for name, probe in (("cpu", get_cpu_info), ("network", get_network_info), ("gpu", get_gpu_info))
+    if name in probe_names
+}
+probe_pool.shutdown(wait=False)
+hardware = {}  # probe results applied so far, also what the bus hands to viewers
+
+# in the shared layout the frames keep only their labels and the charts get a row of their own
+shared_layout = config["layout"] == "shared" and any(name in enabled_frames for name in CHART_CELLS)
+root.grid_rowconfigure(0, weight=0 if shared_layout else 1)
+root.grid_rowconfigure(1, weight=0 if shared_layout else 1)
+root.grid_rowconfigure(2, weight=1 if shared_layout else 0)  # shared figure row, empty otherwise
+root.grid_rowconfigure(3, weight=0)  # process table row
+
+# frame modules can pull in numpy and matplotlib, so they are only imported once the window is up.
+# frames with the canvas renderer never import matplotlib, see canvas_chart.py
+with startup.phase("import frames"):
+    from alerts_frame import AlertsFrame
+    from chart_renderer import SharedFigure
+    from collector import StoreFeed
+    from cpu_frame import CPUFrame
+    from disk_frame import DiskFrame
+    from exporter import MetricsExporter
+    from fleet import FleetClient
+    from fleet_frame import FleetFrame
+    from gpu_frame import GPUFrame
+    from history_storage import MetricsHistory
+    from memory_frame import MemoryFrame
+    from network_frame import NetworkFrame
+    from notifications import DesktopSink, LogFileSink, NotificationDispatcher
+    from process_frame import ProcessFrame
+    from process_sampler import ProcessSampler
+    from redraw_scheduler import RedrawScheduler
+    from sampler import MIN_INTERVAL, Sampler
+    from sampling_frame import SamplingFrame
+    from time_range_frame import TimeRangeFrame
+    from timeseries import TimeSeriesStore
+    from visibility import WindowVisibility
+
+with startup.phase("build frames"):
+    # one hour of history for every metric, shared by the charts and the alerts. adaptive
+    # metrics can drop to the fastest interval, so their buffers are sized for it
+    buffer_intervals = {
+        name: MIN_INTERVAL if name in config["adaptive"] else interval
+        for name, interval in config["sample_intervals"].items()
+    }
+    store = TimeSeriesStore(history_seconds=3600, intervals=buffer_intervals)
+    feed = StoreFeed(store)  # every series is appended here, whichever frames are shown
+
+    # samples, sliders and the shared time range all redraw through here, at most once per frame
+    scheduler = RedrawScheduler(root)
+
+    # frames left out of the config are never built, their probes and rendering cost nothing
+    renderers = config["renderers"]
+    chart_frames = []
+    probe_handlers = {}  # each frame fills in its static labels when its probe finishes
+
+    # one figure for every chart, laid out like the frames and drawn once per redraw pass
+    shared_figure = None
+    if shared_layout:
+        shared_figure = SharedFigure(root, {name: cell for name, cell in CHART_CELLS.items() if name in enabled_frames})
+        shared_figure.get_tk_widget().grid(row=2, column=0, columnspan=3, sticky="nsew", padx=10, pady=10)
+
+    def chart_options(name):
+        if shared_figure is not None:
+            return {"feed": feed, "shared_figure": shared_figure}
+        return {"feed": feed, "renderer": renderers.get(name, "matplotlib")}
+
+    def place_chart(name, frame):
+        row, column = CHART_CELLS[name]
+        frame.grid(row=row, column=column, sticky="nsew", padx=10, pady=10)
+        chart_frames.append(frame)
+
+    #cpu frame
+    if "cpu" in enabled_frames:
+        cpu_frame = CPUFrame(root, store, scheduler=scheduler, **chart_options("cpu"))
+        place_chart("cpu", cpu_frame)
+        probe_handlers["cpu"] = cpu_frame.set_cpu_info
+
+    #network frame
+    if "network" in enabled_frames:
+        network_frame = NetworkFrame(root, store, scheduler=scheduler, **chart_options("network"))
+        place_chart("network", network_frame)
+        probe_handlers["network"] = network_frame.set_network_info
+
+    if "gpu" in enabled_frames:
+        gpu_frame = GPUFrame(root, store, scheduler=scheduler, **chart_options("gpu"))
+        place_chart("gpu", gpu_frame)
+        probe_handlers["gpu"] = gpu_frame.set_gpu_info
+
+    if "memory" in enabled_frames:
+        memory_frame = MemoryFrame(root, store, scheduler=scheduler, **chart_options("memory"))
+        place_chart("memory", memory_frame)
+
+    if "disk" in enabled_frames:
+        disk_frame = DiskFrame(root, store, scheduler=scheduler, **chart_options("disk"))
+        place_chart("disk", disk_frame)
+
+    #alerts frame, notifications go out on their own thread so they can't stall the ui
+    notifications = NotificationDispatcher([DesktopSink(), LogFileSink(ALERT_LOG)])
+    config_watcher = ConfigWatcher(CONFIG_PATH)
+
+    def save_thresholds(thresholds):
+        # the file is read again first, so edits made to it since startup aren't overwritten
+        saved = load_config(CONFIG_PATH)
+        saved["thresholds"] = thresholds
+        save_config(saved, CONFIG_PATH)
+        config_watcher.saved()
+        config["thresholds"] = thresholds
+
+    alerts_frame = AlertsFrame(
+        root,
+        store,
+        notify=notifications.submit,
+        rules=config["rules"],
+        thresholds=config["thresholds"],
+        on_save=save_thresholds,
+    )
+    alerts_frame.grid(row=0, column=2, sticky="nsew", padx=10, pady=10)
+
+    #process table, sampled on its own thread since walking every process is the slowest probe.
+    #viewers show the collector's rows, the sampler is only started if they take over
+    process_sampler = process_frame = None
+    if "processes" in enabled_frames or bus_writer is not None or bus_reader is not None:
+        process_sampler = ProcessSampler(top_n=8)
+    if "processes" in enabled_frames:
+        if bus_reader is not None:
+            process_frame = ProcessFrame(root, SharedProcesses(bus_reader, process_sampler.top_n))
+        else:
+            process_frame = ProcessFrame(root, process_sampler)
+        process_frame.grid(row=3, column=0, columnspan=2, sticky="nsew", padx=10, pady=10)
+
+    # all probing happens on the sampler thread, the tk thread only renders
+    sampler = Sampler(
+        interval=config["sample_interval"],
+        intervals=config["sample_intervals"],
+        adaptive=set(config["adaptive"]),
+        thresholds=alerts_frame.threshold_dict,
+    )
+
+    if bus_writer is not None:
+        sampler.subscribe(bus_writer.publish)
+
+    # optional http/unix socket endpoint for other monitoring tools, fed on the sampler thread.
+    # viewers leave it to the collector
+    exporter = None
+    if config["export"] and bus_reader is None:
+        exporter = MetricsExporter(config["export"])
+        sampler.subscribe(exporter.update)
+
+    # other machines running agent.py, in a window of their own. every agent shares one
+    # connection loop and is drawn from the ui tick below, there's no timer per host
+    fleet_client = fleet_frame = None
+    if config["fleet"]:
+        fleet_client = FleetClient(config["fleet"])
+        fleet_window = ctk.CTkToplevel(root)
+        fleet_window.title("PC Dashboard - Fleet")
+        fleet_window.geometry("1200x700")
+        fleet_window.protocol("WM_DELETE_WINDOW", fleet_window.withdraw)  # hidden, still followed
+        fleet_frame = FleetFrame(fleet_window, fleet_client)
+        fleet_frame.pack(fill="both", expand=True)
+
+    #shared time range and sampling intervals, under the alerts
+    controls_frame = ctk.CTkFrame(root, fg_color="transparent")
+    controls_frame.grid(row=3, column=2, sticky="nsew", padx=10, pady=10)
+
+    time_range_frame = TimeRangeFrame(controls_frame, chart_frames, scheduler)
+    time_range_frame.pack(fill="x")
+    time_range_frame.set_time_range(config["time_range"])
+
+    sampling_frame = SamplingFrame(controls_frame, sampler)
+    sampling_frame.pack(fill="x", pady=(10, 0))
+
+# nothing is drawn while the window is minimized or covered, data keeps being collected
+window_visibility = WindowVisibility(root)
+
+# backfill the charts from the last run, then keep appending on the history writer thread.
+# a viewer reads the disk up to the collector's ring, replays the ring and never writes
+with startup.phase("history backfill"):
+    history = MetricsHistory(HISTORY_DIR)
+    now = time.time()
+    end = now
+    if bus_reader is not None:
+        oldest = bus_reader.oldest_timestamp()
+        end = now if oldest is None else oldest - 1e-3
+    records = history.read_range(now - store.history_seconds, end)
+    for frame in chart_frames:
+        frame.load_history(records)
+    if bus_reader is not None:
+        for snapshot in bus_reader.drain(since=now - store.history_seconds):
+            feed.append(snapshot)
+            for frame in chart_frames:
+                frame.on_sample(snapshot)
+    else:
+        history.start()
+
+if exporter is not None:
+    try:
+        exporter.start()
+    except OSError as e:
+        print(f"metrics export on {exporter.address} failed: {e}")
+        exporter = None
+if bus_reader is None:
+    sampler.start()
+    if process_sampler is not None:
+        process_sampler.start()
+notifications.start()
+if fleet_client is not None:
+    fleet_client.start()
+startup.mark("ready")
+
+rendered = False
+startup_reported = False
+stale = False  # samples arrived while the window was hidden
+processes_published = None  # generation of the process table last put on the bus
+next_bus_check = 0.0
+reported_errors = set()  # (where, exception type) whose traceback was printed
+
+
+def apply_hardware(name, info):
+    hardware[name] = info
+    if name in probe_handlers:
+        probe_handlers[name](info)
+
+
+def apply_probe_results():
+    for name, future in list(probes.items()):
+        if not future.done():
+            continue
+        del probes[name]
+        try:
+            apply_hardware(name, future.result())
+        except Exception as e:
+            print(f"{name} probe error: {e}")
+            continue
+        if bus_writer is not None:
+            bus_writer.set_state("hardware", dict(hardware))
+
+
+def take_over_bus():
+    # the collector exited, the first viewer to notice starts sampling for the others
+    global bus_writer, bus_reader
+
+    try:
+        writer = BusWriter(config["bus"])
+    except FileExistsError:
+        # another viewer got there first, follow it instead. if it isn't set up yet this runs again
+        try:
+            reader = BusReader(config["bus"])
+        except OSError:
+            return
+        reader.last_timestamp = bus_reader.last_timestamp
+        bus_reader.close()
+        bus_reader = reader
+        if process_frame is not None:
+            process_frame.process_sampler.reader = reader
+        return
+    except OSError as e:
+        print(f"metrics bus {config['bus']} lost its collector, can't take over: {e}")
+        return
+
+    bus_reader.close()
+    bus_reader = None
+    bus_writer = writer
+    bus_writer.set_state("hardware", dict(hardware))
+    sampler.subscribe(bus_writer.publish)
+    sampler.start()
+    if process_sampler is not None:
+        process_sampler.start()
+    if process_frame is not None:
+        process_frame.process_sampler = process_sampler
+        process_frame.generation = None
+    history.start()
+    print(f"metrics bus {config['bus']}: collector exited, sampling here now")
+
+
+def update_bus():
+    # a collector hands its process table on, a viewer picks up the hardware info and checks
+    # about once a second that the collector is still there
+    global processes_published, next_bus_check
+
+    if bus_writer is not None:
+        if process_sampler is not None:
+            generation, top = process_sampler.top()
+            if generation != processes_published:
+                processes_published = generation
+                bus_writer.set_state("processes", (generation, top))
+        return
+
+    for name, info in bus_reader.state.get("hardware", {}).items():
+        if name not in hardware:
+            apply_hardware(name, info)
+
+    now = time.monotonic()
+    if now >= next_bus_check:
+        next_bus_check = now + 1.0
+        if not bus_reader.collector_running():
+            take_over_bus()
+
+
+def apply_config(reloaded):
+    # everything but the frames applies while running, those are only built at startup
+    global config
+
+    alerts_frame.set_thresholds(reloaded["thresholds"])
+    alerts_frame.alert_monitor.set_rules(reloaded["rules"])
+
+    for name, interval, adaptive in interval_changes(config, reloaded):
+        sampler.set_interval(name, interval, adaptive)
+    sampling_frame.show_interval(sampling_frame.metric_menu.get())
+
+    if reloaded["time_range"] != config["time_range"]:
+        time_range_frame.set_time_range(reloaded["time_range"])
+    if any(reloaded[key] != config[key] for key in ("frames", "renderers", "layout", "export", "fleet", "bus")):
+        print("config: frame, renderer, layout, export, fleet and bus changes take effect on the next start")
+
+    config = reloaded
+
+
+def report_error(where):
+    # the traceback the first time, a line after that, so an error every tick can't flood the log
+    error = sys.exc_info()[1]
+    key = (where, type(error))
+    if key in reported_errors:
+        print(f"{where} error: {error!r}")
+        return
+    reported_errors.add(key)
+    print(f"{where} error:")
+    traceback.print_exc()
+
+
+def guarded(where, function, *args):
+    # a consumer that fails is logged and skipped, the others still get the sample
+    try:
+        function(*args)
+    except Exception:
+        report_error(where)
+
+
+def tick():
+    global rendered, startup_reported, stale
+
+    if probes:
+        apply_probe_results()
+
+    # at most one stat of the config file every couple of seconds
+    try:
+        reloaded = config_watcher.check()
+    except ConfigError as e:
+        print(f"config not reloaded: {e}")
+    else:
+        if reloaded is not None:
+            apply_config(reloaded)
+
+    if bus_reader is not None:
+        try:
+            snapshots = bus_reader.drain()
+        except OSError as e:
+            print(f"metrics bus read error: {e}")
+            snapshots = []
+    else:
+        snapshots = sampler.drain()
+    if snapshots:
+        for snapshot in snapshots:
+            guarded("store", feed.append, snapshot)
+            for frame in chart_frames:
+                guarded(type(frame).__name__, frame.on_sample, snapshot)
+            if bus_reader is None:
+                guarded("history", history.append_from_store, snapshot.timestamp, store)
+        guarded("alerts", alerts_frame.monitor)
+        stale = True
+
+    if bus_writer is not None or bus_reader is not None:
+        guarded("metrics bus", update_bus)
+
+    if fleet_frame is not None:
+        guarded("fleet", fleet_frame.refresh)
+
+    # one redraw per tick with new data, or once when the window becomes visible again
+    if stale and window_visibility.visible:
+        stale = False
+        for frame in chart_frames:
+            frame.request_redraw()
+        if process_frame is not None:
+            process_frame.refresh()
+
+        if not rendered:
+            rendered = True
+            startup.mark("first render")
+
+    # startup is over once every probe has landed and the charts have drawn real data
+    if rendered and not probes and not startup_reported:
+        startup_reported = True
+        print(startup.report())
+        if STARTUP_REPORT_PATH:
+            startup.write(STARTUP_REPORT_PATH)
+
+
+def drain_samples():
+    # the next tick is queued whatever this one raises, one bad sample mustn't stop the charts
+    try:
+        tick()
+    except Exception:
+        report_error("ui tick")
+    finally:
+        root.after(UI_TICK_MS, drain_samples)
+
+
+drain_samples()
 root.mainloop()
+sampler.stop()
+if process_sampler is not None:
+    process_sampler.stop()
+notifications.stop()
+if exporter is not None:
+    exporter.stop()
+if fleet_client is not None:
+    fleet_client.stop()
+if bus_writer is not None:
+    bus_writer.close()
+if bus_reader is not None:
+    bus_reader.close()
+history.stop()
@@ -0,0 +1,65 @@
+# per-tick cost of alert_rules.RuleEngine with hundreds of rules over cpu, memory and per-core series
+# run from the repo root: python -m benchmarks.alert_rules
+import time
+
+import numpy as np
+
+from alert_rules import AlertRule, RuleEngine
+from timeseries import TimeSeriesStore
+
+CORES = 32
+INTERVAL = 0.1  # seconds between samples, the fastest the sampler goes
+WARMUP_TICKS = 3000  # fills the longest window before measuring
+TICKS = 2000
+
+METRICS = ("cpu", "memory", "cpu_cores")
+STATS = ("last", "mean", "p95", "rate")
+WINDOWS = (30, 300)
+
+
+def make_rules(count):
+    return [
+        AlertRule(
+            f"rule {i}",
+            METRICS[i % len(METRICS)],
+            STATS[i % len(STATS)],
+            WINDOWS[i % len(WINDOWS)],
+            ">",
+            50 + i % 50,
+            40 + i % 50,
+            1 + i % 5,
+        )
+        for i in range(count)
+    ]
+
+
+def measure(rule_count):
+    store = TimeSeriesStore(history_seconds=3600, intervals={"cpu": INTERVAL, "memory": INTERVAL})
+    cores = store.matrix("cpu_cores", CORES)
+    engine = RuleEngine(store, make_rules(rule_count))
+    rng = np.random.default_rng(0)
+
+    elapsed = 0.0
+    for tick in range(WARMUP_TICKS + TICKS):
+        timestamp = tick * INTERVAL
+        store.append("cpu", timestamp, rng.random() * 100)
+        store.append("memory", timestamp, 40 + rng.random() * 20)
+        cores.append(timestamp, rng.random(CORES) * 100)
+
+        start = time.perf_counter()
+        engine.evaluate()
+        if tick >= WARMUP_TICKS:
+            elapsed += time.perf_counter() - start
+
+    return elapsed / TICKS * 1e3, len(engine.groups), len(engine.windows)
+
+
+def main():
+    print(f"{'rules':>6} {'groups':>7} {'windows':>8} {'ms/tick':>8}")
+    for rule_count in (10, 100, 300, 1000):
+        per_tick, groups, windows = measure(rule_count)
+        print(f"{rule_count:>6} {groups:>7} {windows:>8} {per_tick:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
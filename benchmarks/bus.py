@@ -0,0 +1,80 @@
+# metrics_bus costs: what publishing adds to the collector's sampler thread, what a viewer's
+# ui tick pays to drain it, and how long a new viewer takes to pick up an hour of history
+# run from the repo root: python -m benchmarks.bus [--seconds 3600]
+import argparse
+import os
+import time
+
+from metrics_bus import BusReader, BusWriter
+from sampler import Sampler, Snapshot
+
+NAME = f"dashboard-benchmark-{os.getpid()}"
+
+
+def hour_of_snapshots(seconds):
+    # real probe values, restamped onto the default schedule: cpu every 0.5 s and the rest
+    # every second, so two snapshots a second, one of them with every probe
+    sampler = Sampler()
+    full = sampler.sample()
+    cpu_only = sampler.sample(["cpu"])
+    start = time.time() - seconds
+    snapshots = []
+    for second in range(seconds):
+        snapshots.append(Snapshot(start + second, full.values))
+        snapshots.append(Snapshot(start + second + 0.5, cpu_only.values))
+    sampler.stop()
+    return snapshots
+
+
+def measure(seconds):
+    snapshots = hour_of_snapshots(seconds)
+    writer = BusWriter(NAME)
+    try:
+        started = time.perf_counter()
+        for snapshot in snapshots:
+            writer.publish(snapshot)
+        publish = (time.perf_counter() - started) / len(snapshots)
+        ring_used = writer.head - writer.tail
+
+        started = time.perf_counter()
+        reader = BusReader(NAME)
+        history = reader.drain(since=snapshots[0].timestamp)
+        attach = time.perf_counter() - started
+
+        # one ui tick with the two snapshots of the last second
+        ticks = 1000
+        drain = 0.0
+        for tick in range(ticks):
+            now = snapshots[-1].timestamp + tick + 1
+            writer.publish(Snapshot(now, snapshots[0].values))
+            writer.publish(Snapshot(now + 0.5, snapshots[1].values))
+            started = time.perf_counter()
+            reader.drain()
+            drain += time.perf_counter() - started
+        reader.close()
+    finally:
+        writer.close()
+
+    return {
+        "snapshots": len(history),
+        "ring_mb": ring_used / 1e6,
+        "publish_us": publish * 1e6,
+        "attach_ms": attach * 1e3,
+        "drain_us_per_tick": drain / ticks * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the shared memory metrics bus.")
+    parser.add_argument("--seconds", type=int, default=3600, help="history a new viewer picks up")
+    args = parser.parse_args()
+
+    result = measure(args.seconds)
+    print(f"{result['snapshots']} snapshots in {result['ring_mb']:.1f} MB of ring")
+    print(f"publish: {result['publish_us']:.1f} us per snapshot")
+    print(f"viewer attach with full history: {result['attach_ms']:.1f} ms")
+    print(f"viewer drain: {result['drain_us_per_tick']:.1f} us per ui tick")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# fleet.FleetClient following 100+ synthetic agents on loopback, read the way the dashboard
+# does: drained every ui tick on the main thread. the agents are agent.AgentServer instances
+# spread over a few local processes, so the client's side is all that runs in this one
+# run from the repo root: python -m benchmarks.fleet [--agents 120]
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from agent import AgentServer
+from agent_protocol import batch_message
+from fleet import FleetClient
+
+WORKERS = 4  # processes hosting the agents
+INTERVAL = 1.0  # seconds between an agent's samples
+BATCH_SIZE = 5
+UI_TICK = 0.1
+WARMUP = 3.0
+DURATION = 10.0
+
+
+def synthetic_record(now, phase):
+    return {
+        "cpu": 50 + 40 * math.sin(now / 20 + phase),
+        "memory": 40 + 10 * math.sin(now / 300 + phase),
+        "upload": random.uniform(0, 5),
+        "download": random.uniform(0, 50),
+        "gpu": 30 + 20 * math.sin(now / 60 + phase),
+    }
+
+
+async def host_agents(addresses, interval):
+    servers = [AgentServer(address, {"host": os.path.basename(address)}, BATCH_SIZE, interval * BATCH_SIZE) for address in addresses]
+    for server in servers:
+        await server.start()
+        asyncio.create_task(server.flush_forever())
+
+    phases = [random.random() * 2 * math.pi for _ in servers]
+    while True:
+        now = time.time()
+        for server, phase in zip(servers, phases):
+            server.add(now, synthetic_record(now, phase))
+        await asyncio.sleep(interval)
+
+
+def run_agents(addresses, interval):
+    asyncio.run(host_agents(addresses, interval))
+
+
+def encoded_size():
+    # bytes per sample on the wire against the same samples as json lines
+    now = time.time()
+    samples = [(now + i, synthetic_record(now + i, 0.0)) for i in range(BATCH_SIZE)]
+    binary = len(batch_message(samples)) / BATCH_SIZE
+    text = sum(len(json.dumps(dict(timestamp=timestamp, **record))) + 1 for timestamp, record in samples) / BATCH_SIZE
+    return binary, text
+
+
+def measure(agent_count, interval, duration):
+    directory = tempfile.mkdtemp(prefix="fleet-benchmark-")
+    addresses = [f"unix:{directory}/agent-{i}.sock" for i in range(agent_count)]
+
+    workers = [
+        multiprocessing.Process(target=run_agents, args=(addresses[worker::WORKERS], interval), daemon=True)
+        for worker in range(WORKERS)
+    ]
+    for worker in workers:
+        worker.start()
+    time.sleep(1.0)
+
+    client = FleetClient(addresses)
+    client.start()
+    up = set()
+    deadline = time.monotonic() + WARMUP
+    while time.monotonic() < deadline:
+        up.update(address for kind, address, _ in client.drain() if kind == "hello")
+        time.sleep(UI_TICK)
+
+    samples = 0
+    drain_seconds = 0.0
+    ticks = 0
+    cpu_start = time.process_time()
+    start = time.monotonic()
+    while time.monotonic() - start < duration:
+        tick_start = time.perf_counter()
+        latest = {}
+        for kind, address, data in client.drain():
+            if kind == "hello":
+                up.add(address)
+            elif kind == "down":
+                up.discard(address)
+            else:
+                samples += len(data)
+                record = latest.setdefault(address, {})
+                for _, values in data:
+                    record.update(values)
+        drain_seconds += time.perf_counter() - tick_start
+        ticks += 1
+        time.sleep(UI_TICK)
+    elapsed = time.monotonic() - start
+    cpu = time.process_time() - cpu_start
+
+    client.stop()
+    for worker in workers:
+        worker.terminate()
+        worker.join()
+    shutil.rmtree(directory, ignore_errors=True)
+    return {
+        "agents_up": len(up),
+        "samples_per_second": samples / elapsed,
+        "drain_ms_per_tick": drain_seconds / ticks * 1e3,
+        "client_cpu_percent": cpu / elapsed * 100,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the fleet client against local synthetic agents.")
+    parser.add_argument("--agents", type=int, nargs="+", default=[25, 120])
+    parser.add_argument("--interval", type=float, default=INTERVAL)
+    parser.add_argument("--duration", type=float, default=DURATION)
+    args = parser.parse_args()
+
+    binary, text = encoded_size()
+    print(f"wire size per sample: {binary:.1f} bytes (json lines: {text:.1f} bytes)")
+    print(f"{'agents':>7} {'up':>5} {'samples/s':>10} {'drain ms':>9} {'cpu %':>7}")
+    for agent_count in args.agents:
+        result = measure(agent_count, args.interval, args.duration)
+        print(
+            f"{agent_count:>7} {result['agents_up']:>5} {result['samples_per_second']:>10.1f} "
+            f"{result['drain_ms_per_tick']:>9.3f} {result['client_cpu_percent']:>7.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+# per-tick cost of the chart frames: each frame is built through its constructor in a withdrawn
+# window and fed synthetic cpu, memory, network and (fake) gpu samples, one per simulated
+# second. reports on_sample, update_plot and full canvas.draw() times, memory growth and the
+# frame rate that leaves, for the 60 s and 3600 s time ranges, and writes them to a json file.
+# tk needs a display, on a machine without one run it under xvfb-run
+# run from the repo root: python -m benchmarks.frames [--output frames.json] [--profile DIR]
+import argparse
+import cProfile
+import json
+import os
+import platform
+import time
+import tracemalloc
+from collections import namedtuple
+
+import customtkinter as ctk
+import matplotlib
+import numpy as np
+
+from cpu_frame import CPUFrame
+from gpu_frame import GPUFrame
+from gpu_providers import FakeProvider
+from memory_frame import MemoryFrame
+from network_frame import NetworkFrame
+from sampler import NetworkReading, Snapshot
+from timeseries import TimeSeriesStore
+
+HISTORY_SECONDS = 3600  # the store is filled with this much before measuring
+TIME_RANGES = (60, 3600)
+TICKS = 300  # measured ticks per frame and time range
+DRAWS = 50  # full redraws measured per frame and time range
+CORES = 16
+GPUS = 2
+INTERFACES = ("eth0", "wlan0", "lo")
+
+Counters = namedtuple("Counters", ["bytes_sent", "bytes_recv"])
+
+
+class SyntheticSource:
+    # the snapshots the sampler would publish, every metric due on every tick
+    def __init__(self, cores=CORES, gpus=GPUS, seed=0):
+        self.rng = np.random.default_rng(seed)
+        self.cores = cores
+        self.gpu = FakeProvider(device_count=gpus)
+        self.sent = dict.fromkeys(INTERFACES, 0)
+        self.received = dict.fromkeys(INTERFACES, 0)
+
+    def snapshot(self, timestamp):
+        rng = self.rng
+        core_loads = np.clip(50 + 40 * np.sin(timestamp / 30 + np.arange(self.cores)) + rng.normal(0, 5, self.cores), 0, 100)
+        for interface in INTERFACES:
+            self.sent[interface] += int(rng.integers(0, 2_000_000))
+            self.received[interface] += int(rng.integers(0, 20_000_000))
+        counters = {interface: Counters(self.sent[interface], self.received[interface]) for interface in INTERFACES}
+
+        return Snapshot(timestamp, {
+            "cpu": float(core_loads.mean()),
+            "cpu_cores": core_loads.tolist(),
+            "memory": float(40 + 10 * np.sin(timestamp / 600) + rng.normal(0, 1)),
+            "network": NetworkReading(timestamp, counters),
+            "gpu": self.gpu.read(),
+        })
+
+
+# the frames are built exactly as app.py builds them, without a scheduler so every redraw is
+# synchronous, and never mapped: the window stays withdrawn and nothing reaches the screen
+
+def build_cpu(root, store, blit):
+    return CPUFrame(root, store, blit=blit)
+
+
+def build_cpu_cores(root, store, blit):
+    frame = CPUFrame(root, store, blit=blit)
+    frame.per_core_switch.select()
+    return frame
+
+
+def build_memory(root, store, blit):
+    return MemoryFrame(root, store, blit=blit)
+
+
+def build_network(root, store, blit):
+    return NetworkFrame(root, store, blit=blit)
+
+
+def build_gpu(root, store, blit):
+    return GPUFrame(root, store, blit=blit)
+
+
+FRAMES = {
+    "cpu": build_cpu,
+    "cpu_cores": build_cpu_cores,
+    "memory": build_memory,
+    "network": build_network,
+    "gpu": build_gpu,
+}
+
+
+def summary(milliseconds):
+    values = np.asarray(milliseconds)
+    return {
+        "mean": round(float(values.mean()), 4),
+        "p50": round(float(np.percentile(values, 50)), 4),
+        "p95": round(float(np.percentile(values, 95)), 4),
+        "max": round(float(values.max()), 4),
+    }
+
+
+def sample(frame, snapshot):
+    # the dashboard appends each snapshot to the store once, before the frames see it
+    frame.feed.append(snapshot)
+    frame.on_sample(snapshot)
+
+
+def measure(root, name, time_range, blit, ticks, draws, profile_dir=None):
+    store = TimeSeriesStore(history_seconds=HISTORY_SECONDS)
+    frame = FRAMES[name](root, store, blit)
+    source = SyntheticSource()
+
+    # a full hour of history, as after a restart with backfill or an hour of running
+    timestamp = 0.0
+    for _ in range(HISTORY_SECONDS):
+        timestamp += 1.0
+        sample(frame, source.snapshot(timestamp))
+    if name == "cpu_cores":
+        frame.toggle_per_core()
+    frame.set_time_range(time_range)
+    frame.canvas.draw()
+
+    snapshots = []
+    for _ in range(ticks):
+        timestamp += 1.0
+        snapshots.append(source.snapshot(timestamp))
+
+    profiler = cProfile.Profile() if profile_dir else None
+    sample_ms, update_ms = [], []
+    if profiler is not None:
+        profiler.enable()
+    for snapshot in snapshots:
+        start = time.perf_counter()
+        sample(frame, snapshot)
+        sampled = time.perf_counter()
+        frame.update_plot()
+        sample_ms.append((sampled - start) * 1e3)
+        update_ms.append((time.perf_counter() - sampled) * 1e3)
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(os.path.join(profile_dir, f"{name}-{time_range}{'' if blit else '-noblit'}.prof"))
+
+    # a full draw is what every invalidation (time range, new y limit, resize) costs
+    draw_ms = []
+    for _ in range(draws):
+        start = time.perf_counter()
+        frame.canvas.draw()
+        draw_ms.append((time.perf_counter() - start) * 1e3)
+
+    # memory that stays allocated per tick once the buffers are full, should be ~0
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for _ in range(ticks):
+        timestamp += 1.0
+        sample(frame, source.snapshot(timestamp))
+        frame.update_plot()
+    growth = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    frame.destroy()
+
+    tick_ms = float(np.mean(sample_ms) + np.mean(update_ms))
+    return {
+        "frame": name,
+        "time_range": time_range,
+        "blit": blit,
+        "ticks": ticks,
+        "sample_ms": summary(sample_ms),
+        "update_plot_ms": summary(update_ms),
+        "draw_ms": summary(draw_ms),
+        "fps": round(1000 / tick_ms, 1),
+        "memory_growth_kb": round(growth / 1024, 1),
+        "memory_growth_per_tick_bytes": round(growth / ticks, 1),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the chart frames on an Agg canvas.")
+    parser.add_argument("--output", default="frames-benchmark.json", help="json file for the results")
+    parser.add_argument("--frames", nargs="+", choices=list(FRAMES), default=list(FRAMES))
+    parser.add_argument("--ticks", type=int, default=TICKS)
+    parser.add_argument("--draws", type=int, default=DRAWS)
+    parser.add_argument("--no-blit", action="store_true", help="full canvas.draw() on every tick, as before blitting")
+    parser.add_argument("--profile", metavar="DIR", help="write a cProfile .prof file per frame and time range")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.profile:
+        os.makedirs(args.profile, exist_ok=True)
+
+    root = ctk.CTk()
+    root.withdraw()
+
+    results = []
+    print(f"{'frame':<10} {'range':>6} {'sample ms':>10} {'update ms':>10} {'p95 ms':>8} {'draw ms':>8} {'fps':>7} {'mem kB':>7}")
+    for name in args.frames:
+        for time_range in TIME_RANGES:
+            result = measure(root, name, time_range, not args.no_blit, args.ticks, args.draws, args.profile)
+            results.append(result)
+            print(
+                f"{name:<10} {time_range:>6} {result['sample_ms']['mean']:>10.3f} {result['update_plot_ms']['mean']:>10.3f} "
+                f"{result['update_plot_ms']['p95']:>8.3f} {result['draw_ms']['mean']:>8.2f} {result['fps']:>7.1f} "
+                f"{result['memory_growth_kb']:>7.1f}"
+            )
+    root.destroy()
+
+    with open(args.output, "w") as f:
+        json.dump({
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "machine": {
+                "platform": platform.platform(),
+                "processor": platform.processor() or platform.machine(),
+                "cpus": os.cpu_count(),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "matplotlib": matplotlib.__version__,
+            },
+            "history_seconds": HISTORY_SECONDS,
+            "cores": CORES,
+            "gpus": GPUS,
+            "results": results,
+        }, f, indent=2)
+    print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# the /proc fast path (procfs.ProcProbes) against the psutil probes it replaces, per probe and
+# for a whole tick of cpu, per-core, memory and network, plus the cpu that costs at 10 and 100 Hz
+# run from the repo root: python -m benchmarks.procfs
+import time
+
+import psutil
+
+from procfs import ProcProbes
+from sampler import probe_cpu, probe_cpu_cores, probe_memory, probe_network
+
+CALLS = 5000
+
+
+def per_call_us(probe, calls=CALLS):
+    probe()
+    start = time.perf_counter()
+    for _ in range(calls):
+        probe()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    fast = ProcProbes()
+
+    # ticks are at least 0.1 s apart in the sampler, so /proc/stat is only ever shared within one
+    def fresh(probe):
+        def call():
+            fast.stat_times = None
+            return probe()
+        return call
+
+    probes = {
+        "cpu": (probe_cpu, fresh(fast.cpu)),
+        "cpu_cores": (probe_cpu_cores, fresh(fast.cpu_cores)),
+        "memory": (probe_memory, fast.memory),
+        "network": (probe_network, fast.network),
+    }
+
+    def psutil_tick():
+        for slow, _ in probes.values():
+            slow()
+
+    def fast_tick():
+        fast.stat_times = None
+        fast.cpu()
+        fast.cpu_cores()
+        fast.memory()
+        fast.network()
+
+    print(f"{psutil.cpu_count()} cpus, {len(psutil.net_if_addrs())} interfaces")
+    print(f"{'probe':<10} {'psutil us':>10} {'/proc us':>9} {'speedup':>8}")
+    for name, (slow, quick) in probes.items():
+        slow_us, quick_us = per_call_us(slow), per_call_us(quick)
+        print(f"{name:<10} {slow_us:>10.1f} {quick_us:>9.1f} {slow_us / quick_us:>7.1f}x")
+
+    slow_us, quick_us = per_call_us(psutil_tick, CALLS // 4), per_call_us(fast_tick, CALLS // 4)
+    print(f"{'tick':<10} {slow_us:>10.1f} {quick_us:>9.1f} {slow_us / quick_us:>7.1f}x")
+    for rate in (10, 100):
+        print(f"cpu at {rate} Hz: psutil {slow_us * rate / 1e4:.2f}%, /proc {quick_us * rate / 1e4:.2f}% of one core")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# compares the old per-frame list histories with timeseries.RingBuffer
+# run from the repo root: python -m benchmarks.ring_buffer
+import time
+import tracemalloc
+
+from timeseries import RingBuffer
+
+HISTORY_SECONDS = 3600
+TIME_RANGE = 60  # seconds shown on the chart
+RUN_SECONDS = 60  # simulated seconds per measurement
+
+
+class ListPopFront:
+    # cpu/memory frame style: append + pop(0), then slice for the plot once per second
+    def __init__(self, rate):
+        self.rate = rate
+        self.data = [0] * (HISTORY_SECONDS * rate)
+
+    def step(self, i):
+        self.data.append(float(i % 100))
+        self.data.pop(0)
+        if i % self.rate == 0:
+            self.data[-TIME_RANGE * self.rate:]
+
+
+class ListSliceCopy:
+    # network frame style: append, then copy the tail to cap the list
+    def __init__(self, rate):
+        self.rate = rate
+        self.capacity = HISTORY_SECONDS * rate
+        self.data = [0] * self.capacity
+
+    def step(self, i):
+        self.data.append(float(i % 100))
+        self.data = self.data[-self.capacity:]
+        if i % self.rate == 0:
+            self.data[-TIME_RANGE * self.rate:]
+
+
+class Ring:
+    def __init__(self, rate):
+        self.rate = rate
+        self.buffer = RingBuffer(HISTORY_SECONDS * rate)
+        for i in range(self.buffer.capacity):
+            self.buffer.append(i / rate, 0.0)
+
+    def step(self, i):
+        self.buffer.append(i / self.rate, float(i % 100))
+        if i % self.rate == 0:
+            self.buffer.last(TIME_RANGE * self.rate)
+
+
+def measure(implementation, rate):
+    samples = RUN_SECONDS * rate
+
+    history = implementation(rate)
+    start = time.perf_counter()
+    for i in range(samples):
+        history.step(i)
+    elapsed = time.perf_counter() - start
+
+    # second pass only to count what the steady state allocates, tracemalloc skews timings
+    history = implementation(rate)
+    tracemalloc.start()
+    for i in range(samples):
+        history.step(i)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed / samples * 1e6, peak / 1024
+
+
+def main():
+    print(f"{'rate':>6} {'implementation':<14} {'us/sample':>10} {'peak alloc KiB':>15}")
+    for rate in (1, 100):
+        for implementation in (ListPopFront, ListSliceCopy, Ring):
+            per_sample, peak = measure(implementation, rate)
+            print(f"{rate:>4}Hz {implementation.__name__:<14} {per_sample:>10.2f} {peak:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
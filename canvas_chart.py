@@ -0,0 +1,277 @@
+# charts drawn with plain tk canvas items instead of matplotlib, for machines where importing
+# matplotlib and rasterizing through Agg and a PhotoImage every tick costs more than the data.
+# the grid, spines, tick labels, axis labels and legend are canvas items rebuilt only when the
+# axes change, lines and fills are created once and only get new coords() every render
+import math
+import tkinter as tk
+from collections import namedtuple
+
+import numpy as np
+
+DPI = 90  # what the matplotlib charts use, so line widths and the default size match
+WIDTH, HEIGHT = 7 * DPI, 2 * DPI
+
+# margins around the plot area in pixels, room for the tick and axis labels
+LEFT = 56
+RIGHT = 10
+TOP = 8
+BOTTOM = 24
+TICK_LENGTH = 4
+
+TICK_FONT = ("Segoe UI", 8)
+LABEL_FONT = ("Segoe UI", 9)
+LEGEND_FONT = ("Segoe UI", 7)
+
+# the plot area in canvas pixels, frames size their point budget by its width like Axes.bbox
+PlotArea = namedtuple("PlotArea", ["x0", "y0", "width", "height"])
+
+
+def default_tick_format(value, position=None):
+    return f"{value:g}"
+
+
+def auto_ticks(bottom, top):
+    # the first 1-2-5 step that gives at most six intervals, about what AutoLocator picks
+    span = top - bottom
+    if span <= 0:
+        return [bottom]
+    magnitude = 10 ** math.floor(math.log10(span / 6))
+    for step in (1, 2, 5, 10):
+        if span / (step * magnitude) <= 6:
+            break
+    step *= magnitude
+    return [round(bottom + index * step, 12) for index in range(int(span / step + 1e-9) + 1)]
+
+
+class CanvasLine:
+    def __init__(self, axes, color, linewidth, label=None):
+        self.axes = axes
+        self.label = label
+        self.color = color
+        self.x = self.y = np.zeros(0)
+        self.item = axes.widget.create_line(0, 0, 0, 0, fill=color, width=max(1, round(linewidth * DPI / 72)), state="hidden")
+
+    def set_data(self, x, y):
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+
+    def set_label(self, label):
+        self.label = label
+
+    def get_label(self):
+        return self.label
+
+    def draw(self):
+        self.axes.place(self.item, self.x, self.y)
+
+
+class CanvasFill:
+    # the area under a line, or between two lines, like chart_renderer.AreaFill. tk has no
+    # alpha, the color is blended with the white background once instead
+    def __init__(self, axes, color, alpha=1.0):
+        self.axes = axes
+        self.x = self.y = self.lower = None
+        self.item = axes.widget.create_polygon(0, 0, 0, 0, 0, 0, fill=axes.blend(color, alpha), outline="", state="hidden")
+
+    def set_data(self, x, y, lower=None):
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.lower = None if lower is None else np.asarray(lower, dtype=float)
+
+    def draw(self):
+        if self.x is None:
+            return
+        # upper edge forwards, then the baseline or the lower edge backwards
+        lower = np.zeros(len(self.x)) if self.lower is None else self.lower
+        self.axes.place(self.item, np.concatenate((self.x, self.x[::-1])), np.concatenate((self.y, lower[::-1])))
+
+
+class CanvasAxes:
+    # answers the Axes, FigureCanvas and BlitRenderer calls the frames make after building
+    # their chart (limits, ticks, labels, legend, bbox.width, invalidate, render), so
+    # update_plot and update_time_axis work the same on either renderer
+    def __init__(self, parent, spine_color, grid_color, tick_format=default_tick_format):
+        self.widget = tk.Canvas(parent, width=WIDTH, height=HEIGHT, background="white", highlightthickness=0)
+        self.widget.bind("<Configure>", self.on_resize)
+
+        self.spine_color = spine_color
+        self.grid_color = self.blend(grid_color, 0.7)
+        self.tick_format = tick_format
+
+        self.xlim = (0, 60)
+        self.ylim = (0, 1)
+        self.xticks = []
+        self.yticks = None  # None follows the y limits
+        self.xlabel = ""
+        self.ylabel = ""
+        self.show_legend = False
+        self.legend_handles = None
+
+        self.artists = []  # drawn in creation order, above the static items
+        self.bbox = PlotArea(LEFT, TOP, WIDTH - LEFT - RIGHT, HEIGHT - TOP - BOTTOM)
+        self.stale = True
+
+    def get_tk_widget(self):
+        return self.widget
+
+    def blend(self, color, alpha):
+        # color at alpha over white, as "#rrggbb"
+        red, green, blue = (channel / 257 for channel in self.widget.winfo_rgb(color))
+        return "#" + "".join(f"{round(channel * alpha + 255 * (1 - alpha)):02x}" for channel in (red, green, blue))
+
+    # the Axes calls the frames make, styling arguments are accepted and the look kept fixed
+
+    def set_xlim(self, left, right):
+        self.xlim = (left, right)
+        self.stale = True
+
+    def set_ylim(self, bottom, top):
+        self.ylim = (bottom, top)
+        self.stale = True
+
+    def get_ylim(self):
+        return self.ylim
+
+    def set_xticks(self, ticks):
+        self.xticks = list(ticks)
+        self.stale = True
+
+    def set_yticks(self, ticks):
+        self.yticks = list(ticks)
+        self.stale = True
+
+    def set_xlabel(self, text, **style):
+        self.xlabel = text
+        self.stale = True
+
+    def set_ylabel(self, text, **style):
+        self.ylabel = text
+        self.stale = True
+
+    def plot(self, x, y, color, linewidth=0.8, label=None):
+        line = CanvasLine(self, color, linewidth, label)
+        line.set_data(x, y)
+        self.artists.append(line)
+        return [line]
+
+    def fill(self, color, alpha=1.0):
+        area = CanvasFill(self, color, alpha)
+        # fills go under the lines and over earlier fills, like matplotlib's zorder for collections
+        lines = [artist.item for artist in self.artists if isinstance(artist, CanvasLine)]
+        if lines:
+            self.widget.tag_lower(area.item, lines[0])
+        self.artists.append(area)
+        return area
+
+    def legend(self, handles=None, **style):
+        self.show_legend = True
+        self.legend_handles = handles
+        self.stale = True
+
+    # the BlitRenderer calls
+
+    def add_artist(self, artist):
+        return artist  # already drawn by the axes that made it
+
+    def invalidate(self):
+        self.stale = True
+
+    def render(self):
+        if self.stale:
+            self.draw_static()
+        for artist in self.artists:
+            artist.draw()
+        # the legend sits on top of the data, lines added after it was drawn included
+        self.widget.tag_raise("legend")
+
+    def on_resize(self, event):
+        self.bbox = PlotArea(LEFT, TOP, max(event.width - LEFT - RIGHT, 1), max(event.height - TOP - BOTTOM, 1))
+        self.stale = True
+        self.render()
+
+    def place(self, item, x, y):
+        # moves a line or polygon onto new data, hidden while there are fewer than two points
+        finite = np.isfinite(x) & np.isfinite(y)
+        if not finite.all():
+            x, y = x[finite], y[finite]
+        if len(x) < 2:
+            self.widget.itemconfigure(item, state="hidden")
+            return
+        self.widget.coords(item, self.points(x, y))
+        self.widget.itemconfigure(item, state="normal")
+
+    def points(self, x, y):
+        # data to canvas pixels, interleaved for coords(). y is clipped to the plot area like matplotlib does
+        x0, y0, width, height = self.bbox
+        left, right = self.xlim
+        bottom, top = self.ylim
+        pixels = np.empty((len(x), 2))
+        pixels[:, 0] = x0 + (x - left) * (width / ((right - left) or 1))
+        pixels[:, 1] = y0 + height - (np.clip(y, bottom, top) - bottom) * (height / ((top - bottom) or 1))
+        return pixels.ravel().tolist()
+
+    def draw_static(self):
+        self.stale = False
+        canvas = self.widget
+        canvas.delete("static")
+        canvas.delete("legend")
+        x0, y0, width, height = self.bbox
+        left, right = self.xlim
+        bottom, top = self.ylim
+        x_scale = width / ((right - left) or 1)
+        y_scale = height / ((top - bottom) or 1)
+
+        # grid and tick marks at every tick, labels on the y ticks only like the matplotlib charts
+        for tick in self.xticks:
+            if left <= tick <= right:
+                x = x0 + (tick - left) * x_scale
+                canvas.create_line(x, y0, x, y0 + height, fill=self.grid_color, tags="static")
+                canvas.create_line(x, y0 + height, x, y0 + height + TICK_LENGTH, fill="gray", tags="static")
+        yticks = self.yticks if self.yticks is not None else auto_ticks(bottom, top)
+        for position, tick in enumerate(yticks):
+            if bottom <= tick <= top:
+                y = y0 + height - (tick - bottom) * y_scale
+                canvas.create_line(x0, y, x0 + width, y, fill=self.grid_color, tags="static")
+                canvas.create_line(x0 - TICK_LENGTH, y, x0, y, fill="gray", tags="static")
+                canvas.create_text(
+                    x0 - TICK_LENGTH - 2, y, text=self.tick_format(tick, position),
+                    anchor="e", fill="gray", font=TICK_FONT, tags="static",
+                )
+
+        canvas.create_rectangle(x0, y0, x0 + width, y0 + height, outline=self.spine_color, tags="static")
+        canvas.create_text(
+            x0 + width / 2, y0 + height + TICK_LENGTH + 2, text=self.xlabel,
+            anchor="n", fill="gray", font=LABEL_FONT, tags="static",
+        )
+        canvas.create_text(
+            12, y0 + height / 2, text=self.ylabel, angle=90, anchor="center", fill="gray", font=LABEL_FONT, tags="static",
+        )
+
+        if self.show_legend:
+            self.draw_legend()
+
+        canvas.tag_lower("static")
+
+    def draw_legend(self):
+        # upper right, one short line and label per labelled line
+        handles = self.legend_handles
+        if handles is None:
+            handles = [artist for artist in self.artists if isinstance(artist, CanvasLine) and artist.label]
+        if not handles:
+            return
+
+        canvas = self.widget
+        x0, y0, width, _ = self.bbox
+        right = x0 + width - 6
+        y = y0 + 6
+        box = canvas.create_rectangle(0, 0, 0, 0, fill="white", outline="lightgray", tags="legend")
+        texts = []
+        for handle in handles:
+            texts.append(canvas.create_text(right, y, text=handle.get_label(), anchor="ne", font=LEGEND_FONT, tags="legend"))
+            y += 12
+        left = min(canvas.bbox(text)[0] for text in texts) - 22
+
+        for handle, text in zip(handles, texts):
+            middle = (canvas.bbox(text)[1] + canvas.bbox(text)[3]) / 2
+            canvas.create_line(left + 2, middle, left + 18, middle, fill=handle.color, width=2, tags="legend")
+        canvas.coords(box, left - 2, y0 + 3, right + 3, y + 2)
@@ -0,0 +1,139 @@
+import customtkinter as ctk
+
+from chart_renderer import BlitRenderer, figure_canvas
+from collector import StoreFeed
+
+
+class ChartFrame(ctk.CTkFrame):
+    # what every chart frame has in common: the hide/show button over a contents frame, the
+    # time range slider and x axis, and the chart's own canvas or its axes in the shared figure
+    slider_steps = 400
+
+    def __init__(self, parent, name, store, scheduler=None, shared_figure=None, feed=None):
+        super().__init__(parent, fg_color="white")
+
+        self.frame_name = name
+        self.store = store
+        self.feed = feed or StoreFeed(store)  # appends each snapshot to the store before on_sample sees it
+        self.scheduler = scheduler
+        self.shared_figure = shared_figure
+        self.time_range = 60
+        self.time_slider = None
+
+        self.figure = None
+        self.ax = None
+        self.canvas = None
+        self.renderer = None
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=0)
+        self.grid_rowconfigure(1, weight=1)
+
+        # toggle frame info
+        self.is_collapsed = False
+        self.toggle_button = ctk.CTkButton(
+            self,
+            text=f"Hide {name} Frame",
+            command=self.toggle_frame,
+            width=100,
+            fg_color="blue",
+            text_color="white",
+        )
+        self.toggle_button.grid(row=0, column=0, sticky="nw", padx=10, pady=5)
+
+        # contains the frame contents, the subclass lays out its labels and chart in it
+        self.contents_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.contents_frame.grid(row=1, column=0, sticky="nsew")
+
+    def attach_plot(self, artists, blit=True):
+        # in the shared layout the one figure is every chart's canvas and renderer
+        if self.shared_figure is not None:
+            self.canvas = self.renderer = self.shared_figure
+        else:
+            self.canvas = figure_canvas(self.figure, self.contents_frame)
+            # only the artists change between ticks, everything else is blitted from a cached background
+            self.renderer = BlitRenderer(self.canvas, blit=blit)
+        for artist in artists:
+            self.renderer.add_artist(artist)
+
+    def show_chart(self, row, slider=True):
+        # the shared figure has one time axis, only the shared time range control moves it
+        if self.shared_figure is not None:
+            return
+        self.canvas.get_tk_widget().grid(row=row, column=0, columnspan=2, sticky="nsew", padx=10, pady=10)
+        if slider:
+            self.create_slider()
+
+    def create_slider(self):
+        # slider frame
+        slider_frame = ctk.CTkFrame(self.contents_frame, fg_color="transparent")
+        slider_frame.grid(row=0, column=1, rowspan=2, sticky="ne", padx=10, pady=5)
+
+        # slider label
+        slider_label = ctk.CTkLabel(slider_frame, text="Select Time Range (minutes):", text_color="black")
+        slider_label.pack(anchor="e", pady=5)
+
+        # 1 min label
+        min_label = ctk.CTkLabel(slider_frame, text="1", text_color="gray")
+        min_label.pack(side="left", padx=5)
+
+        # init the slider
+        self.time_slider = ctk.CTkSlider(
+            slider_frame, from_=60, to=3600, number_of_steps=self.slider_steps, command=self.update_time_range
+        )
+        self.time_slider.set(60)  # Default to 60 seconds (1 minute)
+        self.time_slider.pack(side="left", padx=5)
+
+        # 60 mins label
+        max_label = ctk.CTkLabel(slider_frame, text="60", text_color="gray")
+        max_label.pack(side="right", padx=5)
+
+    # command for slider increments
+    def update_time_range(self, value):
+        # dragging renders drafts at most once per frame, the scheduler follows up with a full one
+        if self.set_time_range(value):
+            self.request_redraw(draft=True)
+
+    # also driven by the shared time range control, which redraws every chart in one pass
+    def set_time_range(self, value):
+        time_range = int(float(value))
+        if time_range == self.time_range:
+            return False
+        self.time_range = time_range
+        self.update_time_axis()
+        return True
+
+    def request_redraw(self, draft=False):
+        if self.scheduler is None:
+            self.update_plot()
+        else:
+            self.scheduler.request(self, draft)
+
+    # limits, ticks and label only change with the time range, not every tick
+    def update_time_axis(self):
+        self.ax.set_xlim(0, self.time_range)
+        self.ax.set_xlabel(f"Last {self.time_range//60} minute(s)", color="gray", fontsize=10)
+
+        step = max(1, self.time_range // 20)
+        ticks = list(range(0, self.time_range + 1, step))
+        self.ax.set_xticks(ticks)
+
+        self.renderer.invalidate()
+
+    def toggle_frame(self):
+        if self.is_collapsed:
+            self.contents_frame.grid()
+            self.configure(fg_color="white")
+            self.toggle_button.configure(text=f"Hide {self.frame_name} Frame")
+        else:
+            self.contents_frame.grid_remove()
+            self.configure(fg_color="transparent")
+            self.toggle_button.configure(text=f"Show {self.frame_name} Frame")
+
+        self.is_collapsed = not self.is_collapsed
+        if self.shared_figure is not None:
+            self.shared_figure.set_visible(self.ax, not self.is_collapsed)
+
+        # rendering was suspended while collapsed, catch up with one redraw
+        if not self.is_collapsed:
+            self.update_plot()
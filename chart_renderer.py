@@ -0,0 +1,173 @@
+import math
+
+import numpy as np
+
+
+def nice_limit(value):
+    # smallest 1-2-5 step above value with 10% headroom, at least 1, for auto-scaled axes
+    target = max(value * 1.1, 1.0)
+    magnitude = 10 ** math.floor(math.log10(target))
+    for step in (1, 2, 5, 10):
+        if step * magnitude >= target:
+            return step * magnitude
+
+
+def chart_figure():
+    # matplotlib is only imported by frames that draw with it, see canvas_chart.py for the other way
+    from matplotlib.figure import Figure
+
+    return Figure(figsize=(7, 2), dpi=90)
+
+
+def figure_canvas(figure, parent):
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+    return FigureCanvasTkAgg(figure, parent)
+
+
+def chart_axes(name, shared_figure=None):
+    # (figure, axes) of a chart, a figure of its own or its cell of the shared figure
+    if shared_figure is not None:
+        return shared_figure.figure, shared_figure.add_subplot(name)
+    figure = chart_figure()
+    return figure, figure.add_subplot(111)
+
+
+class BlitRenderer:
+    # caches the static parts of a figure (axes, ticks, grid, labels, legend) and only
+    # redraws the animated artists on top of them each tick
+    def __init__(self, canvas, blit=True):
+        self.canvas = canvas
+        self.figure = canvas.figure
+        self.blit = blit
+        self.artists = []
+
+        self.background = None
+        self.background_size = None
+
+        # every full draw (first show, resize, invalidate) recaptures the background
+        self.canvas.mpl_connect("draw_event", self.on_draw)
+
+    def add_artist(self, artist):
+        artist.set_animated(self.blit)
+        self.artists.append(artist)
+        return artist
+
+    def invalidate(self):
+        # the static parts changed (limits, ticks, labels), next render is a full draw
+        self.background = None
+
+    def figure_size(self):
+        bbox = self.figure.bbox
+        return int(bbox.width), int(bbox.height)
+
+    def on_draw(self, event):
+        if not self.blit:
+            return
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self.background_size = self.figure_size()
+        self.draw_artists()
+
+    def draw_artists(self):
+        for artist in self.artists:
+            # a collapsed chart's axes is hidden in the shared figure, and its lines with it
+            if artist.axes.get_visible():
+                self.figure.draw_artist(artist)
+
+    def render(self):
+        if not self.blit or self.background is None or self.background_size != self.figure_size():
+            self.canvas.draw()
+            return
+
+        self.canvas.restore_region(self.background)
+        self.draw_artists()
+        self.canvas.blit(self.figure.bbox)
+
+
+class SharedFigure:
+    # every chart as an axes of one figure: one Agg buffer, one PhotoImage and one draw per
+    # tick instead of one of each per chart. cells are the (row, column) of each chart in the
+    # figure's grid, and every axes shares the time axis so the charts stay lined up. it is
+    # the canvas and the renderer of each chart in it, render() only queues the draw, so all
+    # the charts a redraw pass updates land in the same one
+    def __init__(self, parent, cells, blit=True):
+        from matplotlib.figure import Figure
+
+        rows = max(row for row, _ in cells.values()) + 1
+        columns = max(column for _, column in cells.values()) + 1
+        self.figure = Figure(figsize=(7 * columns, 2 * rows), dpi=90)
+        self.figure.subplots_adjust(left=0.05, right=0.99, bottom=0.1, top=0.97, wspace=0.25, hspace=0.35)
+        self.grid = self.figure.add_gridspec(rows, columns)
+        self.cells = cells
+        self.time_axes = None  # the first axes added, the others share its x axis
+
+        self.canvas = figure_canvas(self.figure, parent)
+        self.renderer = BlitRenderer(self.canvas, blit=blit)
+        self.pending = None
+
+    def get_tk_widget(self):
+        return self.canvas.get_tk_widget()
+
+    def add_subplot(self, name):
+        row, column = self.cells[name]
+        ax = self.figure.add_subplot(self.grid[row, column], sharex=self.time_axes)
+        if self.time_axes is None:
+            self.time_axes = ax
+        return ax
+
+    def add_artist(self, artist):
+        return self.renderer.add_artist(artist)
+
+    def invalidate(self):
+        self.renderer.invalidate()
+
+    def render(self):
+        # drawn once tk is idle, after every chart of the current pass has set its data
+        if self.pending is None:
+            self.pending = self.get_tk_widget().after_idle(self.draw)
+
+    def draw(self):
+        self.pending = None
+        self.renderer.render()
+
+    def set_visible(self, ax, visible):
+        # a collapsed chart leaves a gap instead of lines that stopped updating
+        ax.set_visible(visible)
+        self.renderer.invalidate()
+        self.render()
+
+
+class AreaFill:
+    # the fill under a line (or between two lines), its polygon vertices are rewritten
+    # in place each tick instead of removing and rebuilding the fill_between collection
+    def __init__(self, ax, **kwargs):
+        self.collection = ax.fill_between([0, 0], [0, 0], **kwargs)
+
+    def set_data(self, x, y, lower=None):
+        count = len(x)
+        if count == 0:
+            self.collection.set_verts([])
+            return
+
+        # polygon is either baseline start, the samples, baseline end or the upper edge
+        # forwards and the lower edge backwards, plus the closing vertex in both cases
+        size = count + 2 if lower is None else count * 2
+        paths = self.collection.get_paths()
+        if paths and len(paths[0].vertices) == size + 1:
+            vertices = paths[0].vertices
+        else:
+            self.collection.set_verts([np.zeros((size, 2))])
+            vertices = self.collection.get_paths()[0].vertices
+
+        if lower is None:
+            vertices[0] = (x[0], 0)
+            vertices[1:count + 1, 0] = x
+            vertices[1:count + 1, 1] = y
+            vertices[count + 1] = (x[-1], 0)
+        else:
+            vertices[:count, 0] = x
+            vertices[:count, 1] = y
+            vertices[count:size, 0] = x[::-1]
+            vertices[count:size, 1] = lower[::-1]
+        vertices[size] = vertices[0]
+        self.collection.stale = True
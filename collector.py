@@ -0,0 +1,232 @@
+# turns raw sampler snapshots into the derived values the charts, history and headless output share
+import os
+from collections import namedtuple
+
+import numpy as np
+
+BITS_PER_MEGABIT = 1_000_000  # SI megabits, like link speeds are quoted in
+BYTES_PER_MEGABYTE = 1_000_000
+COUNTER_WRAP = 2 ** 32
+
+
+def is_loopback(interface):
+    return interface == "lo" or interface.lower().startswith("loopback")
+
+
+def counter_delta(current, previous):
+    # psutil already unwraps counters it saw wrap (nowrap=True), this covers 32-bit counters
+    # that wrapped between two readings. anything else going backwards is a reset, e.g. a
+    # driver reload, and gives None so that reading is skipped
+    if current >= previous:
+        return current - previous
+    if previous < COUNTER_WRAP:
+        return current + COUNTER_WRAP - previous
+    return None
+
+
+class NetworkThroughput:
+    # upload/download rate summed over a set of interfaces, None meaning every interface but
+    # loopback. rates are divided by the monotonic time between the two readings
+    def __init__(self, interfaces=None):
+        self.interfaces = frozenset(interfaces) if interfaces else None
+        self.previous = {}
+        self.previous_time = None
+
+    def select(self, interfaces):
+        self.interfaces = frozenset(interfaces) if interfaces else None
+
+    def includes(self, interface):
+        if self.interfaces is None:
+            return not is_loopback(interface)
+        return interface in self.interfaces
+
+    def rates(self, reading):
+        # {interface: (upload_mbps, download_mbps)} of every interface seen in both readings
+        previous, previous_time = self.previous, self.previous_time
+        self.previous, self.previous_time = reading.counters, reading.monotonic
+        if previous_time is None or reading.monotonic <= previous_time:
+            return {}
+        elapsed = reading.monotonic - previous_time
+
+        rates = {}
+        for interface, counters in reading.counters.items():
+            last = previous.get(interface)
+            if last is None:
+                continue
+            upload_bytes = counter_delta(counters.bytes_sent, last.bytes_sent)
+            download_bytes = counter_delta(counters.bytes_recv, last.bytes_recv)
+            if upload_bytes is None or download_bytes is None:
+                continue
+            rates[interface] = (
+                upload_bytes * 8 / elapsed / BITS_PER_MEGABIT,
+                download_bytes * 8 / elapsed / BITS_PER_MEGABIT,
+            )
+        return rates
+
+    def update(self, reading):
+        # (upload_mbps, download_mbps) of the selected interfaces, or None until two readings are available
+        return self.total(self.rates(reading))
+
+    def total(self, rates):
+        # the selected interfaces of a rates() result, summed
+        selected = [rate for interface, rate in rates.items() if self.includes(interface)]
+        if not selected:
+            return None
+        return sum(rate[0] for rate in selected), sum(rate[1] for rate in selected)
+
+
+# per-device rates of one pair of disk readings, every field an array in `devices` order.
+# read/write in SI megabytes per second, utilization is the busy-time % or nan where unsupported
+DiskRates = namedtuple("DiskRates", ["devices", "read_mbps", "write_mbps", "iops", "utilization"])
+
+# loop and ram devices aren't storage, partitions are already counted in their disk
+IGNORED_DISK_PREFIXES = ("loop", "ram", "zram")
+SYS_BLOCK = "/sys/class/block"  # linux has a "partition" file in the directory of every partition
+
+
+def mounted_partitions():
+    # where there is no /sys, the devices psutil lists as mounted partitions
+    import psutil
+
+    return {os.path.basename(partition.device) for partition in psutil.disk_partitions()}
+
+
+def storage_devices(names, sys_block=SYS_BLOCK):
+    # the whole disks among perdisk counter names. names can't tell them apart, nvme0n10 and
+    # dm-10 are devices of their own, not partitions of nvme0n1 and dm-1
+    if os.path.isdir(sys_block):
+        partitions = {name for name in names if os.path.exists(os.path.join(sys_block, name, "partition"))}
+    else:
+        partitions = mounted_partitions()
+    return tuple(name for name in names if not name.startswith(IGNORED_DISK_PREFIXES) and name not in partitions)
+
+
+class DiskThroughput:
+    # per-device throughput, iops and utilization from consecutive perdisk counters. counters
+    # are packed into one array per reading so the rates of every device come out of a
+    # handful of numpy operations, whatever the number of devices
+    def __init__(self):
+        self.names = None
+        self.devices = ()
+        self.columns = None
+        self.previous = None
+        self.previous_time = None
+
+    def update(self, reading):
+        # DiskRates, or None until two readings with the same devices are available
+        counters = reading.counters
+        if not counters:
+            return None
+
+        # the device list and field columns only change when devices come or go
+        names = tuple(counters)
+        if names != self.names:
+            self.names = names
+            self.devices = storage_devices(names)
+            fields = type(counters[names[0]])._fields
+            self.columns = [fields.index(field) for field in ("read_bytes", "write_bytes", "read_count", "write_count")]
+            self.columns.append(fields.index("busy_time") if "busy_time" in fields else None)
+            self.previous = None
+        if not self.devices:
+            return None
+
+        current = np.array([counters[device] for device in self.devices], dtype=np.float64).reshape(len(self.devices), -1)
+        previous, previous_time = self.previous, self.previous_time
+        self.previous, self.previous_time = current, reading.monotonic
+        if previous is None or reading.monotonic <= previous_time:
+            return None
+        elapsed = reading.monotonic - previous_time
+
+        # counters only go backwards when a device is reset, count that reading as idle
+        delta = np.maximum(current - previous, 0)
+        read_bytes, write_bytes, read_count, write_count, busy_time = self.columns
+        if busy_time is None:
+            utilization = np.full(len(self.devices), np.nan)
+        else:
+            # busy_time is in milliseconds
+            utilization = np.minimum(delta[:, busy_time] / (elapsed * 10), 100)
+
+        return DiskRates(
+            self.devices,
+            delta[:, read_bytes] / elapsed / BYTES_PER_MEGABYTE,
+            delta[:, write_bytes] / elapsed / BYTES_PER_MEGABYTE,
+            (delta[:, read_count] + delta[:, write_count]) / elapsed,
+            utilization,
+        )
+
+
+def gpu_device_series(index, device_count):
+    # the series a chart draws for one gpu. a single gpu's load is also the busiest-device
+    # series, the one history_storage keeps, so its line picks up the history restored from disk
+    return "gpu" if device_count == 1 else f"gpu.{index}"
+
+
+def record_fields(values, network_total):
+    # flat record of one snapshot's values, keyed like history_storage.RECORD_FIELDS
+    upload, download = network_total if network_total is not None else (None, None)
+    devices = values.get("gpu")
+    return {
+        "cpu": values.get("cpu"),
+        "memory": values.get("memory"),
+        "upload": upload,
+        "download": download,
+        "gpu": max((device.load for device in devices), default=0) if devices is not None else None,
+    }
+
+
+def snapshot_record(snapshot, network_throughput):
+    reading = snapshot.values.get("network")
+    return record_fields(snapshot.values, network_throughput.update(reading) if reading is not None else None)
+
+
+class StoreFeed:
+    # appends one snapshot to every store series the charts, the alert rules and the history
+    # read. the dashboard and the headless collector both feed their store through here, so a
+    # rule on any series fires in either. the rates of the last snapshot are kept for the
+    # frames' labels, None when it brought none
+    def __init__(self, store, interfaces=None):
+        self.store = store
+        self.network = NetworkThroughput(interfaces)
+        self.disk = DiskThroughput()
+
+        self.network_total = None  # (upload_mbps, download_mbps) of the selected interfaces
+        self.disk_rates = None
+
+    def append(self, snapshot):
+        store = self.store
+        values = snapshot.values
+        timestamp = snapshot.timestamp
+
+        for name in ("cpu", "memory"):
+            if values.get(name) is not None:
+                store.append(name, timestamp, values[name])
+        cores = values.get("cpu_cores")
+        if cores:
+            store.matrix("cpu_cores", len(cores)).append(timestamp, cores)
+
+        self.network_total = None
+        reading = values.get("network")
+        if reading is not None:
+            self.network_total = self.network.update(reading)
+            if self.network_total is not None:
+                store.append("network.upload", timestamp, self.network_total[0])
+                store.append("network.download", timestamp, self.network_total[1])
+
+        devices = values.get("gpu")
+        if devices is not None:
+            for device in devices:
+                store.append(f"gpu.{device.index}", timestamp, device.load)
+            store.append("gpu", timestamp, max((device.load for device in devices), default=0))
+
+        self.disk_rates = None
+        reading = values.get("disk")
+        if reading is not None:
+            self.disk_rates = rates = self.disk.update(reading)
+            if rates is not None:
+                store.append("disk.read", timestamp, float(rates.read_mbps.sum()))
+                store.append("disk.write", timestamp, float(rates.write_mbps.sum()))
+                store.matrix("disk.utilization", len(rates.devices), labels=rates.devices).append(timestamp, np.nan_to_num(rates.utilization))
+
+    def record(self, snapshot):
+        # the history record of the snapshot last appended
+        return record_fields(snapshot.values, self.network_total)
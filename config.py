@@ -0,0 +1,303 @@
+# dashboard settings kept in one json file, read at startup and re-read whenever it changes:
+#   {
+#     "thresholds": {"cpu": 90, "gpu": 100, "memory": 95},
+#     "sample_interval": 1.0,
+#     "sample_intervals": {"cpu": 0.5, "filesystems": 30},
+#     "adaptive": ["cpu"],
+#     "time_range": 300,
+#     "frames": ["cpu", "network", "memory", "processes"],
+#     "renderers": {"cpu": "canvas", "memory": "canvas"},
+#     "layout": "frames",
+#     "rules": [{"name": "cpu sustained", "metric": "cpu", "stat": "mean", "window": 60, "threshold": 90}],
+#     "export": "127.0.0.1:9101",
+#     "fleet": ["node-01:7010", "node-02:7010", "unix:/run/dashboard-agent.sock"],
+#     "bus": "system_dashboard"
+#   }
+# every key is optional, missing ones keep their defaults. the same file can be copied to
+# every machine, the headless collector reads it too with --config
+import json
+import os
+import time
+
+from alert_rules import AlertRule, validate_rule
+from alerts import DEFAULT_RULES
+from exporter import parse_address
+from metrics_bus import check_name
+from sampler import MAX_INTERVAL, MIN_INTERVAL
+
+CONFIG_PATH = os.environ.get("DASHBOARD_CONFIG", "~/.system_dashboard/config.json")
+
+METRICS = ("cpu", "cpu_cores", "memory", "network", "disk", "filesystems", "gpu")
+THRESHOLD_METRICS = ("cpu", "gpu", "memory")
+FRAMES = ("cpu", "network", "gpu", "memory", "disk", "processes")
+CHART_FRAMES = ("cpu", "network", "gpu", "memory", "disk")
+RENDERERS = ("matplotlib", "canvas")  # canvas draws with tk items and never imports matplotlib
+LAYOUTS = ("frames", "shared")  # shared draws every chart in one matplotlib figure, see SharedFigure
+MIN_TIME_RANGE = 60
+MAX_TIME_RANGE = 3600
+
+DEFAULT_CONFIG = {
+    "thresholds": {"cpu": 100, "gpu": 100, "memory": 100},
+    "sample_interval": 1.0,
+    "sample_intervals": {
+        "cpu": 0.5,
+        "cpu_cores": 1.0,
+        "memory": 2.0,
+        "network": 1.0,
+        "disk": 1.0,
+        "filesystems": 30.0,
+        "gpu": 1.0,
+    },
+    "adaptive": ["cpu"],
+    "time_range": 60,
+    "frames": list(FRAMES),
+    "renderers": {},  # frame: renderer, frames left out use matplotlib
+    "layout": "frames",  # the shared layout ignores renderers, every chart is an axes of its figure
+    "rules": list(DEFAULT_RULES),
+    "export": None,  # HOST:PORT or unix:PATH to serve the metrics on, see exporter.py
+    "fleet": [],  # agents (agent.py) to show in the fleet window, same address format
+    "bus": None,  # shared memory segment name, dashboards using the same one sample once, see metrics_bus.py
+}
+
+
+class ConfigError(ValueError):
+    pass
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def validate_threshold(metric, value):
+    # also what the alerts panel checks its entries with, None turns the alert off
+    if metric not in THRESHOLD_METRICS:
+        raise ConfigError(f"thresholds: unknown metric {metric!r}, expected one of {', '.join(THRESHOLD_METRICS)}")
+    if value is None:
+        return None
+    if not is_number(value) or not 0 <= value <= 100:
+        raise ConfigError(f"thresholds.{metric}: expected a percentage from 0 to 100, got {value!r}")
+    return float(value)
+
+
+def validate_interval(key, value):
+    if not is_number(value) or not MIN_INTERVAL <= value <= MAX_INTERVAL:
+        raise ConfigError(f"{key}: expected {MIN_INTERVAL:g} to {MAX_INTERVAL:g} seconds, got {value!r}")
+    return float(value)
+
+
+def validate_names(key, value, allowed):
+    if not isinstance(value, list) or not all(isinstance(name, str) for name in value):
+        raise ConfigError(f"{key}: expected a list of names")
+    unknown = [name for name in value if name not in allowed]
+    if unknown:
+        raise ConfigError(f"{key}: unknown {', '.join(map(repr, unknown))}, expected some of {', '.join(allowed)}")
+    return [name for name in allowed if name in value]
+
+
+def validate_rules(value):
+    if not isinstance(value, list):
+        raise ConfigError("rules: expected a list of rules")
+
+    rules = []
+    for position, fields in enumerate(value):
+        key = f"rules[{position}]"
+        if not isinstance(fields, dict):
+            raise ConfigError(f"{key}: expected an object")
+        unknown = set(fields) - set(AlertRule._fields)
+        if unknown:
+            raise ConfigError(f"{key}: unknown field(s) {', '.join(sorted(unknown))}")
+        if not isinstance(fields.get("name"), str) or not isinstance(fields.get("metric"), str):
+            raise ConfigError(f"{key}: name and metric are required")
+        for field in ("stat", "op"):
+            if field in fields and not isinstance(fields[field], str):
+                raise ConfigError(f"{key}.{field}: expected a string, got {fields[field]!r}")
+        for field in ("window", "threshold", "clear", "sustain"):
+            if field in fields and not is_number(fields[field]) and not (field == "clear" and fields[field] is None):
+                raise ConfigError(f"{key}.{field}: expected a number, got {fields[field]!r}")
+
+        rule = AlertRule(**fields)
+        try:
+            validate_rule(rule)
+        except ValueError as e:
+            raise ConfigError(f"{key}: {e}") from None
+        rules.append(rule)
+    return rules
+
+
+def validate_config(raw):
+    # the full config, defaults filled in, or ConfigError naming the first bad key
+    if not isinstance(raw, dict):
+        raise ConfigError("expected a json object at the top level")
+    unknown = set(raw) - set(DEFAULT_CONFIG)
+    if unknown:
+        raise ConfigError(f"unknown key(s) {', '.join(sorted(unknown))}")
+
+    config = default_config()
+
+    thresholds = raw.get("thresholds", {})
+    if not isinstance(thresholds, dict):
+        raise ConfigError("thresholds: expected an object of metric: percentage")
+    for metric, value in thresholds.items():
+        config["thresholds"][metric] = validate_threshold(metric, value)
+
+    if "sample_interval" in raw:
+        config["sample_interval"] = validate_interval("sample_interval", raw["sample_interval"])
+
+    intervals = raw.get("sample_intervals", {})
+    if not isinstance(intervals, dict):
+        raise ConfigError("sample_intervals: expected an object of metric: seconds")
+    for metric, value in intervals.items():
+        if metric not in METRICS:
+            raise ConfigError(f"sample_intervals: unknown metric {metric!r}, expected one of {', '.join(METRICS)}")
+        config["sample_intervals"][metric] = validate_interval(f"sample_intervals.{metric}", value)
+
+    if "adaptive" in raw:
+        config["adaptive"] = validate_names("adaptive", raw["adaptive"], METRICS)
+
+    if "time_range" in raw:
+        time_range = raw["time_range"]
+        if not is_number(time_range) or not MIN_TIME_RANGE <= time_range <= MAX_TIME_RANGE:
+            raise ConfigError(f"time_range: expected {MIN_TIME_RANGE} to {MAX_TIME_RANGE} seconds, got {time_range!r}")
+        config["time_range"] = int(time_range)
+
+    if "frames" in raw:
+        config["frames"] = validate_names("frames", raw["frames"], FRAMES)
+
+    renderers = raw.get("renderers", {})
+    if not isinstance(renderers, dict):
+        raise ConfigError("renderers: expected an object of frame: renderer")
+    for frame, renderer in renderers.items():
+        if frame not in CHART_FRAMES:
+            raise ConfigError(f"renderers: unknown frame {frame!r}, expected one of {', '.join(CHART_FRAMES)}")
+        if renderer not in RENDERERS:
+            raise ConfigError(f"renderers.{frame}: expected one of {', '.join(RENDERERS)}, got {renderer!r}")
+        config["renderers"][frame] = renderer
+
+    if "layout" in raw:
+        if raw["layout"] not in LAYOUTS:
+            raise ConfigError(f"layout: expected one of {', '.join(LAYOUTS)}, got {raw['layout']!r}")
+        config["layout"] = raw["layout"]
+
+    if "rules" in raw:
+        config["rules"] = validate_rules(raw["rules"])
+
+    export = raw.get("export")
+    if export is not None:
+        if not isinstance(export, str):
+            raise ConfigError(f"export: expected HOST:PORT or unix:PATH, got {export!r}")
+        try:
+            parse_address(export)
+        except ValueError as e:
+            raise ConfigError(f"export: {e}") from None
+        config["export"] = export
+
+    if "fleet" in raw:
+        fleet = raw["fleet"]
+        if not isinstance(fleet, list) or not all(isinstance(address, str) for address in fleet):
+            raise ConfigError("fleet: expected a list of HOST:PORT or unix:PATH addresses")
+        for position, address in enumerate(fleet):
+            try:
+                parse_address(address)
+            except ValueError as e:
+                raise ConfigError(f"fleet[{position}]: {e}") from None
+        config["fleet"] = list(dict.fromkeys(fleet))
+
+    bus = raw.get("bus")
+    if bus is not None:
+        try:
+            config["bus"] = check_name(bus)
+        except ValueError as e:
+            raise ConfigError(f"bus: {e}") from None
+
+    return config
+
+
+def default_config():
+    config = dict(DEFAULT_CONFIG)
+    for key in ("thresholds", "sample_intervals", "renderers"):
+        config[key] = dict(DEFAULT_CONFIG[key])
+    for key in ("adaptive", "frames", "rules", "fleet"):
+        config[key] = list(DEFAULT_CONFIG[key])
+    return config
+
+
+def load_config(path=CONFIG_PATH):
+    # a missing file is the default config, anything unreadable or invalid is a ConfigError
+    path = os.path.expanduser(path)
+    try:
+        with open(path) as f:
+            raw = json.load(f)
+    except FileNotFoundError:
+        return default_config()
+    except (OSError, ValueError) as e:
+        raise ConfigError(f"{path}: {e}") from None
+
+    try:
+        return validate_config(raw)
+    except ConfigError as e:
+        raise ConfigError(f"{path}: {e}") from None
+
+
+def save_config(config, path=CONFIG_PATH):
+    path = os.path.expanduser(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    data = dict(config)
+    data["rules"] = [rule._asdict() for rule in config["rules"]]
+
+    # written next to the file and renamed over it, so a watcher never reads half of it
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+    os.replace(temporary, path)
+
+
+def interval_changes(previous, config):
+    # (metric, interval, adaptive) for every metric whose sampling differs between two configs
+    def sampling(config, metric):
+        interval = config["sample_intervals"].get(metric, config["sample_interval"])
+        return interval, metric in config["adaptive"]
+
+    return [
+        (metric,) + sampling(config, metric)
+        for metric in METRICS
+        if sampling(previous, metric) != sampling(config, metric)
+    ]
+
+
+class ConfigWatcher:
+    # hot reload without polling storms: check() can be called every ui tick but only stats the
+    # file every `every` seconds, and only reads and parses it when its mtime, size or inode moved
+    def __init__(self, path=CONFIG_PATH, every=2.0):
+        self.path = os.path.expanduser(path)
+        self.every = every
+        self.signature = self.stat()
+        self.next_check = time.monotonic() + every
+
+    def stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def saved(self):
+        # our own writes aren't reloaded
+        self.signature = self.stat()
+
+    def check(self):
+        # the new config when the file changed, None otherwise, ConfigError when it's invalid.
+        # a deleted file keeps the running config
+        now = time.monotonic()
+        if now < self.next_check:
+            return None
+        self.next_check = now + self.every
+
+        signature = self.stat()
+        if signature == self.signature:
+            return None
+        self.signature = signature
+        if signature is None:
+            return None
+        return load_config(self.path)
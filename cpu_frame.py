@@ -1,100 +1,55 @@
 import customtkinter as ctk
-import psutil
-import platform
-import os
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
+import math
+import numpy as np
 
+from canvas_chart import CanvasAxes
+from chart_frame import ChartFrame
+from chart_renderer import AreaFill, chart_axes
+from hardware_info import PENDING_CPU_INFO
+from lod import LevelOfDetail
+from redraw_scheduler import DRAFT_DETAIL
 
 darker_lightblue = "#4682B4"
 
-def get_cpu_info():
-    # determine cpu name by going into
-    cpu_name = None
-    if platform.system() == "Windows":
-        from winreg import OpenKey, QueryValueEx, HKEY_LOCAL_MACHINE
-        try:
-            registry_key = OpenKey(HKEY_LOCAL_MACHINE, r"HARDWARE\DESCRIPTION\System\CentralProcessor\0") #get reference to first cpu registry key location
-            cpu_name, reg = QueryValueEx(registry_key, "ProcessorNameString") #retrieve value of ProcessorNameString from the key to get the cpu name
-        except Exception as e:
-            cpu_name = "Unknown CPU"
-    elif platform.system() == "Linux":
-        try:
-            with open("/proc/cpuinfo", "r") as f:
-                for line in f:
-                    if "model name" in line:
-                        cpu_name = line.split(":")[1].strip()
-                        break
-        except Exception:
-            cpu_name = "Unknown CPU"
-
-    #get core counts
-    cores = psutil.cpu_count(logical=False)
-    logical_cores = psutil.cpu_count(logical=True)
-
-    return {
-        "cpu_name": cpu_name,
-        "cores": cores,
-        "logical_cores": logical_cores,
-    }
-
-
-class CPUFrame(ctk.CTkFrame):
-    def __init__(self, parent):
-        super().__init__(parent, fg_color="white")
-
-        self.grid_columnconfigure(0, weight=1)
-        self.grid_rowconfigure(0, weight=0)
-        self.grid_rowconfigure(1, weight=1)
-
-        # toggle cpu frame info
-        self.is_collapsed = False
-        self.toggle_button = ctk.CTkButton(
-            self,
-            text="Hide CPU Frame",
-            command=self.toggle_cpu_frame,
-            width=100,
-            fg_color="blue",
-            text_color="white",
-        )
-        self.toggle_button.grid(row=0, column=0, sticky="nw", padx=10, pady=5)
+class CPUFrame(ChartFrame):
+    slider_steps = 60
+
+    def __init__(self, parent, store, blit=True, cpu_info=None, scheduler=None, renderer="matplotlib", shared_figure=None, feed=None):
+        super().__init__(parent, "CPU", store, scheduler, shared_figure, feed)
 
-        #contains the container for cpu frame contents
-        self.contents_frame = ctk.CTkFrame(self, fg_color="transparent")
         self.contents_frame.grid_columnconfigure(0, weight=1)
         self.contents_frame.grid_columnconfigure(1, weight=0)
         self.contents_frame.grid_rowconfigure(5, weight=1)
-        self.contents_frame.grid(row=1, column=0, columnspan=2, sticky="nsew")
 
-
-        # get info about the cpu
-        cpu_info = get_cpu_info()
+        # cpu info is probed in the background at startup, see set_cpu_info
         self.cpu_usage_text = None
         self.cpu_label = None
         self.cpu_usage_label = None
         self.cpu_name_label = None
         self.cpu_core_label = None
-        self.create_cpu_labels(cpu_info)
+        self.per_core_switch = None
+        self.create_cpu_labels(cpu_info or PENDING_CPU_INFO)
 
         # cpu usage
-        self.time_range = 60
-        self.cpu_usage_data = [0] * 3600
+        self.cpu_usage_data = store.series("cpu")
+        self.cpu_lod = LevelOfDetail(store.history_seconds)
+
+        # cores x time history for the per-core heatmap, sized by the first per-core sample
+        self.per_core = False
+        self.cpu_core_data = None
 
         # create theplot
-        self.figure = None
-        self.ax = None
         self.line = None
         self.fill_area = None
-        self.create_plot()
-
-        #create the timeline slider
-        self.time_slider = None
-        self.create_slider()
-
-        self.canvas = FigureCanvasTkAgg(self.figure, self.contents_frame)
-        self.canvas.get_tk_widget().grid(row=5, column=0, columnspan=2,  sticky="nsew", padx=10, pady=10)
+        if renderer == "canvas":
+            self.create_canvas_plot()
+            self.per_core_switch.grid_remove()  # the heatmap needs matplotlib
+        else:
+            self.create_plot()
+            self.attach_plot([self.line, self.fill_area.collection, self.envelope.collection, self.heatmap], blit)
 
-        self.update()
+        # the chart and the timeline slider
+        self.show_chart(row=5)
 
     def create_cpu_labels(self, cpu_info):
         # title label
@@ -130,14 +85,27 @@ class CPUFrame(ctk.CTkFrame):
             text_color="gray",
         )
 
+        # per-core heatmap toggle, next to the core count
+        self.per_core_switch = ctk.CTkSwitch(
+            self.contents_frame,
+            text="Per-core",
+            command=self.toggle_per_core,
+            font=("Segoe UI", 13, "italic"),
+            text_color="gray",
+        )
+
         self.cpu_label.grid(row=0, column=0, sticky="nw", padx=10, pady=10)
         self.cpu_usage_label.grid(row=1, column=0, columnspan = 1, sticky="nw", padx=10, pady=5)
         self.cpu_name_label.grid(row=2, column=0, columnspan = 2,sticky="nw", padx=10, pady=5)
-        self.cpu_core_label.grid(row=3, column=0, columnspan = 2,sticky="nw", padx=10, pady=5)
+        self.cpu_core_label.grid(row=3, column=0, columnspan = 1,sticky="nw", padx=10, pady=5)
+        self.per_core_switch.grid(row=3, column=1, sticky="ne", padx=10, pady=5)
+
+    def set_cpu_info(self, cpu_info):
+        self.cpu_name_label.configure(text=f"{cpu_info['cpu_name']}")
+        self.cpu_core_label.configure(text=f"Cores: {cpu_info['cores']}, {cpu_info['logical_cores']} logical")
 
     def create_plot(self):
-        self.figure = Figure(figsize=(7, 2), dpi=90)
-        self.ax = self.figure.add_subplot(111)
+        self.figure, self.ax = chart_axes("cpu", self.shared_figure)
 
         # init the axes
         self.ax.set_facecolor("white")
@@ -163,82 +131,118 @@ class CPUFrame(ctk.CTkFrame):
 
         # init the line and fill
         self.line, = self.ax.plot([0] * 60, color=darker_lightblue, linewidth=0.8)
-        self.fill_area = self.ax.fill_between(range(self.time_range), [0] * self.time_range, color="lightblue", alpha=0.3)
+        self.fill_area = AreaFill(self.ax, color="lightblue", alpha=0.3)
+
+        # one image for every core, its pixels are replaced in place so cost doesn't grow per core
+        self.heatmap = self.ax.imshow(
+            np.zeros((1, 1)),
+            aspect="auto",
+            origin="lower",
+            cmap="Blues",
+            vmin=0,
+            vmax=100,
+            interpolation="nearest",
+            extent=(0, self.time_range, 0, 1),
+            visible=False,
+        )
 
-    def create_slider(self):
-        # slider frame
-        slider_frame = ctk.CTkFrame(self.contents_frame, fg_color="transparent")
-        slider_frame.grid(row=0, column=1, rowspan=2, sticky="ne", padx=10, pady=5)
+        # min/max band of each bucket so spikes stay visible on long time ranges
+        self.envelope = AreaFill(self.ax, color=darker_lightblue, alpha=0.25, linewidth=0)
 
-        # slider label
-        slider_label = ctk.CTkLabel(slider_frame, text="Select Time Range (minutes):", text_color="black")
-        slider_label.pack(anchor="e", pady=5)
+    # the line chart from tk canvas items, the axes is also the canvas and the renderer
+    def create_canvas_plot(self):
+        self.ax = self.canvas = self.renderer = CanvasAxes(self.contents_frame, darker_lightblue, "lightblue")
+        self.ax.set_ylim(0, 100)
+        self.ax.set_yticks([0, 10, 20, 30, 40, 50, 60, 70, 80, 90, 100])
+        self.ax.set_ylabel("% Utilization")
+        self.update_time_axis()
+
+        self.line, = self.ax.plot([], [], color=darker_lightblue, linewidth=0.8)
+        self.fill_area = self.ax.fill("lightblue", alpha=0.3)
+        self.envelope = self.ax.fill(darker_lightblue, alpha=0.25)
+
+    # called on the tk thread for every snapshot drained from the sampler
+    def on_sample(self, snapshot):
+        new_data = snapshot.values.get("cpu")
+        if new_data is None:
+            return
+        self.cpu_usage_text.set(f"CPU Usage: {new_data:.1f}%")
 
-        # 1 min label
-        min_label = ctk.CTkLabel(slider_frame, text="1", text_color="gray")
-        min_label.pack(side="left", padx=5)
+        self.cpu_lod.append(snapshot.timestamp, new_data)
 
-        # init the slider
-        self.time_slider = ctk.CTkSlider(
-            slider_frame, from_=60, to=3600, number_of_steps=60, command=self.update_time_range
-        )
-        self.time_slider.set(60)
-        self.time_slider.pack(side="left", padx=5)
+        # the feed replaces the matrix when the number of cores changes
+        if snapshot.values.get("cpu_cores") and "cpu_cores" in self.store:
+            self.cpu_core_data = self.store.series("cpu_cores")
 
-        # 60 mins label
-        max_label = ctk.CTkLabel(slider_frame, text="60", text_color="gray")
-        max_label.pack(side="right", padx=5)
+    # fill the history from disk after a restart, records come from history_storage
+    def load_history(self, records):
+        for timestamp, value in zip(records["timestamp"], records["cpu"]):
+            if not math.isnan(value):
+                self.cpu_usage_data.append(timestamp, value)
+                self.cpu_lod.append(timestamp, value)
 
-    # command for slider increments
-    def update_time_range(self, value):
-        self.time_range = int(float(value))
-        self.update_plot()
+    def update_plot(self, draft=False):
+        # keep collecting while collapsed, just don't draw
+        if self.is_collapsed:
+            return
 
-    def update(self):
-        # using psutil for cpu usage
-        self.update_cpu_info()
-        self.update_plot()
-        self.after(1000, self.update) # update each second using after. tkinter not thread safe
+        # drafts (while a slider is dragged) get a fraction of the point budget
+        max_points = self.ax.bbox.width * (DRAFT_DETAIL if draft else 1)
 
-    def update_cpu_info(self):
-        new_data = psutil.cpu_percent(interval=0)
-        self.cpu_usage_text.set(f"CPU Usage: {new_data:.1f}%")
+        if self.per_core:
+            self.update_heatmap(max_points)
+            self.renderer.render()
+            return
 
-        self.cpu_usage_data.append(new_data)
-        if len(self.cpu_usage_data) > 60:
-            self.cpu_usage_data.pop(0)
+        # draw about one bucket per pixel column whatever the time range
+        level = self.cpu_lod.select(self.time_range, max_points)
+        timestamps, lows, highs, means = level.window(self.time_range)
+        positions = level.positions(timestamps, self.time_range)
 
-    def update_plot(self):
-        data_to_plot = self.cpu_usage_data[-self.time_range:]
+        # update the line, fill area and min/max envelope
+        self.line.set_data(positions, means)
+        self.fill_area.set_data(positions, means)
+        self.envelope.set_data(positions, highs, lows)
 
-        # update the line and fill area
-        self.line.set_ydata(data_to_plot)
-        self.line.set_xdata(range(len(data_to_plot)))
-        if self.fill_area:
-            self.fill_area.remove()
-        self.fill_area = self.ax.fill_between(range(len(data_to_plot)), data_to_plot, color="lightblue", alpha=0.3)
+        self.renderer.render()
 
-        # update xlim
-        self.ax.set_xlim(0, self.time_range)
+    def update_heatmap(self, max_points):
+        if self.cpu_core_data is None or len(self.cpu_core_data) == 0:
+            return
 
-        #update xlabel
-        self.ax.set_xlabel(f"Last {self.time_range//60} minute(s)", color="gray", fontsize=10)
+        timestamps, core_data = self.cpu_core_data.window(self.time_range)
+        columns = core_data.shape[1]
+        if self.ax.get_ylim()[1] != self.cpu_core_data.rows:
+            self.update_value_axis()
 
-        #update xticks
-        step = max(1, self.time_range // 20)
-        ticks = list(range(0, self.time_range + 1, step))
-        self.ax.set_xticks(ticks)
+        # never hand the image more columns than the axes has pixels
+        step = max(1, math.ceil(columns / max(max_points, 1)))
+        self.heatmap.set_data(core_data[:, ::step])
+        # columns are evenly spread between the oldest and newest sample
+        left = self.time_range - max(timestamps[-1] - timestamps[0], 1)
+        self.heatmap.set_extent((left, self.time_range, 0, self.cpu_core_data.rows))
 
-        self.canvas.draw()
+    def toggle_per_core(self):
+        self.per_core = bool(self.per_core_switch.get())
 
-    def toggle_cpu_frame(self):
-        if self.is_collapsed:
-            self.contents_frame.grid()
-            self.configure(fg_color="white")
-            self.toggle_button.configure(text="Hide CPU Frame")
+        self.line.set_visible(not self.per_core)
+        self.fill_area.collection.set_visible(not self.per_core)
+        self.envelope.collection.set_visible(not self.per_core)
+        self.heatmap.set_visible(self.per_core)
+
+        self.update_value_axis()
+        self.update_plot()
+
+    # y axis is % utilization for the line and one row per core for the heatmap
+    def update_value_axis(self):
+        if self.per_core:
+            cores = self.cpu_core_data.rows if self.cpu_core_data is not None else 1
+            self.ax.set_ylim(0, cores)
+            self.ax.set_yticks(list(range(0, cores + 1, max(1, cores // 8))))
+            self.ax.set_ylabel("Core", color="gray", fontsize=10)
         else:
-            self.contents_frame.grid_remove()
-            self.configure(fg_color="transparent")
-            self.toggle_button.configure(text="Show CPU Frame")
+            self.ax.set_ylim(0, 100)
+            self.ax.set_yticks([0, 10, 20, 30, 40, 50, 60, 70, 80, 90, 100])
+            self.ax.set_ylabel("% Utilization", color="gray", fontsize=10)
 
-        self.is_collapsed = not self.is_collapsed
+        self.renderer.invalidate()
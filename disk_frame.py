@@ -0,0 +1,260 @@
+import customtkinter as ctk
+import math
+import numpy as np
+
+from canvas_chart import CanvasAxes
+from chart_frame import ChartFrame
+from chart_renderer import chart_axes, nice_limit
+from process_frame import format_bytes
+from redraw_scheduler import DRAFT_DETAIL
+
+darker_orange = "#CD6600"
+
+
+def format_throughput_tick(mbps, position=None):
+    return f"{mbps / 1000:g}G" if mbps >= 1000 else f"{mbps:g}M"
+
+
+class DiskFrame(ChartFrame):
+    # total read/write throughput as two lines, per-device utilization as one heatmap image.
+    # every device lives in the rows of the same ring matrices, so more nvme namespaces or dm
+    # devices mean bigger arrays, not more artists or draws
+    def __init__(self, parent, store, blit=True, scheduler=None, renderer="matplotlib", shared_figure=None, feed=None):
+        super().__init__(parent, "Disk", store, scheduler, shared_figure, feed)
+
+        self.contents_frame.grid_columnconfigure(0, weight=3)  # col 0 for disk info
+        self.contents_frame.grid_columnconfigure(1, weight=0)  # col 1 for slider
+        self.contents_frame.grid_rowconfigure(5, weight=1)  # row 5 for graph
+
+        self.create_disk_labels()
+
+        self.read_data = store.series("disk.read")
+        self.write_data = store.series("disk.write")
+
+        # devices x time, sized by the first reading and rebuilt when devices come or go
+        self.devices = ()
+        self.utilization_data = None
+        self.per_device = False
+        self.y_limit = None
+
+        if renderer == "canvas":
+            self.create_canvas_plot()
+            self.per_device_switch.grid_remove()  # the heatmap needs matplotlib
+        else:
+            self.create_plot()
+            self.attach_plot([self.read_line, self.write_line, self.heatmap], blit)
+        self.show_chart(row=5)
+
+    def create_disk_labels(self):
+        self.disk_label = ctk.CTkLabel(
+            self.contents_frame,
+            text="Disk I/O Monitor",
+            font=("Segoe UI", 18, "bold"),
+            text_color="darkorange",
+        )
+        self.disk_label.grid(row=0, column=0, sticky="nw", padx=10, pady=10)
+
+        self.throughput_text = ctk.StringVar(value="Read: 0 MB/s  Write: 0 MB/s")
+        self.throughput_label = ctk.CTkLabel(
+            self.contents_frame,
+            textvariable=self.throughput_text,
+            font=("Segoe UI", 16, "italic"),
+            text_color="black",
+        )
+        self.throughput_label.grid(row=1, column=0, sticky="nw", padx=10, pady=5)
+
+        # one line per device and per filesystem, only reconfigured when the text changes
+        self.devices_label = ctk.CTkLabel(
+            self.contents_frame,
+            text="",
+            font=("Consolas", 12),
+            text_color="gray",
+            justify="left",
+        )
+        self.devices_label.grid(row=2, column=0, sticky="nw", padx=10, pady=5)
+
+        self.filesystems_label = ctk.CTkLabel(
+            self.contents_frame,
+            text="",
+            font=("Consolas", 12),
+            text_color="gray",
+            justify="left",
+        )
+        self.filesystems_label.grid(row=3, column=0, sticky="nw", padx=10, pady=5)
+
+        self.per_device_switch = ctk.CTkSwitch(
+            self.contents_frame,
+            text="Per-device",
+            command=self.toggle_per_device,
+            font=("Segoe UI", 13, "italic"),
+            text_color="gray",
+        )
+        self.per_device_switch.grid(row=3, column=1, sticky="ne", padx=10, pady=5)
+
+    def create_plot(self):
+        from matplotlib.ticker import FuncFormatter
+
+        self.figure, self.ax = chart_axes("disk", self.shared_figure)
+
+        self.ax.set_facecolor("white")
+        self.ax.tick_params(axis='x', colors='gray')
+        self.ax.tick_params(axis='y', colors='gray')
+        # the y limit follows the traffic, see update_plot
+        self.ax.set_ylim(0, 1)
+        self.ax.set_xlim(0, 60)
+        self.ax.yaxis.set_major_formatter(FuncFormatter(format_throughput_tick))
+        self.ax.set_ylabel("Throughput (MB/s)", color="gray", fontsize=10)
+        self.ax.set_xticklabels([])
+
+        step = max(1, self.time_range // 20)
+        ticks = list(range(0, self.time_range + 1, step))
+        self.ax.set_xticks(ticks)
+
+        self.ax.set_xlabel(f"Last {self.time_range//60} minute(s)", color="gray", fontsize=10)
+        for spine in ['top', 'right', 'bottom', 'left']:
+            self.ax.spines[spine].set_color(darker_orange)
+        self.ax.grid(color="navajowhite", linestyle="-", linewidth=0.3, alpha=0.7)
+
+        self.read_line, = self.ax.plot([], [], color=darker_orange, linewidth=0.8, label="Read")
+        self.write_line, = self.ax.plot([], [], color="purple", linewidth=0.8, label="Write")
+        self.ax.legend(loc='upper right', fontsize=8)
+
+        # one row per device, its pixels are replaced in place
+        self.heatmap = self.ax.imshow(
+            np.zeros((1, 1)),
+            aspect="auto",
+            origin="lower",
+            cmap="Oranges",
+            vmin=0,
+            vmax=100,
+            interpolation="nearest",
+            extent=(0, self.time_range, 0, 1),
+            visible=False,
+        )
+
+    # the throughput lines from tk canvas items, the axes is also the canvas and the renderer
+    def create_canvas_plot(self):
+        self.ax = self.canvas = self.renderer = CanvasAxes(
+            self.contents_frame, darker_orange, "navajowhite", tick_format=format_throughput_tick
+        )
+        # the y limit follows the traffic, see update_plot
+        self.ax.set_ylim(0, 1)
+        self.ax.set_ylabel("Throughput (MB/s)")
+        self.update_time_axis()
+
+        self.read_line, = self.ax.plot([], [], color=darker_orange, linewidth=0.8, label="Read")
+        self.write_line, = self.ax.plot([], [], color="purple", linewidth=0.8, label="Write")
+        self.ax.legend()
+
+    def on_sample(self, snapshot):
+        filesystems = snapshot.values.get("filesystems")
+        if filesystems is not None:
+            self.update_filesystems(filesystems)
+
+        rates = self.feed.disk_rates
+        if rates is None:
+            return
+
+        if rates.devices != self.devices:
+            self.devices = rates.devices
+            self.utilization_data = self.store.series("disk.utilization")
+            if self.per_device:
+                self.update_value_axis()
+
+        read_mbps = float(rates.read_mbps.sum())
+        write_mbps = float(rates.write_mbps.sum())
+        self.throughput_text.set(f"Read: {read_mbps:.2f} MB/s  Write: {write_mbps:.2f} MB/s")
+
+        self.update_devices(rates)
+
+    def update_devices(self, rates):
+        lines = []
+        for device, read, write, iops, utilization in zip(*rates):
+            busy = "   -" if math.isnan(utilization) else f"{utilization:3.0f}%"
+            lines.append(f"{device:<10} R {read:8.2f}  W {write:8.2f} MB/s  {iops:6.0f} IOPS  {busy} busy")
+        text = "\n".join(lines)
+        if text != self.devices_label.cget("text"):
+            self.devices_label.configure(text=text)
+
+    def update_filesystems(self, filesystems):
+        text = "\n".join(
+            f"{usage.mountpoint:<20} {usage.percent:5.1f}% of {format_bytes(usage.total)}" for usage in filesystems
+        )
+        if text != self.filesystems_label.cget("text"):
+            self.filesystems_label.configure(text=text)
+
+    # disk rates aren't part of the on-disk history, the chart starts empty after a restart
+    def load_history(self, records):
+        pass
+
+    def update_plot(self, draft=False):
+        # keep collecting while collapsed, just don't draw
+        if self.is_collapsed:
+            return
+
+        if self.per_device:
+            # drafts (while a slider is dragged) get a fraction of the point budget
+            self.update_heatmap(self.ax.bbox.width * (DRAFT_DETAIL if draft else 1))
+            self.renderer.render()
+            return
+
+        read_timestamps, read_to_plot = self.read_data.window(self.time_range)
+        write_timestamps, write_to_plot = self.write_data.window(self.time_range)
+
+        self.read_line.set_data(self.store.positions_for(read_timestamps, self.time_range), read_to_plot)
+        self.write_line.set_data(self.store.positions_for(write_timestamps, self.time_range), write_to_plot)
+
+        # only a change of 1-2-5 step redraws the background, not every new peak
+        y_limit = nice_limit(max(read_to_plot.max(initial=0), write_to_plot.max(initial=0)))
+        if y_limit != self.y_limit:
+            self.y_limit = y_limit
+            self.ax.set_ylim(0, y_limit)
+            self.renderer.invalidate()
+
+        self.renderer.render()
+
+    def update_heatmap(self, max_points):
+        if self.utilization_data is None or len(self.utilization_data) == 0:
+            return
+
+        timestamps, utilization = self.utilization_data.window(self.time_range)
+        columns = utilization.shape[1]
+
+        # never hand the image more columns than the axes has pixels
+        step = max(1, math.ceil(columns / max(max_points, 1)))
+        self.heatmap.set_data(utilization[:, ::step])
+        # columns are evenly spread between the oldest and newest sample
+        left = self.time_range - max(timestamps[-1] - timestamps[0], 1)
+        self.heatmap.set_extent((left, self.time_range, 0, len(self.devices)))
+
+    def toggle_per_device(self):
+        self.per_device = bool(self.per_device_switch.get())
+
+        self.read_line.set_visible(not self.per_device)
+        self.write_line.set_visible(not self.per_device)
+        self.heatmap.set_visible(self.per_device)
+
+        self.update_value_axis()
+        self.update_plot()
+
+    # y axis is throughput for the lines and one row per device for the heatmap
+    def update_value_axis(self):
+        from matplotlib.ticker import AutoLocator, FuncFormatter
+
+        if self.per_device:
+            devices = max(len(self.devices), 1)
+            self.ax.set_ylim(0, devices)
+            self.ax.yaxis.set_major_formatter(FuncFormatter(self.format_device_tick))
+            self.ax.set_yticks([index + 0.5 for index in range(len(self.devices))])
+            self.ax.set_ylabel("Device % busy", color="gray", fontsize=10)
+        else:
+            self.y_limit = None  # update_plot picks the limit again
+            self.ax.yaxis.set_major_formatter(FuncFormatter(format_throughput_tick))
+            self.ax.yaxis.set_major_locator(AutoLocator())
+            self.ax.set_ylabel("Throughput (MB/s)", color="gray", fontsize=10)
+
+        self.renderer.invalidate()
+
+    def format_device_tick(self, value, position=None):
+        index = int(value)
+        return self.devices[index] if 0 <= index < len(self.devices) else ""
@@ -0,0 +1,287 @@
+# serves the latest samples to other monitoring tools, so they can reuse this collector:
+#   GET /metrics       prometheus text exposition format
+#   GET /metrics.json  the same readings as json
+#   GET /history.json  the last ten minutes of cpu, memory, network and gpu records
+# over tcp ("127.0.0.1:9101") or a unix socket ("unix:/run/dashboard.sock"). the metrics are
+# serialized once per sample on the sampler thread, a scrape only copies the finished bytes.
+# the history is joined when it is requested, at most once per new sample
+import json
+import os
+import socketserver
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from collector import NetworkThroughput
+
+PROMETHEUS_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+JSON_TYPE = "application/json"
+PATHS = ("/metrics", "/metrics.json", "/history.json")
+HISTORY_SECONDS = 600  # how far back /history.json goes, whatever the sampling intervals
+
+
+def parse_address(text):
+    # ("unix", path) or ("tcp", (host, port)), ValueError when it's neither
+    if text.startswith("unix:"):
+        path = os.path.expanduser(text[len("unix:"):])
+        if not path:
+            raise ValueError("expected unix:PATH")
+        return "unix", path
+
+    host, separator, port = text.rpartition(":")
+    if not separator or not port.isdigit() or not 0 < int(port) < 65536:
+        raise ValueError(f"expected HOST:PORT or unix:PATH, got {text!r}")
+    return "tcp", (host or "127.0.0.1", int(port))
+
+
+def label_value(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def sample_value(value):
+    # counters stay exact, numpy scalars don't leak their repr
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+def metric_lines(name, kind, help, samples):
+    # one metric family, samples are (labels dict, value) pairs. a None value, e.g. gpu memory
+    # a driver doesn't report, leaves the series out rather than exporting a made-up number
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        if value is None:
+            continue
+        if labels:
+            label_text = ",".join(f'{key}="{label_value(label)}"' for key, label in labels.items())
+            lines.append(f"{name}{{{label_text}}} {sample_value(value)}")
+        else:
+            lines.append(f"{name} {sample_value(value)}")
+    return lines
+
+
+class MetricsExporter:
+    # update() runs on the sampler thread (Sampler.subscribe), the server has a thread per
+    # scrape. the metrics are shared through self.payloads, which is replaced whole and never
+    # modified, so scrapers need no lock and never see half of an update. the history deque
+    # and its cached body are behind a lock
+    def __init__(self, address, history_seconds=HISTORY_SECONDS):
+        self.address = address
+        self.kind, self.bind_address = parse_address(address)
+
+        # its own throughput, the network frame's interface selection is a ui setting
+        self.throughput = NetworkThroughput()
+        self.readings = {}  # latest value of every exported probe, snapshots only carry the due ones
+        self.rates = {}  # interface -> (upload_mbps, download_mbps)
+        self.timestamp = None
+
+        # every record is serialized once when it arrives, the body is only the join
+        self.history_seconds = history_seconds
+        self.history = deque()  # (timestamp, json text), oldest first
+        self.history_body = None  # joined on the first request after a new sample
+        self._history_lock = threading.Lock()
+        self.payloads = {}
+
+        self.server = None
+        self._thread = None
+
+    def update(self, snapshot):
+        values = snapshot.values
+        if not any(name in values for name in ("cpu", "cpu_cores", "memory", "network", "gpu")):
+            return
+
+        # the same fields as a history_storage record, only those this snapshot carries
+        record = {"timestamp": round(snapshot.timestamp, 3)}
+        for name in ("cpu", "memory"):
+            if name in values:
+                record[name] = values[name]
+        reading = values.get("network")
+        if reading is not None:
+            self.rates = self.throughput.rates(reading)
+            total = self.throughput.total(self.rates)
+            if total is not None:
+                record["upload"], record["download"] = total
+        devices = values.get("gpu")
+        if devices is not None:
+            record["gpu"] = max((float(device.load) for device in devices), default=0.0)
+        text = json.dumps(record)
+        with self._history_lock:
+            self.history.append((snapshot.timestamp, text))
+            while self.history[0][0] < snapshot.timestamp - self.history_seconds:
+                self.history.popleft()
+            self.history_body = None
+
+        for name in ("cpu", "cpu_cores", "memory", "network", "gpu"):
+            if name in values:
+                self.readings[name] = values[name]
+        self.timestamp = snapshot.timestamp
+
+        self.payloads = {
+            "/metrics": (PROMETHEUS_TYPE, self.prometheus_text().encode()),
+            "/metrics.json": (JSON_TYPE, self.json_text().encode()),
+        }
+
+    def payload(self, path):
+        # (content type, body) of a path, None before the first sample or for unknown paths
+        if path != "/history.json":
+            return self.payloads.get(path)
+        with self._history_lock:
+            if not self.history:
+                return None
+            if self.history_body is None:
+                self.history_body = ("[" + ",".join(text for _, text in self.history) + "]").encode()
+            return JSON_TYPE, self.history_body
+
+    def prometheus_text(self):
+        readings = self.readings
+        lines = metric_lines("dashboard_sample_timestamp_seconds", "gauge", "Unix time of the latest sample.", [({}, self.timestamp)])
+
+        if "cpu" in readings:
+            lines += metric_lines("dashboard_cpu_percent", "gauge", "CPU usage in percent.", [({}, readings["cpu"])])
+        if "cpu_cores" in readings:
+            lines += metric_lines(
+                "dashboard_cpu_core_percent",
+                "gauge",
+                "Usage of each CPU core in percent.",
+                [({"core": core}, value) for core, value in enumerate(readings["cpu_cores"])],
+            )
+        if "memory" in readings:
+            lines += metric_lines("dashboard_memory_percent", "gauge", "Memory usage in percent.", [({}, readings["memory"])])
+
+        network = readings.get("network")
+        if network is not None:
+            interfaces = sorted(network.counters)
+            lines += metric_lines(
+                "dashboard_network_transmit_bytes_total",
+                "counter",
+                "Bytes sent on each interface.",
+                [({"interface": name}, network.counters[name].bytes_sent) for name in interfaces],
+            )
+            lines += metric_lines(
+                "dashboard_network_receive_bytes_total",
+                "counter",
+                "Bytes received on each interface.",
+                [({"interface": name}, network.counters[name].bytes_recv) for name in interfaces],
+            )
+            rates = sorted(self.rates.items())
+            lines += metric_lines(
+                "dashboard_network_upload_mbps",
+                "gauge",
+                "Upload rate of each interface in megabits per second.",
+                [({"interface": name}, rate[0]) for name, rate in rates],
+            )
+            lines += metric_lines(
+                "dashboard_network_download_mbps",
+                "gauge",
+                "Download rate of each interface in megabits per second.",
+                [({"interface": name}, rate[1]) for name, rate in rates],
+            )
+
+        devices = readings.get("gpu")
+        if devices:
+            labels = [{"gpu": device.index, "name": device.name} for device in devices]
+            lines += metric_lines(
+                "dashboard_gpu_load_percent",
+                "gauge",
+                "Load of each GPU in percent.",
+                [(label, float(device.load)) for label, device in zip(labels, devices)],
+            )
+            lines += metric_lines(
+                "dashboard_gpu_memory_used_bytes",
+                "gauge",
+                "Memory used on each GPU.",
+                [(label, device.memory_used) for label, device in zip(labels, devices)],
+            )
+            lines += metric_lines(
+                "dashboard_gpu_memory_total_bytes",
+                "gauge",
+                "Memory of each GPU.",
+                [(label, device.memory_total) for label, device in zip(labels, devices)],
+            )
+            lines += metric_lines(
+                "dashboard_gpu_temperature_celsius",
+                "gauge",
+                "Temperature of each GPU.",
+                [(label, device.temperature) for label, device in zip(labels, devices)],
+            )
+
+        return "\n".join(lines) + "\n"
+
+    def json_text(self):
+        readings = self.readings
+        network = readings.get("network")
+        return json.dumps({
+            "timestamp": self.timestamp,
+            "cpu": readings.get("cpu"),
+            "cpu_cores": list(readings.get("cpu_cores", ())),
+            "memory": readings.get("memory"),
+            "network": {
+                name: {
+                    "bytes_sent": counters.bytes_sent,
+                    "bytes_recv": counters.bytes_recv,
+                    "upload_mbps": self.rates.get(name, (None, None))[0],
+                    "download_mbps": self.rates.get(name, (None, None))[1],
+                }
+                for name, counters in (network.counters.items() if network is not None else ())
+            },
+            "gpu": [device._asdict() for device in readings.get("gpu", ())],
+        })
+
+    def start(self):
+        if self.server is not None:
+            return
+        server_class = ThreadingUnixHTTPServer if self.kind == "unix" else ThreadingHTTPServer
+        if self.kind == "unix" and os.path.exists(self.bind_address):
+            os.unlink(self.bind_address)  # left over from a run that didn't shut down cleanly
+        self.server = server_class(self.bind_address, ExportHandler)
+        self.server.exporter = self
+        self._thread = threading.Thread(target=self.server.serve_forever, name="exporter", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self.server is None:
+            return
+        self.server.shutdown()
+        self.server.server_close()
+        self._thread.join(timeout=5)
+        if self.kind == "unix":
+            try:
+                os.unlink(self.bind_address)
+            except OSError:
+                pass
+        self.server = None
+        self._thread = None
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class ExportHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.respond(include_body=True)
+
+    def do_HEAD(self):
+        self.respond(include_body=False)
+
+    def respond(self, include_body):
+        path = self.path.split("?", 1)[0]
+        payload = self.server.exporter.payload(path)
+        if payload is None:
+            self.send_error(503 if path in PATHS else 404)
+            return
+        content_type, body = payload
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if include_body:
+            self.wfile.write(body)
+
+    def address_string(self):
+        # unix socket peers have no address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        # scrapes every few seconds would flood the console
+        pass
@@ -0,0 +1,102 @@
+# follows many agents (agent.py) at once: one asyncio loop on one thread holds every connection,
+# reconnecting with backoff, and decoded samples reach the tk thread through a single queue that
+# the dashboard's ui tick drains. no thread or tk timer per host, so hundreds of agents are fine
+import asyncio
+import json
+import queue
+import random
+import threading
+
+from agent_protocol import BATCH, HELLO, ProtocolError, decode_batch, read_message
+from exporter import parse_address
+
+CONNECT_TIMEOUT = 5.0
+MAX_CONNECTING = 32  # connection attempts in flight at once, so a fleet restart isn't a syn flood
+MIN_RETRY = 1.0
+MAX_RETRY = 30.0
+
+
+class FleetClient:
+    # drain() returns ("hello", address, info), ("samples", address, [(timestamp, record), ...])
+    # and ("down", address, reason) updates in arrival order
+    def __init__(self, addresses, connect_timeout=CONNECT_TIMEOUT, max_connecting=MAX_CONNECTING):
+        self.addresses = list(dict.fromkeys(addresses))
+        for address in self.addresses:
+            parse_address(address)  # ValueError before any thread starts
+        self.connect_timeout = connect_timeout
+        self.max_connecting = max_connecting
+
+        self.updates = queue.SimpleQueue()
+        self.loop = None
+        self._stop = None
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=asyncio.run, args=(self._run(),), name="fleet", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._stop.set)
+        self._thread.join(timeout=5)
+        self._thread = None
+
+    def drain(self):
+        # called from the tk thread, never blocks
+        updates = []
+        while True:
+            try:
+                updates.append(self.updates.get_nowait())
+            except queue.Empty:
+                return updates
+
+    async def _run(self):
+        self.loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        connecting = asyncio.Semaphore(self.max_connecting)
+
+        tasks = [asyncio.create_task(self.follow(address, connecting)) for address in self.addresses]
+        await self._stop.wait()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def connect(self, address):
+        kind, bind_address = parse_address(address)
+        if kind == "unix":
+            connection = asyncio.open_unix_connection(bind_address)
+        else:
+            connection = asyncio.open_connection(*bind_address)
+        return await asyncio.wait_for(connection, self.connect_timeout)
+
+    async def follow(self, address, connecting):
+        retry = MIN_RETRY
+        while True:
+            writer = None
+            try:
+                async with connecting:
+                    reader, writer = await self.connect(address)
+                retry = MIN_RETRY
+                while True:
+                    kind, payload = await read_message(reader)
+                    if kind == HELLO:
+                        self.updates.put(("hello", address, json.loads(payload)))
+                    elif kind == BATCH:
+                        self.updates.put(("samples", address, decode_batch(payload)))
+            except asyncio.CancelledError:
+                raise
+            except asyncio.IncompleteReadError:
+                self.updates.put(("down", address, "disconnected"))
+            except (OSError, asyncio.TimeoutError, ProtocolError, ValueError) as e:
+                self.updates.put(("down", address, str(e) or type(e).__name__))
+            finally:
+                if writer is not None:
+                    writer.close()
+
+            # jittered so agents that went down together don't all get retried in the same instant
+            await asyncio.sleep(retry * random.uniform(0.5, 1.0))
+            retry = min(retry * 2, MAX_RETRY)
@@ -0,0 +1,123 @@
+import customtkinter as ctk
+
+from cpu_frame import darker_lightblue
+from gpu_frame import darker_lightblue as gpu_blue
+from network_frame import darker_lightgreen, format_rate
+
+COLUMNS = 5
+
+
+class HostTile(ctk.CTkFrame):
+    # the cpu, memory, network and gpu readouts of one agent, in the colors of the full frames.
+    # widgets are only reconfigured when their text changes
+    def __init__(self, parent, address):
+        super().__init__(parent, fg_color="white")
+
+        self.grid_columnconfigure(0, weight=1)
+        self.shown = {}
+
+        self.name_label = ctk.CTkLabel(self, text=address, font=("Segoe UI", 14, "bold"), text_color="darkblue")
+        self.name_label.grid(row=0, column=0, sticky="w", padx=10, pady=(8, 0))
+
+        self.status_label = ctk.CTkLabel(self, text="connecting...", font=("Segoe UI", 11, "italic"), text_color="gray")
+        self.status_label.grid(row=1, column=0, sticky="w", padx=10)
+
+        self.bars = {}
+        self.labels = {}
+        for row, (field, title, color) in enumerate(
+            (("cpu", "CPU", darker_lightblue), ("memory", "Memory", darker_lightblue), ("gpu", "GPU", gpu_blue)),
+            start=2,
+        ):
+            label = ctk.CTkLabel(self, text=f"{title}: -", font=("Segoe UI", 12), text_color="black")
+            label.grid(row=row * 2, column=0, sticky="w", padx=10)
+            bar = ctk.CTkProgressBar(self, height=6, progress_color=color)
+            bar.set(0)
+            bar.grid(row=row * 2 + 1, column=0, sticky="ew", padx=10, pady=(0, 4))
+            self.labels[field] = (label, title)
+            self.bars[field] = bar
+
+        self.network_label = ctk.CTkLabel(self, text="Network: -", font=("Segoe UI", 12), text_color=darker_lightgreen)
+        self.network_label.grid(row=10, column=0, sticky="w", padx=10, pady=(0, 8))
+
+    def show(self, key, widget, **options):
+        if self.shown.get(key) != options:
+            self.shown[key] = options
+            widget.configure(**options)
+
+    def set_hello(self, info):
+        self.show("name", self.name_label, text=info.get("host", self.name_label.cget("text")))
+        self.show("status", self.status_label, text="connected", text_color="green")
+
+    def set_down(self, reason):
+        self.show("status", self.status_label, text=f"down: {reason}", text_color="red")
+
+    def set_record(self, record):
+        for field, (label, title) in self.labels.items():
+            value = record.get(field)
+            if value is None:
+                continue
+            self.show(field, label, text=f"{title}: {value:.1f}%")
+            fraction = round(min(max(value / 100, 0), 1), 2)
+            if self.shown.get(f"{field} bar") != fraction:
+                self.shown[f"{field} bar"] = fraction
+                self.bars[field].set(fraction)
+
+        if "upload" in record and "download" in record:
+            text = f"Up {format_rate(record['upload'])}  Down {format_rate(record['download'])}"
+            self.show("network", self.network_label, text=text)
+
+
+class FleetFrame(ctk.CTkFrame):
+    # one tile per agent. refresh() is called from the dashboard's ui tick and only touches
+    # the tiles of hosts that sent something since the last tick
+    def __init__(self, parent, client):
+        super().__init__(parent, fg_color="white")
+
+        self.client = client
+        self.up = set()
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+
+        self.summary_label = ctk.CTkLabel(
+            self,
+            text=f"Fleet: 0/{len(client.addresses)} agents up",
+            font=("Segoe UI", 18, "bold"),
+            text_color="darkblue",
+        )
+        self.summary_label.grid(row=0, column=0, sticky="nw", padx=10, pady=10)
+
+        self.tiles_frame = ctk.CTkScrollableFrame(self, fg_color="transparent")
+        self.tiles_frame.grid(row=1, column=0, sticky="nsew", padx=10, pady=(0, 10))
+        for column in range(COLUMNS):
+            self.tiles_frame.grid_columnconfigure(column, weight=1)
+
+        self.tiles = {}
+        for index, address in enumerate(client.addresses):
+            tile = HostTile(self.tiles_frame, address)
+            tile.grid(row=index // COLUMNS, column=index % COLUMNS, sticky="nsew", padx=5, pady=5)
+            self.tiles[address] = tile
+
+    def refresh(self):
+        # only the newest values of each host are drawn, whatever arrived in between
+        latest = {}
+        for kind, address, data in self.client.drain():
+            tile = self.tiles[address]
+            if kind == "hello":
+                self.up.add(address)
+                tile.set_hello(data)
+            elif kind == "down":
+                self.up.discard(address)
+                latest.pop(address, None)
+                tile.set_down(data)
+            elif data:
+                record = latest.setdefault(address, {})
+                for _, values in data:
+                    record.update(values)
+
+        for address, record in latest.items():
+            self.tiles[address].set_record(record)
+
+        summary = f"Fleet: {len(self.up)}/{len(self.tiles)} agents up"
+        if self.summary_label.cget("text") != summary:
+            self.summary_label.configure(text=summary)
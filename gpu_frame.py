@@ -1,81 +1,39 @@
-import platform
+import math
 import customtkinter as ctk
-import GPUtil
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
 
-if platform.system().lower() == "windows":
-    import wmi
+from canvas_chart import CanvasAxes
+from chart_frame import ChartFrame
+from chart_renderer import chart_axes
+from collector import gpu_device_series
+from hardware_info import PENDING_GPU_INFO
 
 darker_lightblue = "#468284"
+device_colors = [darker_lightblue, "#B8860B", "#8B008B", "#2E8B57", "#B22222", "#4169E1", "#D2691E", "#708090"]
 
 
-def get_gpu_info():
-    system = platform.system().lower()
-
-    if "windows" in system:
-        try:
-            w = wmi.WMI(namespace="root\\CIMv2")
-            gpu_info = w.query("SELECT * FROM Win32_VideoController")
-            if gpu_info:
-                gpu = gpu_info[0]
-                return {
-                    "gpu_name": gpu.Name,
-                    "device_count": 1,
-                    "total_memory": round(int(gpu.AdapterRAM) / 1024 ** 3, 2),
-                }
-        except Exception as e:
-            print(f"WMI detection error: {e}")
-
-    elif "linux" in system:
-        try:
-            import subprocess
-            output = subprocess.check_output(["lshw", "-C", "display"], text=True)
-            gpu_name = "Unknown"
-            for line in output.split("\n"):
-                if "product:" in line:
-                    gpu_name = line.split(":")[1].strip()
-                    break
-            return {
-                "gpu_name": gpu_name,
-                "device_count": 1,
-                "total_memory": "Unavailable",
-            }
-        except FileNotFoundError:
-            print("lshw not installed. Install with: sudo apt install lshw")
-        except Exception as e:
-            print(f"Linux GPU detection error: {e}")
-
-    return {
-        "gpu_name": "Undetected",
-        "device_count": 0,
-        "total_memory": "Unavailable",
-    }
-
-
-class GPUFrame(ctk.CTkFrame):
-    def __init__(self, parent):
-        super().__init__(parent, fg_color="white")
-
-        self.grid_columnconfigure(0, weight=1)
-        self.grid_rowconfigure(0, weight=1)
-
-        self.contents_frame = ctk.CTkFrame(self, fg_color="white")
-        self.contents_frame.grid(row=0, column=0, sticky="nsew")
-
-        gpu_info = get_gpu_info()
-
-        self.create_gpu_labels(gpu_info)
-        self.gpu_usage_data = []
-
-        self.create_gpu_plot()
+class GPUFrame(ChartFrame):
+    def __init__(self, parent, store, blit=True, gpu_info=None, scheduler=None, renderer="matplotlib", shared_figure=None, feed=None):
+        super().__init__(parent, "GPU", store, scheduler, shared_figure, feed)
+
+        self.create_gpu_labels(gpu_info or PENDING_GPU_INFO)
+        # busiest device, what the alerts look at, plus one series per device
+        self.gpu_usage_data = store.series("gpu")
+        self.device_data = []
+        self.device_lines = []
+        self.device_names = ()
+
+        if renderer == "canvas":
+            self.create_canvas_plot()
+        else:
+            self.create_gpu_plot()
+            self.attach_plot([self.line], blit)
+        # no slider of its own, the time range comes from the shared control
+        self.show_chart(row=4, slider=False)
 
         self.contents_frame.grid_columnconfigure(0, weight=1)
         self.contents_frame.grid_columnconfigure(1, weight=0)
         self.contents_frame.grid_rowconfigure(4, weight=1)
 
-        self.after(1000, self.update)
-
     def create_gpu_labels(self, gpu_info):
         self.gpu_label = ctk.CTkLabel(
             self.contents_frame,
@@ -110,9 +68,16 @@ class GPUFrame(ctk.CTkFrame):
         self.device_count_label.grid(row=2, column=0, columnspan=2, sticky="nw", padx=10, pady=5)
         self.total_memory_label.grid(row=3, column=0, columnspan=2, sticky="nw", padx=10, pady=5)
 
+    def set_gpu_info(self, gpu_info):
+        # the providers report the real devices once sampling starts, don't overwrite those
+        if self.device_names:
+            return
+        self.gpu_name_label.configure(text=f"{gpu_info['gpu_name']}")
+        self.device_count_label.configure(text=f"Device Count: {gpu_info['device_count']}")
+        self.total_memory_label.configure(text=f"Total Memory: {gpu_info['total_memory']} GB")
+
     def create_gpu_plot(self):
-        self.figure = Figure(figsize=(7, 2), dpi=90)
-        self.ax = self.figure.add_subplot(111)
+        self.figure, self.ax = chart_axes("gpu", self.shared_figure)
 
         self.ax.set_facecolor("white")
         self.ax.tick_params(axis="x", colors="gray")
@@ -132,33 +97,93 @@ class GPUFrame(ctk.CTkFrame):
 
         self.line, = self.ax.plot([0] * 60, color=darker_lightblue, linewidth=0.8)
 
-        self.canvas = FigureCanvasTkAgg(self.figure, self.contents_frame)
-        self.canvas.get_tk_widget().grid(row=4, column=0, sticky="nsew", padx=10, pady=10)
+    # the same chart from tk canvas items, the axes is also the canvas and the renderer
+    def create_canvas_plot(self):
+        self.ax = self.canvas = self.renderer = CanvasAxes(self.contents_frame, darker_lightblue, "lightblue")
+        self.ax.set_ylim(0, 100)
+        self.ax.set_yticks(range(0, 101, 10))
+        self.ax.set_ylabel("% Utilization")
+        self.update_time_axis()
 
-    def update(self):
-        gpus = GPUtil.getGPUs()
-        if gpus:
-            gpu_usage = gpus[0].load * 100
+        self.line, = self.ax.plot([], [], color=darker_lightblue, linewidth=0.8)
+
+    def add_device_line(self, index, name):
+        if index == 0:
+            line = self.line
         else:
-            gpu_usage = 0
+            line, = self.ax.plot([], [], color=device_colors[index % len(device_colors)], linewidth=0.8)
+            self.renderer.add_artist(line)
+        line.set_label(name)
+
+        self.device_lines.append(line)
+        self.device_data.append(self.store.series(f"gpu.{index}"))
 
-        self.gpu_usage_data.append(gpu_usage)
-        if len(self.gpu_usage_data) > 60:
-            self.gpu_usage_data.pop(0)
+    def update_device_labels(self, devices):
+        self.device_names = tuple(device.name for device in devices)
+        self.gpu_name_label.configure(text=", ".join(self.device_names))
+        self.device_count_label.configure(text=f"Device Count: {len(devices)}")
 
-        self.update_plot()
-        self.after(1000, self.update)
+        memory_totals = [device.memory_total for device in devices if device.memory_total]
+        if memory_totals:
+            self.total_memory_label.configure(text=f"Total Memory: {sum(memory_totals) / 1024 ** 3:.2f} GB")
 
-    def update_plot(self):
-        self.line.set_ydata(self.gpu_usage_data)
-        self.line.set_xdata(range(len(self.gpu_usage_data)))
+        if len(devices) > 1:
+            self.ax.legend(handles=self.device_lines[:len(devices)], loc="upper right", fontsize=8)
+        self.renderer.invalidate()
 
-        self.canvas.draw()
+    def on_sample(self, snapshot):
+        devices = snapshot.values.get("gpu")
+        if devices is None:
+            return
+
+        while len(self.device_lines) < len(devices):
+            index = len(self.device_lines)
+            self.add_device_line(index, devices[index].name)
+        if devices and tuple(device.name for device in devices) != self.device_names:
+            self.device_data[0] = self.store.series(gpu_device_series(0, len(devices)))
+            self.update_device_labels(devices)
+
+    # only the busiest-device series is kept on disk. a single gpu's line draws it, with several
+    # the per-device lines start empty
+    def load_history(self, records):
+        for timestamp, value in zip(records["timestamp"], records["gpu"]):
+            if not math.isnan(value):
+                self.gpu_usage_data.append(timestamp, value)
+
+    # raw per-second series, drafts draw the same points
+    def update_plot(self, draft=False):
+        if self.is_collapsed:
+            return
+
+        for line, data in zip(self.device_lines, self.device_data):
+            timestamps, data_to_plot = data.window(self.time_range)
+            line.set_data(self.store.positions_for(timestamps, self.time_range), data_to_plot)
+
+        self.renderer.render()
 
 
 if __name__ == "__main__":
+    from hardware_info import get_gpu_info
+    from sampler import Sampler
+    from timeseries import TimeSeriesStore
+
     root = ctk.CTk()
     root.geometry("800x600")
-    gpu_frame = GPUFrame(root)
+    gpu_frame = GPUFrame(root, TimeSeriesStore(), gpu_info=get_gpu_info())
     gpu_frame.pack(fill="both", expand=True)
+
+    sampler = Sampler()
+    sampler.start()
+
+    def drain_samples():
+        snapshots = sampler.drain()
+        for snapshot in snapshots:
+            gpu_frame.feed.append(snapshot)
+            gpu_frame.on_sample(snapshot)
+        if snapshots:
+            gpu_frame.update_plot()
+        root.after(100, drain_samples)
+
+    drain_samples()
     root.mainloop()
+    sampler.stop()
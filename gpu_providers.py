@@ -0,0 +1,236 @@
+import glob
+import math
+import os
+import threading
+import time
+from collections import namedtuple
+
+# one reading of one gpu, load is a percentage and memory is in bytes
+GPUDevice = namedtuple("GPUDevice", ["index", "name", "load", "memory_used", "memory_total", "temperature"])
+
+
+class GPUProviderError(Exception):
+    pass
+
+
+class NvmlProvider:
+    # talks to the nvidia driver in-process, nvml is initialised once and the handles are reused
+    name = "nvml"
+
+    def __init__(self):
+        try:
+            import pynvml
+        except ImportError:
+            raise GPUProviderError("pynvml is not installed")
+        self.pynvml = pynvml
+
+        try:
+            self.pynvml.nvmlInit()
+            count = self.pynvml.nvmlDeviceGetCount()
+        except self.pynvml.NVMLError as e:
+            raise GPUProviderError(f"NVML unavailable: {e}")
+        if count == 0:
+            self.pynvml.nvmlShutdown()
+            raise GPUProviderError("NVML found no devices")
+
+        self.handles = [self.pynvml.nvmlDeviceGetHandleByIndex(i) for i in range(count)]
+        self.names = []
+        for handle in self.handles:
+            name = self.pynvml.nvmlDeviceGetName(handle)
+            self.names.append(name.decode() if isinstance(name, bytes) else name)
+
+    def read(self):
+        devices = []
+        for index, handle in enumerate(self.handles):
+            utilization = self.pynvml.nvmlDeviceGetUtilizationRates(handle)
+            memory = self.pynvml.nvmlDeviceGetMemoryInfo(handle)
+            try:
+                temperature = self.pynvml.nvmlDeviceGetTemperature(handle, self.pynvml.NVML_TEMPERATURE_GPU)
+            except self.pynvml.NVMLError:
+                temperature = None
+            devices.append(GPUDevice(index, self.names[index], float(utilization.gpu), memory.used, memory.total, temperature))
+        return tuple(devices)
+
+    def close(self):
+        self.pynvml.nvmlShutdown()
+
+
+class SysfsProvider:
+    # amdgpu exposes its busy percentage and vram counters in sysfs, which is just a file read.
+    # i915/xe have no utilization counter there, so only amdgpu cards are listed
+    name = "sysfs"
+
+    def __init__(self, drm_root="/sys/class/drm"):
+        self.cards = []
+        for card in sorted(glob.glob(os.path.join(drm_root, "card[0-9]*"))):
+            device = os.path.join(card, "device")
+            if os.path.exists(os.path.join(device, "gpu_busy_percent")):
+                self.cards.append(device)
+        if not self.cards:
+            raise GPUProviderError("no DRM device with gpu_busy_percent")
+
+        self.names = [self.read_name(device) for device in self.cards]
+
+    def read_name(self, device):
+        for name_file in ("product_name", "product_number"):
+            value = self.read_value(device, name_file)
+            if value:
+                return value
+        return f"AMD GPU ({os.path.basename(os.path.dirname(device))})"
+
+    def read_value(self, device, name):
+        try:
+            with open(os.path.join(device, name)) as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    def read_number(self, device, name):
+        value = self.read_value(device, name)
+        return int(value) if value and value.isdigit() else None
+
+    def read_temperature(self, device):
+        for sensor in glob.glob(os.path.join(device, "hwmon", "hwmon*", "temp1_input")):
+            millidegrees = self.read_number(os.path.dirname(sensor), "temp1_input")
+            if millidegrees is not None:
+                return millidegrees / 1000
+        return None
+
+    def read(self):
+        devices = []
+        for index, device in enumerate(self.cards):
+            load = self.read_number(device, "gpu_busy_percent")
+            devices.append(GPUDevice(
+                index,
+                self.names[index],
+                float(load or 0),
+                self.read_number(device, "mem_info_vram_used"),
+                self.read_number(device, "mem_info_vram_total"),
+                self.read_temperature(device),
+            ))
+        return tuple(devices)
+
+    def close(self):
+        pass
+
+
+class GPUtilProvider:
+    # fallback, forks nvidia-smi on every read so it should only ever run on the poller thread
+    name = "gputil"
+
+    def __init__(self):
+        try:
+            import GPUtil
+        except ImportError:
+            raise GPUProviderError("GPUtil is not installed")
+        self.GPUtil = GPUtil
+
+    def read(self):
+        return tuple(
+            GPUDevice(index, gpu.name, gpu.load * 100, gpu.memoryUsed * 1024 ** 2, gpu.memoryTotal * 1024 ** 2, gpu.temperature)
+            for index, gpu in enumerate(self.GPUtil.getGPUs())
+        )
+
+    def close(self):
+        pass
+
+
+class FakeProvider:
+    # deterministic devices for tests and benchmarks on machines without a gpu
+    name = "fake"
+
+    def __init__(self, device_count=1, period=60, memory_total=8 * 1024 ** 3):
+        self.device_count = device_count
+        self.period = period
+        self.memory_total = memory_total
+        self.start = time.monotonic()
+
+    def read(self):
+        elapsed = time.monotonic() - self.start
+        devices = []
+        for index in range(self.device_count):
+            phase = 2 * math.pi * (elapsed / self.period + index / max(self.device_count, 1))
+            load = 50 + 50 * math.sin(phase)
+            devices.append(GPUDevice(index, f"Fake GPU {index}", load, int(self.memory_total * load / 100), self.memory_total, 40 + load / 2))
+        return tuple(devices)
+
+    def close(self):
+        pass
+
+
+class NullProvider:
+    name = "none"
+
+    def read(self):
+        return ()
+
+    def close(self):
+        pass
+
+
+def detect_provider():
+    for provider in (NvmlProvider, SysfsProvider, GPUtilProvider):
+        try:
+            return provider()
+        except GPUProviderError:
+            continue
+        except Exception as e:
+            print(f"{provider.name} GPU provider error: {e}")
+    return NullProvider()
+
+
+class GPUPoller:
+    # reads the provider on its own thread so a slow or hung driver call never blocks the
+    # sampler or the ui, readers only ever get the cached devices
+    def __init__(self, provider=None, interval=1.0, timeout=5.0):
+        self.provider = provider
+        self.interval = interval
+        self.timeout = timeout  # cached devices older than this are treated as gone
+
+        self._devices = ()
+        self._read_at = 0.0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="gpu-poller", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.timeout)
+            self._thread = None
+        if self.provider is not None:
+            self.provider.close()
+
+    def latest(self):
+        with self._lock:
+            if time.monotonic() - self._read_at > self.timeout:
+                return ()
+            return self._devices
+
+    def _run(self):
+        # the provider is created here so nvml init or a missing driver can't stall startup
+        if self.provider is None:
+            self.provider = detect_provider()
+
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            try:
+                devices = self.provider.read()
+            except Exception as e:
+                print(f"GPU read error: {e}")
+            else:
+                with self._lock:
+                    self._devices = devices
+                    self._read_at = time.monotonic()
+
+            elapsed = time.monotonic() - started
+            if elapsed > self.timeout:
+                print(f"GPU read took {elapsed:.1f}s using {self.provider.name}")
+            self._stop_event.wait(max(0, self.interval - elapsed))
@@ -0,0 +1,121 @@
+import platform
+
+import psutil
+
+# shown in the frames until the startup probes come back
+PENDING_CPU_INFO = {"cpu_name": "Detecting CPU...", "cores": "?", "logical_cores": "?"}
+PENDING_NETWORK_INFO = {"primary_interface": "Detecting...", "initial_io": None}
+PENDING_GPU_INFO = {"gpu_name": "Detecting GPU...", "device_count": "?", "total_memory": "?"}
+
+
+def get_cpu_info():
+    # determine cpu name by going into
+    cpu_name = None
+    if platform.system() == "Windows":
+        from winreg import OpenKey, QueryValueEx, HKEY_LOCAL_MACHINE
+        try:
+            registry_key = OpenKey(HKEY_LOCAL_MACHINE, r"HARDWARE\DESCRIPTION\System\CentralProcessor\0") #get reference to first cpu registry key location
+            cpu_name, reg = QueryValueEx(registry_key, "ProcessorNameString") #retrieve value of ProcessorNameString from the key to get the cpu name
+        except Exception as e:
+            cpu_name = "Unknown CPU"
+    elif platform.system() == "Linux":
+        try:
+            with open("/proc/cpuinfo", "r") as f:
+                for line in f:
+                    if "model name" in line:
+                        cpu_name = line.split(":")[1].strip()
+                        break
+        except Exception:
+            cpu_name = "Unknown CPU"
+
+    #get core counts
+    cores = psutil.cpu_count(logical=False)
+    logical_cores = psutil.cpu_count(logical=True)
+
+    return {
+        "cpu_name": cpu_name,
+        "cores": cores,
+        "logical_cores": logical_cores,
+    }
+
+
+def get_network_info():
+    # Retrieve initial network interface information.
+    try:
+        net_if_addrs = psutil.net_if_addrs()
+
+        wifi_keywords = ['wifi', 'wlan', 'wireless', 'wi-fi', 'wireless lan']
+        ethernet_keywords = ['ethernet', 'eth', 'lan', 'local', 'internet']
+
+        # one pass over the interfaces, keeping the ones with a non-loopback ipv4 address in order
+        candidates = [
+            interface for interface, addrs in net_if_addrs.items()
+            if any(addr.family.name == 'AF_INET' and not addr.address.startswith('127') for addr in addrs)
+        ]
+
+        # prefer wifi, then ethernet, then anything with an address
+        primary_interface = None
+        for keywords in (wifi_keywords, ethernet_keywords):
+            primary_interface = next(
+                (interface for interface in candidates if any(keyword in interface.lower() for keyword in keywords)),
+                None,
+            )
+            if primary_interface:
+                break
+        if not primary_interface and candidates:
+            primary_interface = candidates[0]
+
+        return {
+            "primary_interface": primary_interface or "Unknown",
+            "initial_io": psutil.net_io_counters(pernic=True).get(primary_interface, None)
+        }
+    except Exception as e:
+        return {
+            "primary_interface": f"Error detecting interface: {str(e)}",
+            "initial_io": None
+        }
+
+
+def get_gpu_info():
+    system = platform.system().lower()
+
+    if "windows" in system:
+        try:
+            import wmi
+
+            w = wmi.WMI(namespace="root\\CIMv2")
+            gpu_info = w.query("SELECT * FROM Win32_VideoController")
+            if gpu_info:
+                gpu = gpu_info[0]
+                return {
+                    "gpu_name": gpu.Name,
+                    "device_count": 1,
+                    "total_memory": round(int(gpu.AdapterRAM) / 1024 ** 3, 2),
+                }
+        except Exception as e:
+            print(f"WMI detection error: {e}")
+
+    elif "linux" in system:
+        try:
+            import subprocess
+            output = subprocess.check_output(["lshw", "-C", "display"], text=True)
+            gpu_name = "Unknown"
+            for line in output.split("\n"):
+                if "product:" in line:
+                    gpu_name = line.split(":")[1].strip()
+                    break
+            return {
+                "gpu_name": gpu_name,
+                "device_count": 1,
+                "total_memory": "Unavailable",
+            }
+        except FileNotFoundError:
+            print("lshw not installed. Install with: sudo apt install lshw")
+        except Exception as e:
+            print(f"Linux GPU detection error: {e}")
+
+    return {
+        "gpu_name": "Undetected",
+        "device_count": 0,
+        "total_memory": "Unavailable",
+    }
@@ -0,0 +1,345 @@
+# collector without any ui: python headless.py (or python app.py --headless) on machines
+# with no display, e.g. as a systemd service. customtkinter and matplotlib are never imported
+import argparse
+import os
+import signal
+import sys
+import threading
+
+import psutil
+
+from alerts import AlertMonitor
+from collector import StoreFeed
+from config import (
+    METRICS,
+    ConfigError,
+    ConfigWatcher,
+    interval_changes,
+    load_config,
+    validate_interval,
+    validate_names,
+    validate_threshold,
+)
+from exporter import MetricsExporter, parse_address
+from hardware_info import get_cpu_info, get_gpu_info, get_network_info
+from history_storage import RECORD_FIELDS, MetricsHistory
+from metrics_bus import BusWriter, check_name
+from notifications import LogFileSink, NotificationDispatcher, StreamSink, UnixSocketSink, WebhookSink
+from process_sampler import ProcessSampler
+from sampler import Sampler
+from timeseries import TimeSeriesStore
+
+
+# the flags are checked by the same validators as the config file, so both accept the same values
+
+def number(text):
+    try:
+        return float(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a number, got {text!r}")
+
+
+def interval(text):
+    try:
+        return validate_interval("--interval", number(text))
+    except ConfigError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def interval_setting(text):
+    # METRIC=SECONDS, e.g. cpu=0.1
+    name, separator, seconds = text.partition("=")
+    name = name.strip()
+    if not separator:
+        raise argparse.ArgumentTypeError(f"expected METRIC=SECONDS, got {text!r}")
+    try:
+        validate_names("--sample-interval", [name], METRICS)
+        return name, validate_interval(f"--sample-interval {name}", number(seconds))
+    except ConfigError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def metric_name(text):
+    try:
+        return validate_names("--adaptive", [text], METRICS)[0]
+    except ConfigError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def threshold(metric):
+    def parse(text):
+        try:
+            return validate_threshold(metric, number(text))
+        except ConfigError as e:
+            raise argparse.ArgumentTypeError(str(e))
+
+    return parse
+
+
+def export_address(text):
+    try:
+        parse_address(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return text
+
+
+def bus_name(text):
+    try:
+        return check_name(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Collect dashboard metrics without a display.")
+    parser.add_argument("--headless", action="store_true", help=argparse.SUPPRESS)  # passed through from app.py
+    parser.add_argument(
+        "--config",
+        help="dashboard config file for thresholds, rules and sampling, reloaded when it changes; "
+        "the flags below override it",
+    )
+    parser.add_argument("--interval", type=interval, help="default seconds between samples (default 1)")
+    parser.add_argument(
+        "--sample-interval",
+        type=interval_setting,
+        action="append",
+        default=[],
+        metavar="METRIC=SECONDS",
+        help="own interval for one metric (cpu, cpu_cores, memory, network, gpu), 0.1 to 60 seconds",
+    )
+    parser.add_argument(
+        "--adaptive",
+        type=metric_name,
+        action="append",
+        default=[],
+        metavar="METRIC",
+        help="sample METRIC faster while it is changing or near its threshold, slower while idle",
+    )
+    parser.add_argument(
+        "--interface",
+        action="append",
+        default=[],
+        help="interface to sum into upload/download, repeat for several, 'all' for every non-loopback one "
+        "(default: the detected primary interface)",
+    )
+    parser.add_argument("--output", default="-", help="csv file to append samples to, - for stdout")
+    parser.add_argument("--history", help="directory for the memory-mapped history, same format as the dashboard")
+    parser.add_argument("--cpu-threshold", type=threshold("cpu"), help="alert above this cpu usage %%, 0 to 100")
+    parser.add_argument("--gpu-threshold", type=threshold("gpu"), help="alert above this gpu usage %%, 0 to 100")
+    parser.add_argument("--memory-threshold", type=threshold("memory"), help="alert above this memory usage %%, 0 to 100")
+    parser.add_argument(
+        "--export",
+        type=export_address,
+        metavar="HOST:PORT|unix:PATH",
+        help="serve the latest samples in prometheus and json format, e.g. 127.0.0.1:9101",
+    )
+    parser.add_argument(
+        "--bus",
+        type=bus_name,
+        metavar="NAME",
+        help="collect for the dashboards on this machine that use the same bus name, see metrics_bus.py",
+    )
+    parser.add_argument("--alert-log", help="also append alerts to this file")
+    parser.add_argument("--alert-webhook", help="also post alerts as json to this url")
+    parser.add_argument("--alert-socket", help="also send alerts as json lines to this unix socket")
+    return parser.parse_args(argv)
+
+
+def format_record(timestamp, record):
+    fields = [f"{timestamp:.3f}"]
+    for field in RECORD_FIELDS:
+        value = record.get(field)
+        fields.append("" if value is None else f"{value:.2f}")
+    return ",".join(fields)
+
+
+def alert_sinks(args):
+    sinks = [StreamSink(sys.stderr)]
+    if args.alert_log:
+        sinks.append(LogFileSink(args.alert_log))
+    if args.alert_webhook:
+        sinks.append(WebhookSink(args.alert_webhook))
+    if args.alert_socket:
+        sinks.append(UnixSocketSink(args.alert_socket))
+    return sinks
+
+
+def settings(args, config):
+    # the config file's sampling and thresholds with the command line flags on top
+    intervals = dict(config["sample_intervals"]) if config else {}
+    intervals.update(args.sample_interval)
+    adaptive = set(config["adaptive"]) if config else set()
+    adaptive.update(args.adaptive)
+
+    thresholds = dict(config["thresholds"]) if config else {}
+    for type, threshold in (("cpu", args.cpu_threshold), ("gpu", args.gpu_threshold), ("memory", args.memory_threshold)):
+        if threshold is not None or type not in thresholds:
+            thresholds[type] = threshold
+    return intervals, adaptive, thresholds
+
+
+def reload_config(args, watcher, config, sampler, alert_monitor):
+    # stats the file every couple of seconds, the flags keep overriding whatever it says
+    try:
+        reloaded = watcher.check()
+    except ConfigError as e:
+        print(f"config not reloaded: {e}", file=sys.stderr)
+        return config
+    if reloaded is None:
+        return config
+
+    intervals, adaptive, thresholds = settings(args, reloaded)
+    overridden = dict(args.sample_interval)
+    for name, _, _ in interval_changes(config, reloaded):
+        if name not in overridden:
+            sampler.set_interval(name, intervals[name], name in adaptive)
+    alert_monitor.set_thresholds(thresholds)
+    alert_monitor.set_rules(reloaded["rules"])
+    return reloaded
+
+
+def publish_hardware(bus):
+    # lshw can take a while, viewers fill in their labels whenever this lands
+    hardware = {}
+    for name, probe in (("cpu", get_cpu_info), ("network", get_network_info), ("gpu", get_gpu_info)):
+        try:
+            hardware[name] = probe()
+        except Exception as e:
+            print(f"{name} probe error: {e}", file=sys.stderr)
+    bus.set_state("hardware", hardware)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    config = watcher = None
+    if args.config:
+        try:
+            config = load_config(args.config)
+        except ConfigError as e:
+            print(f"config error: {e}", file=sys.stderr)
+            return 2
+        watcher = ConfigWatcher(args.config)
+    intervals, adaptive, thresholds = settings(args, config)
+    interval = args.interval if args.interval is not None else config["sample_interval"] if config else 1.0
+
+    # every series the dashboard has, long enough for the threshold rules and any config rules
+    rules = config["rules"] if config else ()
+    history_seconds = max([60] + [rule.window for rule in rules])
+    store = TimeSeriesStore(history_seconds=history_seconds, intervals=intervals)
+    if "all" in args.interface:
+        feed = StoreFeed(store)
+    elif args.interface:
+        feed = StoreFeed(store, args.interface)
+    else:
+        # the probe reports "Unknown" or an error message when it can't find one, sum everything then
+        primary_interface = get_network_info()["primary_interface"]
+        if primary_interface in psutil.net_if_addrs():
+            feed = StoreFeed(store, [primary_interface])
+        else:
+            print(f"no primary network interface ({primary_interface}), summing every interface", file=sys.stderr)
+            feed = StoreFeed(store)
+    notifications = NotificationDispatcher(alert_sinks(args))
+    alert_monitor = AlertMonitor(store, thresholds, notify=notifications.submit, rules=rules)
+
+    # bound before anything else starts, a port in use is reported and nothing is left running
+    export = args.export or (config["export"] if config else None)
+    exporter = MetricsExporter(export) if export else None
+    if exporter is not None:
+        try:
+            exporter.start()
+        except OSError as e:
+            print(f"metrics export on {export} failed: {e}", file=sys.stderr)
+            return 1
+
+    # the dashboards' viewers also need the hardware info and the process table from here
+    segment = args.bus or (config["bus"] if config else None)
+    bus = process_sampler = None
+    if segment:
+        try:
+            bus = BusWriter(segment)
+        except FileExistsError:
+            print(f"metrics bus {segment} already has a collector", file=sys.stderr)
+            return 1
+        except OSError as e:
+            print(f"metrics bus {segment} failed: {e}", file=sys.stderr)
+            return 1
+        threading.Thread(target=publish_hardware, args=(bus,), name="probe", daemon=True).start()
+        process_sampler = ProcessSampler(top_n=8)
+
+    if args.output == "-":
+        output = sys.stdout
+        write_header = True
+    else:
+        write_header = not os.path.exists(args.output) or os.path.getsize(args.output) == 0
+        output = open(args.output, "a", buffering=1)
+    if write_header:
+        output.write(",".join(("timestamp",) + RECORD_FIELDS) + "\n")
+
+    history = MetricsHistory(args.history) if args.history else None
+    if history is not None:
+        history.start()
+
+    # systemd stops services with SIGTERM
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+
+    sampler = Sampler(
+        interval=interval,
+        intervals=intervals,
+        adaptive=adaptive,
+        thresholds=alert_monitor.threshold_dict,
+    )
+    if exporter is not None:
+        sampler.subscribe(exporter.update)
+    if bus is not None:
+        sampler.subscribe(bus.publish)
+        process_sampler.start()
+    sampler.start()
+    notifications.start()
+    processes_published = None
+
+    # snapshots only carry the metrics that were due, history gets the latest of each
+    latest = {}
+    try:
+        while not stop_event.is_set():
+            if watcher is not None:
+                config = reload_config(args, watcher, config, sampler, alert_monitor)
+
+            snapshot = sampler.next(timeout=0.5)
+            if snapshot is None:
+                continue
+
+            feed.append(snapshot)
+            record = feed.record(snapshot)
+            output.write(format_record(snapshot.timestamp, record) + "\n")
+            output.flush()
+            alert_monitor.check()
+            if process_sampler is not None:
+                generation, top = process_sampler.top()
+                if generation != processes_published:
+                    processes_published = generation
+                    bus.set_state("processes", (generation, top))
+            if history is not None:
+                latest.update((field, value) for field, value in record.items() if value is not None)
+                history.append(snapshot.timestamp, latest)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sampler.stop()
+        notifications.stop()
+        if exporter is not None:
+            exporter.stop()
+        if bus is not None:
+            process_sampler.stop()
+            bus.close()
+        if history is not None:
+            history.stop()
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
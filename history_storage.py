@@ -0,0 +1,247 @@
+import glob
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# one fixed-width record per sample, unknown values are stored as nan
+RECORD_DTYPE = np.dtype([
+    ("timestamp", "<f8"),
+    ("cpu", "<f4"),
+    ("memory", "<f4"),
+    ("upload", "<f4"),
+    ("download", "<f4"),
+    ("gpu", "<f4"),
+])
+RECORD_FIELDS = RECORD_DTYPE.names[1:]
+
+# which store series each record field is filled from
+SERIES_FIELDS = {
+    "cpu": "cpu",
+    "memory": "memory",
+    "network.upload": "upload",
+    "network.download": "download",
+    "gpu": "gpu",
+}
+
+SEGMENT_SUFFIX = ".seg"
+LOCK_NAME = ".lock"  # the writing process holds an exclusive flock on it, like the metrics bus segment
+
+
+class Segment:
+    # one preallocated, memory-mapped file of records, named after its first timestamp
+    def __init__(self, path, capacity, create=False):
+        self.path = path
+        if create:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode="w+", shape=(capacity,))
+        else:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode="r+")
+        self.capacity = len(self.records)
+
+        # unused slots have a zero timestamp and always sit at the end
+        self.count = int(np.count_nonzero(self.records["timestamp"]))
+
+    @property
+    def full(self):
+        return self.count >= self.capacity
+
+    def write(self, rows):
+        count = min(len(rows), self.capacity - self.count)
+        self.records[self.count:self.count + count] = rows[:count]
+        self.count += count
+        return count
+
+    def flush(self):
+        self.records.flush()
+
+    def close(self):
+        self.flush()
+        del self.records
+
+
+class MetricsHistory:
+    # appends records to segment-rotated memory-mapped files on a writer thread and
+    # serves range reads so the charts can backfill after a restart
+    def __init__(self, directory, segment_records=86400, retention_seconds=7 * 86400, flush_interval=5.0, resolution=1.0):
+        self.directory = os.path.expanduser(directory)
+        self.segment_records = segment_records
+        self.retention_seconds = retention_seconds
+        self.flush_interval = flush_interval
+
+        # at most one record per resolution seconds, however fast the sampler runs
+        self.resolution = resolution
+        self.last_timestamp = None
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        # only the process holding the lock writes, any other one only reads. without fcntl
+        # (windows) there is no lock and every process writes, as before
+        self.lock_fd = None
+        self.writable = fcntl is None
+
+        self.pending = queue.SimpleQueue()
+        self.segment = None
+        self._lock = threading.Lock()  # guards segment rotation against concurrent reads
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def segment_paths(self):
+        return sorted(glob.glob(os.path.join(self.directory, f"*{SEGMENT_SUFFIX}")), key=self.segment_start)
+
+    @staticmethod
+    def segment_start(path):
+        return float(os.path.basename(path)[:-len(SEGMENT_SUFFIX)])
+
+    def acquire(self):
+        # False while another dashboard or headless run writes to the same directory
+        if self.writable:
+            return True
+        fd = os.open(os.path.join(self.directory, LOCK_NAME), os.O_RDWR | os.O_CREAT | os.O_CLOEXEC, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self.lock_fd = fd
+        self.writable = True
+        return True
+
+    def release(self):
+        if self.lock_fd is not None:
+            os.close(self.lock_fd)
+            self.lock_fd = None
+            self.writable = fcntl is None
+
+    def start(self):
+        # returns whether this process persists samples, otherwise append() drops them
+        if self._thread is not None:
+            return True
+        if not self.acquire():
+            print(f"History: {self.directory} is written by another process, not persisting here")
+            return False
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval * 2)
+            self._thread = None
+        self.write_pending()
+        with self._lock:
+            if self.segment is not None:
+                self.segment.close()
+                self.segment = None
+        self.release()
+
+    def append(self, timestamp, values):
+        # called from the tk thread, only queues the record
+        if not self.writable:
+            return
+        if self.last_timestamp is not None and timestamp - self.last_timestamp < self.resolution:
+            return
+        self.last_timestamp = timestamp
+
+        row = [timestamp]
+        for field in RECORD_FIELDS:
+            value = values.get(field)
+            row.append(np.nan if value is None else value)
+        self.pending.put(tuple(row))
+
+    def append_from_store(self, timestamp, store):
+        values = {}
+        for series, field in SERIES_FIELDS.items():
+            if series in store:
+                values[field] = store.series(series).latest()
+        self.append(timestamp, values)
+
+    def open_segment(self, first_timestamp):
+        paths = self.segment_paths()
+        if paths:
+            segment = Segment(paths[-1], self.segment_records)
+            if not segment.full:
+                return segment
+            segment.close()
+
+        path = os.path.join(self.directory, f"{first_timestamp:.3f}{SEGMENT_SUFFIX}")
+        return Segment(path, self.segment_records, create=True)
+
+    def write_pending(self):
+        rows = []
+        while True:
+            try:
+                rows.append(self.pending.get_nowait())
+            except queue.Empty:
+                break
+        if not rows:
+            return
+
+        rows = np.array(rows, dtype=RECORD_DTYPE)
+        with self._lock:
+            while len(rows):
+                if self.segment is None or self.segment.full:
+                    if self.segment is not None:
+                        self.segment.close()
+                    self.segment = self.open_segment(rows["timestamp"][0])
+                written = self.segment.write(rows)
+                rows = rows[written:]
+            self.segment.flush()
+
+    def apply_retention(self):
+        cutoff = time.time() - self.retention_seconds
+        paths = self.segment_paths()
+        # a segment can go once the one after it starts before the cutoff, the newest always stays
+        for path, next_path in zip(paths, paths[1:]):
+            if self.segment_start(next_path) >= cutoff:
+                break
+            if self.segment is not None and self.segment.path == path:
+                continue
+            try:
+                os.remove(path)
+            except OSError as e:
+                print(f"History retention error: {e}")
+
+    def read_range(self, start, end):
+        # every record with start <= timestamp <= end, oldest first
+        chunks = []
+        with self._lock:
+            paths = self.segment_paths()
+            for i, path in enumerate(paths):
+                if i + 1 < len(paths) and self.segment_start(paths[i + 1]) < start:
+                    continue
+                if self.segment_start(path) > end:
+                    break
+
+                records = np.memmap(path, dtype=RECORD_DTYPE, mode="r")
+                timestamps = records["timestamp"]
+                count = int(np.count_nonzero(timestamps))
+                first = np.searchsorted(timestamps[:count], start, side="left")
+                last = np.searchsorted(timestamps[:count], end, side="right")
+                if last > first:
+                    chunks.append(np.array(records[first:last]))
+                del records
+
+        if not chunks:
+            return np.zeros(0, dtype=RECORD_DTYPE)
+        return np.concatenate(chunks)
+
+    def _run(self):
+        self.apply_retention()
+        last_retention = time.monotonic()
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                self.write_pending()
+                if time.monotonic() - last_retention > 3600:
+                    self.apply_retention()
+                    last_retention = time.monotonic()
+            except Exception as e:
+                print(f"History write error: {e}")
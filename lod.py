@@ -0,0 +1,81 @@
+import math
+
+import numpy as np
+
+from timeseries import RingBuffer
+
+
+class BucketLevel:
+    # min/max/mean of every `resolution` second bucket, built up one sample at a time
+    def __init__(self, resolution, capacity):
+        self.resolution = resolution
+        self.capacity = capacity
+        self.mins = RingBuffer(capacity)
+        self.maxs = RingBuffer(capacity)
+        self.means = RingBuffer(capacity)
+
+        # the bucket that is still filling up, it is kept as the newest entry and rewritten in place
+        self.bucket = None
+        self.low = 0.0
+        self.high = 0.0
+        self.total = 0.0
+        self.count = 0
+
+        self._positions = np.zeros(capacity, dtype=np.float32)
+
+    def append(self, timestamp, value):
+        bucket = math.floor(timestamp / self.resolution)
+        bucket_start = bucket * self.resolution
+
+        if bucket != self.bucket:
+            self.bucket = bucket
+            self.low = self.high = self.total = value
+            self.count = 1
+            self.mins.append(bucket_start, value)
+            self.maxs.append(bucket_start, value)
+            self.means.append(bucket_start, value)
+            return
+
+        self.low = min(self.low, value)
+        self.high = max(self.high, value)
+        self.total += value
+        self.count += 1
+        self.mins.update_latest(bucket_start, self.low)
+        self.maxs.update_latest(bucket_start, self.high)
+        self.means.update_latest(bucket_start, self.total / self.count)
+
+    def window(self, time_range):
+        # (timestamps, mins, maxs, means) views of the buckets covering the last time_range seconds
+        count = min(math.ceil(time_range / self.resolution), self.capacity)
+        timestamps, mins = self.mins.last(count)
+        _, maxs = self.maxs.last(count)
+        _, means = self.means.last(count)
+        return timestamps, mins, maxs, means
+
+    def positions(self, timestamps, time_range):
+        # x positions on the "seconds ago" axis, newest bucket at the right edge
+        positions = self._positions[:len(timestamps)]
+        if len(timestamps):
+            np.subtract(timestamps, timestamps[-1] - time_range + 1, out=positions, casting="unsafe")
+        return positions
+
+
+class LevelOfDetail:
+    # pre-aggregated copies of one series at several resolutions, so a chart can draw
+    # about one bucket per pixel column whatever time range is selected
+    def __init__(self, history_seconds=3600, resolutions=(1, 10, 60)):
+        self.levels = [
+            BucketLevel(resolution, math.ceil(history_seconds / resolution) + 1)
+            for resolution in sorted(resolutions)
+        ]
+
+    def append(self, timestamp, value):
+        for level in self.levels:
+            level.append(timestamp, value)
+
+    def select(self, time_range, max_points):
+        # finest level that still fits into max_points buckets
+        for level in self.levels:
+            if time_range / level.resolution <= max_points:
+                return level
+        return self.levels[-1]
@@ -1,17 +1,22 @@
 import customtkinter as ctk
+import math
 import psutil
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
+
+from canvas_chart import CanvasAxes
+from chart_frame import ChartFrame
+from chart_renderer import AreaFill, chart_axes
+from lod import LevelOfDetail
+from redraw_scheduler import DRAFT_DETAIL
 
 darker_lightblue = "#4682B4"
 
-class MemoryFrame(ctk.CTkFrame):
-    def __init__(self, parent):
-        super().__init__(parent, fg_color="white")
+class MemoryFrame(ChartFrame):
+    def __init__(self, parent, store, blit=True, scheduler=None, renderer="matplotlib", shared_figure=None, feed=None):
+        super().__init__(parent, "Memory", store, scheduler, shared_figure, feed)
 
-        self.grid_columnconfigure(0, weight=3)  # col 0 for memory info
-        self.grid_columnconfigure(1, weight=0)  # col 1 for slider
-        self.grid_rowconfigure(4, weight=1)  # row 4 for graph
+        self.contents_frame.grid_columnconfigure(0, weight=3)  # col 0 for memory info
+        self.contents_frame.grid_columnconfigure(1, weight=0)  # col 1 for slider
+        self.contents_frame.grid_rowconfigure(4, weight=1)  # row 4 for graph
 
         self.memory_usage_text = None
         self.memory_label = None
@@ -19,26 +24,21 @@ class MemoryFrame(ctk.CTkFrame):
         self.memory_stats_label = None
         self.create_memory_labels()
 
-        self.time_range = 60
-        self.memory_data = [0] * 3600
+        self.memory_data = store.series("memory")
+        self.memory_lod = LevelOfDetail(store.history_seconds)
 
-        self.figure = None
-        self.ax = None
         self.line = None
         self.fill_area = None
-        self.create_plot()
-
-        self.time_slider = None
-        self.create_slider()
-
-        self.canvas = FigureCanvasTkAgg(self.figure, self)
-        self.canvas.get_tk_widget().grid(row=4, column=0, columnspan=2, sticky="nsew", padx=10, pady=10)
-
-        self.update()
+        if renderer == "canvas":
+            self.create_canvas_plot()
+        else:
+            self.create_plot()
+            self.attach_plot([self.line, self.fill_area.collection, self.envelope.collection], blit)
+        self.show_chart(row=4)
 
     def create_memory_labels(self):
         self.memory_label = ctk.CTkLabel(
-            self,
+            self.contents_frame,
             text="Memory Usage Monitor",
             font=("Segoe UI", 18, "bold"),
             text_color="darkblue",
@@ -47,7 +47,7 @@ class MemoryFrame(ctk.CTkFrame):
 
         self.memory_usage_text = ctk.StringVar()
         self.memory_usage_label = ctk.CTkLabel(
-            self,
+            self.contents_frame,
             textvariable=self.memory_usage_text,
             font=("Segoe UI", 16, "italic"),
             text_color="black",
@@ -57,7 +57,7 @@ class MemoryFrame(ctk.CTkFrame):
         memory = psutil.virtual_memory()
         total_memory = memory.total / (1024 ** 3)  # Convert to GB
         self.memory_stats_label = ctk.CTkLabel(
-            self,
+            self.contents_frame,
             text=f"Total Memory: {total_memory:.2f} GB",
             font=("Segoe UI", 13, "normal"),
             text_color="gray",
@@ -65,8 +65,7 @@ class MemoryFrame(ctk.CTkFrame):
         self.memory_stats_label.grid(row=2, column=0, sticky="nw", padx=10, pady=5)
 
     def create_plot(self):
-        self.figure = Figure(figsize=(7, 2), dpi=90)
-        self.ax = self.figure.add_subplot(111)
+        self.figure, self.ax = chart_axes("memory", self.shared_figure)
 
         self.ax.set_facecolor("white")
         self.ax.tick_params(axis='x', colors='gray')
@@ -89,63 +88,50 @@ class MemoryFrame(ctk.CTkFrame):
         self.ax.grid(color="lightblue", linestyle="-", linewidth=0.3, alpha=0.7)
 
         self.line, = self.ax.plot([0] * 60, color=darker_lightblue, linewidth=0.8)
-        self.fill_area = self.ax.fill_between(range(self.time_range), [0] * self.time_range, color="lightblue", alpha=0.3)
-
-    def create_slider(self):
-        # Slider frame
-        slider_frame = ctk.CTkFrame(self, fg_color="transparent")
-        slider_frame.grid(row=0, column=1, rowspan=2, sticky="ne", padx=10, pady=5)
+        self.fill_area = AreaFill(self.ax, color="lightblue", alpha=0.3)
 
-        # Slider label
-        slider_label = ctk.CTkLabel(slider_frame, text="Select Time Range (minutes):", text_color="black")
-        slider_label.pack(anchor="e", pady=5)
+        # min/max band of each bucket so spikes stay visible on long time ranges
+        self.envelope = AreaFill(self.ax, color=darker_lightblue, alpha=0.25, linewidth=0)
 
-        # 1 min label
-        min_label = ctk.CTkLabel(slider_frame, text="1", text_color="gray")
-        min_label.pack(side="left", padx=5)
-
-        # Init the slider
-        self.time_slider = ctk.CTkSlider(
-            slider_frame, from_=60, to=3600, number_of_steps=400, command=self.update_time_range
-        )
-        self.time_slider.set(60)  # Default to 60 seconds (1 minute)
-        self.time_slider.pack(side="left", padx=5)
-
-        # 60 mins label
-        max_label = ctk.CTkLabel(slider_frame, text="60", text_color="gray")
-        max_label.pack(side="right", padx=5)
+    # the same chart from tk canvas items, the axes is also the canvas and the renderer
+    def create_canvas_plot(self):
+        self.ax = self.canvas = self.renderer = CanvasAxes(self.contents_frame, darker_lightblue, "lightblue")
+        self.ax.set_ylim(0, 100)
+        self.ax.set_yticks([0, 20, 40, 60, 80, 100])
+        self.ax.set_ylabel("% Memory Usage")
+        self.update_time_axis()
 
-    def update_time_range(self, value):
-        self.time_range = int(float(value))
-        self.update_plot()
+        self.line, = self.ax.plot([], [], color=darker_lightblue, linewidth=0.8)
+        self.fill_area = self.ax.fill("lightblue", alpha=0.3)
+        self.envelope = self.ax.fill(darker_lightblue, alpha=0.25)
 
-    def update(self):
-        memory = psutil.virtual_memory()
-        memory_usage_percent = memory.percent
+    def on_sample(self, snapshot):
+        memory_usage_percent = snapshot.values.get("memory")
+        if memory_usage_percent is None:
+            return
         self.memory_usage_text.set(f"{memory_usage_percent:.1f}%")
 
-        self.memory_data.append(memory_usage_percent)
-        if len(self.memory_data) > 3600:
-            self.memory_data.pop(0)
-
-        self.update_plot()
-        self.after(1000, self.update)  # Update each second
-
-    def update_plot(self):
-        data_to_plot = self.memory_data[-self.time_range:]
+        self.memory_lod.append(snapshot.timestamp, memory_usage_percent)
 
-        self.line.set_ydata(data_to_plot)
-        self.line.set_xdata(range(len(data_to_plot)))
-        if self.fill_area:
-            self.fill_area.remove()
-        self.fill_area = self.ax.fill_between(range(len(data_to_plot)), data_to_plot, color="lightblue", alpha=0.3)
+    def load_history(self, records):
+        for timestamp, value in zip(records["timestamp"], records["memory"]):
+            if not math.isnan(value):
+                self.memory_data.append(timestamp, value)
+                self.memory_lod.append(timestamp, value)
 
-        self.ax.set_xlim(0, self.time_range)
+    def update_plot(self, draft=False):
+        # keep collecting while collapsed, just don't draw
+        if self.is_collapsed:
+            return
 
-        self.ax.set_xlabel(f"Last {self.time_range//60} minute(s)", color="gray", fontsize=10)
+        # drafts (while a slider is dragged) get a fraction of the point budget
+        max_points = self.ax.bbox.width * (DRAFT_DETAIL if draft else 1)
+        level = self.memory_lod.select(self.time_range, max_points)
+        timestamps, lows, highs, means = level.window(self.time_range)
+        positions = level.positions(timestamps, self.time_range)
 
-        step = max(1, self.time_range // 20)
-        ticks = list(range(0, self.time_range + 1, step))
-        self.ax.set_xticks(ticks)
+        self.line.set_data(positions, means)
+        self.fill_area.set_data(positions, means)
+        self.envelope.set_data(positions, highs, lows)
 
-        self.canvas.draw()
+        self.renderer.render()
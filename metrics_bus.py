@@ -0,0 +1,365 @@
+# one collector, many viewers on the same machine: the collector writes every snapshot into a
+# ring in a shared memory segment, plus the latest hardware info and process table, and every
+# other dashboard maps the segment read-only instead of sampling and probing again. a seqlock
+# guards the header: the collector makes the sequence odd while it writes and even again when
+# it's done, viewers copy what they need and retry if the sequence moved under them, so the
+# collector never waits on a viewer. linux only, elsewhere every dashboard samples on its own
+import io
+import os
+import pickle
+import re
+import struct
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+from types import MappingProxyType
+
+from sampler import Snapshot
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+SHM_DIR = "/dev/shm"  # where linux keeps posix shared memory, viewers open the file read-only
+MAGIC = b"SDBUS\x00\x00\x01"  # written last, a segment without it is still being set up
+RING_BYTES = 16 * 1024 * 1024  # a few hours of snapshots at the default intervals
+STATE_BYTES = 1024 * 1024
+
+# magic, sequence, head, tail, ring capacity, state capacity, state length, state generation.
+# head and tail are byte positions that only grow, the ring offset is position % capacity
+HEADER = struct.Struct("<8sQQQQQQQ")
+SEQUENCE = struct.Struct("<Q")
+SEQUENCE_OFFSET = 8
+RECORD = struct.Struct("<Id")  # pickle length and timestamp, before every pickled snapshot in the ring
+
+READ_TIMEOUT = 1.0  # seconds a viewer retries a read before the collector counts as stuck
+NAME_PATTERN = re.compile(r"[A-Za-z0-9_.-]+")
+
+# what a viewer will unpickle: the namedtuples snapshots are made of and nothing else
+ALLOWED_MODULES = ("sampler", "procfs", "gpu_providers", "process_sampler")
+# what a corrupt or refused record raises while it is decoded, the record is dropped
+DECODE_ERRORS = (pickle.UnpicklingError, struct.error, EOFError, ValueError, AttributeError, ImportError, IndexError)
+
+
+class BusError(OSError):
+    pass
+
+
+def check_name(name):
+    if not isinstance(name, str) or not NAME_PATTERN.fullmatch(name):
+        raise ValueError(f"bus name {name!r} can only use letters, digits, '.', '_' and '-'")
+    return name
+
+
+def shm_path(name):
+    return os.path.join(SHM_DIR, check_name(name))
+
+
+def check_platform():
+    if fcntl is None or not sys.platform.startswith("linux"):
+        raise BusError("the shared memory bus needs linux")
+
+
+def collector_running(fd):
+    # the collector holds an exclusive flock on its segment for as long as it runs, the kernel
+    # drops it when the process exits however it exits
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return True
+    fcntl.flock(fd, fcntl.LOCK_UN)
+    return False
+
+
+def frozen_mapping(items):
+    return MappingProxyType(items)
+
+
+class BusPickler(pickle.Pickler):
+    # network and disk readings keep their counters in a read-only mapping, which can't be pickled
+    def reducer_override(self, obj):
+        if type(obj) is MappingProxyType:
+            return frozen_mapping, (dict(obj),)
+        return NotImplemented
+
+
+class BusUnpickler(pickle.Unpickler):
+    def find_class(self, module, name):
+        if module == __name__ and name == "frozen_mapping":
+            return frozen_mapping
+        if module in ALLOWED_MODULES or module.startswith("psutil."):
+            cls = super().find_class(module, name)
+            if isinstance(cls, type) and issubclass(cls, tuple):
+                return cls
+        raise pickle.UnpicklingError(f"{module}.{name} isn't allowed on the metrics bus")
+
+
+def dumps(value):
+    buffer = io.BytesIO()
+    BusPickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(value)
+    return buffer.getvalue()
+
+
+def loads(data):
+    return BusUnpickler(io.BytesIO(data)).load()
+
+
+class BusWriter:
+    # the collector's side, publish() is a sampler listener and set_state() is called from the
+    # tk thread, a lock keeps their writes apart. FileExistsError when another collector runs
+    def __init__(self, name, ring_bytes=RING_BYTES, state_bytes=STATE_BYTES):
+        check_platform()
+        self.name = name
+        self.path = shm_path(name)
+        self.capacity = ring_bytes
+        self.state_capacity = state_bytes
+        self.ring_start = HEADER.size + state_bytes
+
+        remove_stale(self.path)
+        self.memory = shared_memory.SharedMemory(name, create=True, size=self.ring_start + ring_bytes)
+        os.chmod(self.path, 0o644)  # other users' dashboards can read it, only this process writes
+        self.lock_fd = os.open(self.path, os.O_RDONLY | os.O_CLOEXEC)
+        fcntl.flock(self.lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+        self.buf = self.memory.buf
+        self.sequence = 0
+        self.head = 0
+        self.tail = 0
+        self.state = {}
+        self.state_length = 0
+        self.state_generation = 0
+        self._lock = threading.Lock()
+        self.write_header()
+
+    def write_header(self):
+        HEADER.pack_into(
+            self.buf, 0, MAGIC, self.sequence, self.head, self.tail,
+            self.capacity, self.state_capacity, self.state_length, self.state_generation,
+        )
+
+    def begin(self):
+        self.sequence += 1
+        SEQUENCE.pack_into(self.buf, SEQUENCE_OFFSET, self.sequence)
+
+    def end(self):
+        # head, tail and state go in while the sequence is still odd and the even sequence last,
+        # so a viewer that sees it even also sees the positions that go with it
+        self.write_header()
+        self.sequence += 1
+        SEQUENCE.pack_into(self.buf, SEQUENCE_OFFSET, self.sequence)
+
+    def ring_write(self, position, data):
+        offset = position % self.capacity
+        first = min(len(data), self.capacity - offset)
+        start = self.ring_start + offset
+        self.buf[start:start + first] = data[:first]
+        if first < len(data):
+            self.buf[self.ring_start:self.ring_start + len(data) - first] = data[first:]
+
+    def publish(self, snapshot):
+        data = dumps(dict(snapshot.values))
+        record = RECORD.pack(len(data), snapshot.timestamp) + data
+        if len(record) > self.capacity:
+            raise ValueError(f"snapshot of {len(record)} bytes doesn't fit the {self.capacity} byte ring")
+
+        with self._lock:
+            if self.buf is None:
+                return  # closed while the sampler was stopping
+            self.begin()
+            # the oldest snapshots make room, a viewer that hadn't read them yet skips ahead
+            while self.head + len(record) - self.tail > self.capacity:
+                length, _ = RECORD.unpack(ring_bytes(self.buf, self.ring_start, self.capacity, self.tail, RECORD.size))
+                self.tail += RECORD.size + length
+            self.ring_write(self.head, record)
+            self.head += len(record)
+            self.end()
+
+    def set_state(self, key, value):
+        # small values every viewer needs whenever it starts, e.g. the hardware info
+        with self._lock:
+            if self.buf is None:
+                return
+            self.state[key] = value
+            data = dumps(self.state)
+            if len(data) > self.state_capacity:
+                del self.state[key]
+                raise ValueError(f"bus state of {len(data)} bytes doesn't fit in {self.state_capacity}")
+            self.begin()
+            self.buf[HEADER.size:HEADER.size + len(data)] = data
+            self.state_length = len(data)
+            self.state_generation += 1
+            self.end()
+
+    def close(self):
+        if self.memory is None:
+            return
+        with self._lock:
+            # viewers notice the lock going and one of them takes over
+            self.buf = None
+            self.memory.close()
+            try:
+                self.memory.unlink()
+            except FileNotFoundError:
+                pass
+            os.close(self.lock_fd)
+            self.memory = None
+
+
+def remove_stale(path):
+    # a segment left by a collector that died, its lock went with it. one still being set up
+    # has no magic yet and is left alone, creating over it fails with FileExistsError
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+    except FileNotFoundError:
+        return
+    try:
+        if collector_running(fd) or os.pread(fd, len(MAGIC), 0) != MAGIC:
+            return
+        # only unlink what was checked, not a segment another viewer created in the meantime
+        if os.stat(path).st_ino == os.fstat(fd).st_ino:
+            os.unlink(path)
+    except FileNotFoundError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def ring_bytes(buf, ring_start, capacity, position, length):
+    offset = position % capacity
+    start = ring_start + offset
+    if offset + length <= capacity:
+        return bytes(buf[start:start + length])
+    first = capacity - offset
+    return bytes(buf[start:start + first]) + bytes(buf[ring_start:ring_start + length - first])
+
+
+class BusReader:
+    # a viewer's side, the segment is mapped read-only. drain() returns the snapshots published
+    # since the last call, the first call returns every snapshot still in the ring. raises
+    # FileNotFoundError without a collector and BusError while the segment is being set up
+    def __init__(self, name):
+        check_platform()
+        import mmap
+
+        self.name = name
+        self.path = shm_path(name)
+        self.fd = os.open(self.path, os.O_RDONLY | os.O_CLOEXEC)
+        try:
+            self.map = mmap.mmap(self.fd, 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            os.close(self.fd)
+            raise BusError(f"can't map {self.path}: {e}") from None
+        self.buf = memoryview(self.map)
+
+        header = HEADER.unpack_from(self.buf, 0)
+        if header[0] != MAGIC:
+            self.close()
+            raise BusError(f"{self.path} isn't ready yet")
+        self.capacity = header[4]
+        self.ring_start = HEADER.size + header[5]
+
+        self.position = None
+        self.last_timestamp = None  # snapshots are handed out oldest first, never twice
+        self.state = {}
+        self.state_generation = 0
+        self.skipped = 0  # times snapshots were overwritten before this viewer got to them
+        self.corrupt = 0  # records and states that couldn't be decoded and were dropped
+
+    def read(self, copy):
+        # the seqlock read side, copy() runs until it saw a sequence that didn't move
+        deadline = None
+        while True:
+            before = SEQUENCE.unpack_from(self.buf, SEQUENCE_OFFSET)[0]
+            if not before & 1:
+                result = copy()
+                if SEQUENCE.unpack_from(self.buf, SEQUENCE_OFFSET)[0] == before:
+                    return result
+            if deadline is None:
+                deadline = time.monotonic() + READ_TIMEOUT
+            elif time.monotonic() > deadline:
+                raise BusError(f"the collector on {self.path} stopped in the middle of a write")
+            time.sleep(0)
+
+    def copy_new(self):
+        _, _, head, tail, _, _, state_length, state_generation = HEADER.unpack_from(self.buf, 0)
+        position = tail if self.position is None else max(self.position, tail)
+        data = ring_bytes(self.buf, self.ring_start, self.capacity, position, head - position)
+        state = None
+        if state_generation != self.state_generation:
+            state = bytes(self.buf[HEADER.size:HEADER.size + state_length])
+        return head, tail, position, data, state_generation, state
+
+    def drain(self, since=None):
+        # snapshots older than since are skipped without being unpickled
+        head, tail, position, data, state_generation, state = self.read(self.copy_new)
+        if self.position is not None and self.position < tail:
+            self.skipped += 1
+        self.position = head
+
+        if state is not None:
+            try:
+                self.state = loads(state) if state else {}
+            except DECODE_ERRORS:
+                self.corrupt += 1  # the old state stays until the next good one
+            self.state_generation = state_generation
+
+        # a record that doesn't decode is dropped, one whose header is cut off ends the batch
+        snapshots = []
+        offset = 0
+        while offset < len(data):
+            try:
+                length, timestamp = RECORD.unpack_from(data, offset)
+            except struct.error:
+                self.corrupt += 1
+                break
+            offset += RECORD.size
+            if (since is None or timestamp >= since) and (self.last_timestamp is None or timestamp > self.last_timestamp):
+                try:
+                    values = loads(data[offset:offset + length])
+                except DECODE_ERRORS:
+                    self.corrupt += 1
+                else:
+                    self.last_timestamp = timestamp
+                    snapshots.append(Snapshot(timestamp, MappingProxyType(values)))
+            offset += length
+        return snapshots
+
+    def oldest_timestamp(self):
+        # of the oldest snapshot still in the ring, None while it is empty
+        def copy_oldest():
+            _, _, head, tail = HEADER.unpack_from(self.buf, 0)[:4]
+            if head == tail:
+                return None
+            return RECORD.unpack(ring_bytes(self.buf, self.ring_start, self.capacity, tail, RECORD.size))[1]
+
+        return self.read(copy_oldest)
+
+    def collector_running(self):
+        # False once the collector exited, or a new one replaced the segment this viewer has mapped
+        try:
+            if os.stat(self.path).st_ino != os.fstat(self.fd).st_ino:
+                return False
+        except FileNotFoundError:
+            return False
+        return collector_running(self.fd)
+
+    def close(self):
+        if self.fd is None:
+            return
+        self.buf.release()
+        self.map.close()
+        os.close(self.fd)
+        self.fd = None
+
+
+class SharedProcesses:
+    # stands in for the ProcessSampler of a viewer's process table, rows come from the collector
+    def __init__(self, reader, top_n):
+        self.reader = reader
+        self.top_n = top_n
+
+    def latest(self, sort_key):
+        generation, top = self.reader.state.get("processes", (None, {}))
+        return generation, top.get(sort_key, ())[:self.top_n]
@@ -1,85 +1,63 @@
 import customtkinter as ctk
+import math
 import psutil
-import platform
-import time
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
+
+from canvas_chart import CanvasAxes
+from chart_frame import ChartFrame
+from chart_renderer import AreaFill, chart_axes, nice_limit
+from hardware_info import PENDING_NETWORK_INFO
+from lod import LevelOfDetail
+from redraw_scheduler import DRAFT_DETAIL
 
 darker_lightgreen = "#2E8B57"
 
-def get_network_info():
-    # Retrieve initial network interface information.
-    try:
-        net_if_addrs = psutil.net_if_addrs()
-        primary_interface = None
-        
-        wifi_keywords = ['wifi', 'wlan', 'wireless', 'wi-fi', 'wireless lan']
-        ethernet_keywords = ['ethernet', 'eth', 'lan', 'local', 'internet']
 
-        interfaces = list(net_if_addrs.keys())
-        
-        for interface in interfaces:
-            interface_lower = interface.lower()
-            
-            if any(addr.family.name == 'AF_INET' and not addr.address.startswith('127') for addr in net_if_addrs[interface]):
-                if any(keyword in interface_lower for keyword in wifi_keywords):
-                    primary_interface = interface
-                    break
-                
-        #Fallback if it can't find anything
-        if not primary_interface:
-            for interface in interfaces:
-                interface_lower = interface.lower()
-                if any(addr.family.name == 'AF_INET' and not addr.address.startswith('127') for addr in net_if_addrs[interface]):
-                    if any(keyword in interface_lower for keyword in ethernet_keywords):
-                        primary_interface = interface
-                        break
-
-        if not primary_interface:
-            for interface in interfaces:
-                if any(addr.family.name == 'AF_INET' and not addr.address.startswith('127') for addr in net_if_addrs[interface]):
-                    primary_interface = interface
-                    break
-        
-        return {
-            "primary_interface": primary_interface or "Unknown",
-            "initial_io": psutil.net_io_counters(pernic=True).get(primary_interface, None)
-        }
-    except Exception as e:
-        return {
-            "primary_interface": f"Error detecting interface: {str(e)}",
-            "initial_io": None
-        }
-
-class NetworkFrame(ctk.CTkFrame):
-    def __init__(self, parent):
-        super().__init__(parent, fg_color="white")
-
-        self.grid_columnconfigure(0, weight=3)  # col 0 for network info
-        self.grid_columnconfigure(1, weight=0)  # col 1 for slider
-        self.grid_rowconfigure(4, weight=1)  # row 4 for graph
-
-        network_info = get_network_info()
-        self.network_interface = network_info['primary_interface']
-        self.initial_network_io = network_info['initial_io']
-        
-        self.upload_data = [0] * 3600
-        self.download_data = [0] * 3600
-        
-        self.create_network_labels(network_info)
-        self.create_plot()
-        self.create_slider()
+def format_rate(mbps):
+    if mbps >= 1000:
+        return f"{mbps / 1000:.2f} Gbps"
+    return f"{mbps:.2f} Mbps"
 
-        self.canvas = FigureCanvasTkAgg(self.figure, self)
-        self.canvas.get_tk_widget().grid(row=4, column=0, columnspan=2, sticky="nsew", padx=10, pady=10)
 
-        self.last_network_io = self.initial_network_io
-        self.time_range = 60
-        self.update()
+def format_rate_tick(mbps, position=None):
+    return f"{mbps / 1000:g}G" if mbps >= 1000 else f"{mbps:g}M"
 
-    def create_network_labels(self, network_info):
+
+class NetworkFrame(ChartFrame):
+    def __init__(self, parent, store, blit=True, network_info=None, scheduler=None, renderer="matplotlib", shared_figure=None, feed=None):
+        super().__init__(parent, "Network", store, scheduler, shared_figure, feed)
+
+        self.contents_frame.grid_columnconfigure(0, weight=3)  # col 0 for network info
+        self.contents_frame.grid_columnconfigure(1, weight=0)  # col 1 for slider
+        self.contents_frame.grid_rowconfigure(5, weight=1)  # row 5 for graph
+
+        # summed over every non-loopback interface until the probe finds the primary one or the user picks
+        self.throughput = self.feed.network  # the checkboxes pick what goes into the store
+        self.interface_checkboxes = {}
+        self.interfaces_picked = False  # once the user picks, the probe result no longer overrides it
+        self.y_limit = None
+
+        self.upload_data = store.series("network.upload")
+        self.download_data = store.series("network.download")
+        self.upload_lod = LevelOfDetail(store.history_seconds)
+        self.download_lod = LevelOfDetail(store.history_seconds)
+        
+        self.create_network_labels()
+        if renderer == "canvas":
+            self.create_canvas_plot()
+        else:
+            self.create_plot()
+            self.attach_plot(
+                [self.upload_line, self.download_line, self.upload_envelope.collection, self.download_envelope.collection],
+                blit,
+            )
+        self.show_chart(row=5)
+
+        if network_info is not None:
+            self.set_network_info(network_info)
+
+    def create_network_labels(self):
         self.network_label = ctk.CTkLabel(
-            self,
+            self.contents_frame,
             text="Network Usage Monitor",
             font=("Segoe UI", 18, "bold"),
             text_color="darkgreen",
@@ -90,7 +68,7 @@ class NetworkFrame(ctk.CTkFrame):
         self.download_text = ctk.StringVar(value="Download: 0 Mbps")
         
         self.upload_label = ctk.CTkLabel(
-            self,
+            self.contents_frame,
             textvariable=self.upload_text,
             font=("Segoe UI", 16, "italic"),
             text_color="green",
@@ -98,7 +76,7 @@ class NetworkFrame(ctk.CTkFrame):
         self.upload_label.grid(row=1, column=0, sticky="nw", padx=10, pady=5)
 
         self.download_label = ctk.CTkLabel(
-            self,
+            self.contents_frame,
             textvariable=self.download_text,
             font=("Segoe UI", 16, "italic"),
             text_color="blue",
@@ -106,25 +84,89 @@ class NetworkFrame(ctk.CTkFrame):
         self.download_label.grid(row=2, column=0, sticky="nw", padx=10, pady=5)
 
         self.interface_label = ctk.CTkLabel(
-            self,
-            text=f"Interface: {self.network_interface}",
+            self.contents_frame,
+            text=f"Interface: {PENDING_NETWORK_INFO['primary_interface']}",
             font=("Segoe UI", 13, "normal"),
             text_color="gray",
         )
         self.interface_label.grid(row=3, column=0, sticky="nw", padx=10, pady=5)
-        self.time_range = 60
+
+        # one checkbox per interface, added as they show up in the samples
+        self.interfaces_frame = ctk.CTkScrollableFrame(
+            self.contents_frame, orientation="horizontal", height=28, fg_color="transparent"
+        )
+        self.interfaces_frame.grid(row=4, column=0, columnspan=2, sticky="ew", padx=10)
+
+        self.all_interfaces_checkbox = ctk.CTkCheckBox(
+            self.interfaces_frame, text="All", command=self.toggle_all_interfaces, font=("Segoe UI", 12)
+        )
+        self.all_interfaces_checkbox.pack(side="left", padx=5)
+        self.all_interfaces_checkbox.select()
+
+    def set_network_info(self, network_info):
+        primary_interface = network_info['primary_interface']
+        # the probe reports "Unknown" or an error message when it can't find one, keep summing everything then
+        if self.interfaces_picked or primary_interface not in psutil.net_if_addrs():
+            return
+        self.throughput.select([primary_interface])
+        self.update_interface_selection()
+
+    def add_interface_checkbox(self, interface):
+        checkbox = ctk.CTkCheckBox(
+            self.interfaces_frame,
+            text=interface,
+            command=lambda: self.toggle_interface(interface),
+            font=("Segoe UI", 12),
+        )
+        checkbox.pack(side="left", padx=5)
+        self.interface_checkboxes[interface] = checkbox
+        self.update_interface_selection()
+
+    def toggle_interface(self, interface):
+        self.interfaces_picked = True
+        selected = set(self.throughput.interfaces or ())
+        if self.interface_checkboxes[interface].get():
+            selected.add(interface)
+        else:
+            selected.discard(interface)
+        # nothing picked falls back to the sum of every interface
+        self.throughput.select(selected)
+        self.update_interface_selection()
+
+    def toggle_all_interfaces(self):
+        self.interfaces_picked = True
+        if self.all_interfaces_checkbox.get():
+            self.throughput.select(None)
+        self.update_interface_selection()
+
+    def update_interface_selection(self):
+        selected = self.throughput.interfaces
+        if selected is None:
+            self.all_interfaces_checkbox.select()
+            self.interface_label.configure(text="Interface: all")
+        else:
+            self.all_interfaces_checkbox.deselect()
+            self.interface_label.configure(text=f"Interface: {' + '.join(sorted(selected))}")
+
+        for interface, checkbox in self.interface_checkboxes.items():
+            if selected is not None and interface in selected:
+                checkbox.select()
+            else:
+                checkbox.deselect()
 
     def create_plot(self):
-        self.figure = Figure(figsize=(7, 2), dpi=90)
-        self.ax = self.figure.add_subplot(111)
+        from matplotlib.ticker import FuncFormatter
+
+        self.figure, self.ax = chart_axes("network", self.shared_figure)
 
         self.ax.set_facecolor("white")
         self.ax.tick_params(axis='x', colors='gray')
         self.ax.tick_params(axis='y', colors='gray')
-        self.ax.set_ylim(0, 100)
+        # the y limit follows the traffic, see update_plot
+        self.ax.set_ylim(0, 1)
         self.ax.set_xlim(0, 60)
-        self.ax.set_yticks([0, 20, 40, 60, 80, 100])
-        self.ax.set_ylabel("Mbps", color="gray", fontsize=10)
+        self.ax.yaxis.set_major_formatter(FuncFormatter(format_rate_tick))
+        self.ax.set_ylabel("Throughput (Mbps)", color="gray", fontsize=10)
         self.ax.set_xticklabels([])
 
         step = max(1, self.time_range // 20)
@@ -140,76 +182,79 @@ class NetworkFrame(ctk.CTkFrame):
 
         self.upload_line, = self.ax.plot([0] * 60, color="green", linewidth=0.8, label="Upload")
         self.download_line, = self.ax.plot([0] * 60, color="blue", linewidth=0.8, label="Download")
+
+        # min/max band of each bucket so bursts stay visible on long time ranges
+        self.upload_envelope = AreaFill(self.ax, color="green", alpha=0.2, linewidth=0)
+        self.download_envelope = AreaFill(self.ax, color="blue", alpha=0.2, linewidth=0)
         
         self.ax.legend(loc='upper right', fontsize=8)
 
-    def create_slider(self):
-        slider_frame = ctk.CTkFrame(self, fg_color="transparent")
-        slider_frame.grid(row=0, column=1, rowspan=2, sticky="ne", padx=10, pady=5)
-
-        slider_label = ctk.CTkLabel(slider_frame, text="Select Time Range (minutes):", text_color="black")
-        slider_label.pack(anchor="e", pady=5)
-
-        min_label = ctk.CTkLabel(slider_frame, text="1", text_color="gray")
-        min_label.pack(side="left", padx=5)
-
-        self.time_slider = ctk.CTkSlider(
-            slider_frame, from_=60, to=3600, number_of_steps=400, command=self.update_time_range
+    # the same chart from tk canvas items, the axes is also the canvas and the renderer
+    def create_canvas_plot(self):
+        self.ax = self.canvas = self.renderer = CanvasAxes(
+            self.contents_frame, darker_lightgreen, "lightgreen", tick_format=format_rate_tick
         )
-        self.time_slider.set(60)  # Default to 60 seconds (1 minute)
-        self.time_slider.pack(side="left", padx=5)
-
-        max_label = ctk.CTkLabel(slider_frame, text="60", text_color="gray")
-        max_label.pack(side="right", padx=5)
-
-    def update_time_range(self, value):
-        self.time_range = int(float(value))
-        self.update_plot()
-
-    def update(self):
-        try:
-            current_network_io = psutil.net_io_counters(pernic=True).get(self.network_interface)
-            
-            if current_network_io and self.last_network_io:
-                download_bytes = current_network_io.bytes_recv - self.last_network_io.bytes_recv
-                upload_bytes = current_network_io.bytes_sent - self.last_network_io.bytes_sent
-                
-                download_mbps = (download_bytes * 8) / (1024 * 1024)
-                upload_mbps = (upload_bytes * 8) / (1024 * 1024)
-
-                self.download_text.set(f"Download: {download_mbps:.2f} Mbps")
-                self.upload_text.set(f"Upload: {upload_mbps:.2f} Mbps")
-
-                self.download_data.append(download_mbps)
-                self.upload_data.append(upload_mbps)
-
-                self.download_data = self.download_data[-3600:]
-                self.upload_data = self.upload_data[-3600:]
-
-                self.last_network_io = current_network_io
-
-                self.update_plot()
-
-        except Exception as e:
-            print(f"Network update error: {e}")
-
-        self.after(1000, self.update)
-
-    def update_plot(self):
-        download_to_plot = self.download_data[-self.time_range:]
-        upload_to_plot = self.upload_data[-self.time_range:]
-
-        self.download_line.set_ydata(download_to_plot)
-        self.download_line.set_xdata(range(len(download_to_plot)))
-        
-        self.upload_line.set_ydata(upload_to_plot)
-        self.upload_line.set_xdata(range(len(upload_to_plot)))
-
-        self.ax.set_xlim(0, self.time_range)
-        self.ax.set_xlabel(f"Last {self.time_range//60} minute(s)", color="gray", fontsize=10)
-
-        step = max(1, self.time_range // 20)
-        ticks = list(range(0, self.time_range + 1, step))
-        self.ax.set_xticks(ticks)
-
-        self.canvas.draw()
+        # the y limit follows the traffic, see update_plot
+        self.ax.set_ylim(0, 1)
+        self.ax.set_ylabel("Throughput (Mbps)")
+        self.update_time_axis()
+
+        self.upload_line, = self.ax.plot([], [], color="green", linewidth=0.8, label="Upload")
+        self.download_line, = self.ax.plot([], [], color="blue", linewidth=0.8, label="Download")
+        self.upload_envelope = self.ax.fill("green", alpha=0.2)
+        self.download_envelope = self.ax.fill("blue", alpha=0.2)
+        self.ax.legend()
+
+    def on_sample(self, snapshot):
+        reading = snapshot.values.get("network")
+        if reading is None:
+            return
+
+        for interface in reading.counters:
+            if interface not in self.interface_checkboxes:
+                self.add_interface_checkbox(interface)
+
+        rates = self.feed.network_total
+        if rates is not None:
+            upload_mbps, download_mbps = rates
+            self.upload_lod.append(snapshot.timestamp, upload_mbps)
+            self.download_lod.append(snapshot.timestamp, download_mbps)
+            self.download_text.set(f"Download: {format_rate(download_mbps)}")
+            self.upload_text.set(f"Upload: {format_rate(upload_mbps)}")
+
+    def load_history(self, records):
+        for timestamp, upload, download in zip(records["timestamp"], records["upload"], records["download"]):
+            if not math.isnan(upload):
+                self.upload_data.append(timestamp, upload)
+                self.upload_lod.append(timestamp, upload)
+            if not math.isnan(download):
+                self.download_data.append(timestamp, download)
+                self.download_lod.append(timestamp, download)
+
+    def update_plot(self, draft=False):
+        # keep collecting while collapsed, just don't draw
+        if self.is_collapsed:
+            return
+
+        # about one bucket per pixel column whatever the time range, drafts get a fraction of it
+        max_points = self.ax.bbox.width * (DRAFT_DETAIL if draft else 1)
+        peak = 0
+        for lod, line, envelope in (
+            (self.upload_lod, self.upload_line, self.upload_envelope),
+            (self.download_lod, self.download_line, self.download_envelope),
+        ):
+            level = lod.select(self.time_range, max_points)
+            timestamps, lows, highs, means = level.window(self.time_range)
+            positions = level.positions(timestamps, self.time_range)
+            line.set_data(positions, means)
+            envelope.set_data(positions, highs, lows)
+            peak = max(peak, highs.max(initial=0))
+
+        # only a change of 1-2-5 step redraws the background, not every new peak
+        y_limit = nice_limit(peak)
+        if y_limit != self.y_limit:
+            self.y_limit = y_limit
+            self.ax.set_ylim(0, y_limit)
+            self.renderer.invalidate()
+
+        self.renderer.render()
@@ -0,0 +1,216 @@
+import json
+import os
+import queue
+import socket
+import sys
+import threading
+import time
+import urllib.request
+from collections import namedtuple
+
+from alert_rules import is_percent_metric
+
+# what the sinks get, one per batch of alerts that fired close together
+Notification = namedtuple("Notification", ["title", "message", "alerts", "suppressed"])
+
+METRIC_TITLES = {
+    "cpu": "CPU",
+    "cpu_cores": "CPU Core",
+    "memory": "Memory",
+    "gpu": "GPU",
+    "network": "Network",
+    "disk": "Disk",
+}
+
+
+def metric_title(metric):
+    return METRIC_TITLES.get(metric, METRIC_TITLES.get(metric.split(".", 1)[0], metric))
+
+
+def describe(alert):
+    rule = alert.rule
+    name = rule.name if alert.row is None else f"{rule.name} #{alert.row}"
+    unit = "%" if is_percent_metric(rule.metric) else ""
+    stat = "" if rule.stat == "last" else f" ({rule.stat} over {rule.window:g}s)"
+    direction = "above" if rule.op == ">" else "below"
+    return f"{name}{stat} is at {alert.value:.1f}{unit}, {direction} the {rule.threshold:g}{unit} threshold"
+
+
+def build_notification(alerts, suppressed=0):
+    metrics = sorted({alert.rule.metric for alert in alerts}, key=metric_title)
+    if len(alerts) == 1:
+        title = f"{metric_title(metrics[0])} Alert"
+    else:
+        title = f"{len(alerts)} Alerts: {', '.join(metric_title(metric) for metric in metrics)}"
+
+    lines = [describe(alert) for alert in alerts]
+    if suppressed:
+        lines.append(f"{suppressed} more rate-limited since the last notification")
+    return Notification(title, "\n".join(lines), tuple(alerts), suppressed)
+
+
+def notification_json(notification):
+    return json.dumps({
+        "title": notification.title,
+        "message": notification.message,
+        "suppressed": notification.suppressed,
+        "alerts": [
+            {
+                "rule": alert.rule.name,
+                "metric": alert.rule.metric,
+                "row": alert.row,
+                "value": alert.value,
+                "threshold": alert.rule.threshold,
+                "timestamp": alert.timestamp,
+            }
+            for alert in notification.alerts
+        ],
+    })
+
+
+class DesktopSink:
+    def send(self, notification):
+        # plyer is only imported when a desktop notification is actually sent
+        from plyer import notification as desktop
+
+        desktop.notify(title=notification.title, message=notification.message, app_name="PC Dashboard")
+
+
+class StreamSink:
+    # the headless collector's alerts, on stderr by default
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stderr
+
+    def send(self, notification):
+        for line in notification.message.splitlines():
+            print(f"ALERT {notification.title}: {line}", file=self.stream, flush=True)
+
+
+class LogFileSink:
+    def __init__(self, path):
+        self.path = os.path.expanduser(path)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+    def send(self, notification):
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S")
+        with open(self.path, "a") as log:
+            for line in notification.message.splitlines():
+                log.write(f"{stamp} {notification.title}: {line}\n")
+
+
+class WebhookSink:
+    # posts the notification as json, meant for a local receiver (chat bridge, pager relay)
+    def __init__(self, url, timeout=2.0):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, notification):
+        request = urllib.request.Request(
+            self.url,
+            data=notification_json(notification).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+class UnixSocketSink:
+    # one json line per notification to whatever listens on the socket
+    def __init__(self, path, timeout=2.0):
+        self.path = os.path.expanduser(path)
+        self.timeout = timeout
+
+    def send(self, notification):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.settimeout(self.timeout)
+            connection.connect(self.path)
+            connection.sendall(notification_json(notification).encode() + b"\n")
+
+
+class NotificationDispatcher:
+    # alerts are queued from the tk thread (or the headless loop) and sent on a thread of its
+    # own, so a slow desktop, disk or webhook never blocks sampling or rendering. alerts that
+    # fire within group_window seconds of each other go out as one notification, and each
+    # metric notifies at most once per rate_limit seconds, the rest are only counted
+    def __init__(self, sinks, max_pending=256, rate_limit=60.0, group_window=1.0):
+        self.sinks = list(sinks)
+        self.rate_limit = rate_limit
+        self.group_window = group_window
+
+        # bounded so an alert storm can't grow it, alerts that don't fit are dropped and counted
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.dropped = 0
+        self.last_sent = {}  # metric -> monotonic time of its last notification
+        self.suppressed = 0
+
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="notifications", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.group_window + 5)
+            self._thread = None
+
+    def submit(self, alert):
+        # never blocks, used as the alert monitor's notify
+        try:
+            self.pending.put_nowait(alert)
+        except queue.Full:
+            self.dropped += 1
+
+    def collect(self):
+        # the first alert plus everything that arrives within group_window of it
+        try:
+            alerts = [self.pending.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.group_window
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                alerts.append(self.pending.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return alerts
+
+    def rate_limited(self, alerts):
+        now = time.monotonic()
+        allowed = [
+            alert for alert in alerts
+            if now - self.last_sent.get(alert.rule.metric, -self.rate_limit) >= self.rate_limit
+        ]
+        for alert in allowed:
+            self.last_sent[alert.rule.metric] = now
+        self.suppressed += len(alerts) - len(allowed) + self.dropped
+        self.dropped = 0
+        return allowed
+
+    def dispatch(self, notification):
+        for sink in self.sinks:
+            try:
+                sink.send(notification)
+            except Exception as e:
+                print(f"{type(sink).__name__} notification error: {e}")
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            alerts = self.collect()
+            if not alerts:
+                continue
+            allowed = self.rate_limited(alerts)
+            if not allowed:
+                continue
+            suppressed, self.suppressed = self.suppressed, 0
+            self.dispatch(build_notification(allowed, suppressed))
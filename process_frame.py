@@ -0,0 +1,85 @@
+import customtkinter as ctk
+
+COLUMNS = ["PID", "Name", "CPU %", "Memory", "I/O"]
+SORT_OPTIONS = {"CPU": "cpu", "Memory": "memory", "I/O": "io"}
+
+
+def format_bytes(value, suffix=""):
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024:
+            return f"{value:.0f} {unit}{suffix}"
+        value /= 1024
+    return f"{value:.1f} TB{suffix}"
+
+
+class ProcessFrame(ctk.CTkFrame):
+    def __init__(self, parent, process_sampler):
+        super().__init__(parent, fg_color="white")
+
+        self.process_sampler = process_sampler
+        self.sort_key = "cpu"
+        self.generation = None
+
+        # label grid is built once, refreshes only reconfigure the cells whose text changed
+        self.row_labels = []
+        self.row_texts = []
+
+        self.grid_columnconfigure(1, weight=1)
+
+        self.process_label = ctk.CTkLabel(
+            self,
+            text="Top Processes",
+            font=("Segoe UI", 18, "bold"),
+            text_color="darkblue",
+        )
+        self.process_label.grid(row=0, column=0, columnspan=3, sticky="nw", padx=10, pady=10)
+
+        self.sort_button = ctk.CTkSegmentedButton(self, values=list(SORT_OPTIONS), command=self.set_sort)
+        self.sort_button.set("CPU")
+        self.sort_button.grid(row=0, column=3, columnspan=2, sticky="ne", padx=10, pady=10)
+
+        self.create_table()
+
+    def create_table(self):
+        for column, heading in enumerate(COLUMNS):
+            header = ctk.CTkLabel(self, text=heading, font=("Segoe UI", 13, "bold"), text_color="gray")
+            header.grid(row=1, column=column, sticky="w", padx=10)
+
+        for row in range(self.process_sampler.top_n):
+            labels = []
+            for column in range(len(COLUMNS)):
+                label = ctk.CTkLabel(self, text="", font=("Segoe UI", 12), text_color="black", height=18)
+                label.grid(row=row + 2, column=column, sticky="w", padx=10)
+                labels.append(label)
+            self.row_labels.append(labels)
+            self.row_texts.append([""] * len(COLUMNS))
+
+    def set_sort(self, value):
+        self.sort_key = SORT_OPTIONS[value]
+        self.generation = None
+        self.refresh()
+
+    def refresh(self):
+        generation, rows = self.process_sampler.latest(self.sort_key)
+        if generation == self.generation:
+            return
+        self.generation = generation
+
+        for index, labels in enumerate(self.row_labels):
+            if index < len(rows):
+                row = rows[index]
+                texts = (
+                    str(row.pid),
+                    row.name,
+                    f"{row.cpu_percent:.1f}",
+                    format_bytes(row.rss),
+                    format_bytes(row.io_rate, "/s"),
+                )
+            else:
+                texts = ("",) * len(COLUMNS)
+
+            previous = self.row_texts[index]
+            for column, text in enumerate(texts):
+                if previous[column] != text:
+                    labels[column].configure(text=text)
+                    previous[column] = text
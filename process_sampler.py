@@ -0,0 +1,103 @@
+import heapq
+import threading
+import time
+from collections import namedtuple
+
+import psutil
+
+# one row of the process table, rss in bytes and io in bytes per second
+ProcessRow = namedtuple("ProcessRow", ["pid", "name", "cpu_percent", "rss", "io_rate"])
+
+SORT_KEYS = {
+    "cpu": lambda row: row.cpu_percent,
+    "memory": lambda row: row.rss,
+    "io": lambda row: row.io_rate,
+}
+
+# only what the table shows, so psutil reads as few /proc files as possible per process
+PROCESS_ATTRS = ["pid", "name", "create_time", "cpu_times", "memory_info", "io_counters"]
+
+
+class ProcessSampler:
+    # top-n processes by cpu, rss and io, sampled on a background thread. cpu and io are
+    # deltas against the previous pass, cached per (pid, create_time) so reused pids don't mix
+    def __init__(self, top_n=10, interval=2.0):
+        self.top_n = top_n
+        self.interval = interval
+
+        self.previous = {}  # (pid, create_time) -> (cpu seconds, io bytes)
+        self.previous_time = None
+
+        self._top = {key: () for key in SORT_KEYS}
+        self.generation = 0  # bumped on every pass so readers can skip unchanged results
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="process-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval * 2)
+            self._thread = None
+
+    def latest(self, sort_key):
+        with self._lock:
+            return self.generation, self._top[sort_key]
+
+    def top(self):
+        # every sort key's rows at once, what the metrics bus hands to viewers
+        with self._lock:
+            return self.generation, dict(self._top)
+
+    def sample(self):
+        now = time.monotonic()
+        elapsed = now - self.previous_time if self.previous_time is not None else None
+
+        rows = []
+        current = {}
+        for process in psutil.process_iter(PROCESS_ATTRS, ad_value=None):
+            info = process.info
+            cpu_times = info["cpu_times"]
+            if cpu_times is None:
+                continue
+
+            key = (info["pid"], info["create_time"])
+            cpu_seconds = cpu_times.user + cpu_times.system
+            io = info["io_counters"]
+            io_bytes = io.read_bytes + io.write_bytes if io is not None else 0
+            current[key] = (cpu_seconds, io_bytes)
+
+            previous = self.previous.get(key)
+            if previous is None or not elapsed:
+                cpu_percent = io_rate = 0.0
+            else:
+                cpu_percent = (cpu_seconds - previous[0]) / elapsed * 100
+                io_rate = max(io_bytes - previous[1], 0) / elapsed
+
+            memory = info["memory_info"]
+            rows.append(ProcessRow(key[0], info["name"] or "?", cpu_percent, memory.rss if memory else 0, io_rate))
+
+        # processes that exited drop out of the cache here
+        self.previous = current
+        self.previous_time = now
+
+        top = {key: tuple(heapq.nlargest(self.top_n, rows, key=sort)) for key, sort in SORT_KEYS.items()}
+        with self._lock:
+            self._top = top
+            self.generation += 1
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"Process sample error: {e}")
+            self._stop_event.wait(max(0, self.interval - (time.monotonic() - started)))
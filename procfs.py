@@ -0,0 +1,140 @@
+# linux fast path for the cpu, per-core, memory and network probes. psutil opens, reads and
+# parses /proc/stat, /proc/meminfo and /proc/net/dev on every call and builds a namedtuple per
+# field set; here the files stay open, are pread into buffers that are reused every tick, and
+# only the fields the frames use are parsed. the numbers match psutil's, see sampler.py for
+# where it falls back to psutil
+import os
+import time
+from collections import namedtuple
+from types import MappingProxyType
+
+from sampler import NetworkReading
+
+# the part of psutil's snetio the dashboard reads, NetworkThroughput only needs the byte counts
+InterfaceCounters = namedtuple("InterfaceCounters", ["bytes_sent", "bytes_recv"])
+
+STAT_FIELDS = 8  # user nice system idle iowait irq softirq steal, guest time is already in user
+IDLE = 3
+IOWAIT = 4
+
+
+class ProcFile:
+    # one /proc file kept open, read from offset 0 each time into a buffer that only grows
+    def __init__(self, path, size=4096):
+        self.path = path
+        self.fd = os.open(path, os.O_RDONLY | getattr(os, "O_CLOEXEC", 0))
+        self.buffer = bytearray(size)
+        self.view = memoryview(self.buffer)
+
+    def read(self):
+        # the file's current contents. these files are generated whole on a read from offset 0,
+        # so anything short of a full buffer is all of it and a tick costs one syscall
+        while True:
+            length = os.preadv(self.fd, [self.view], 0)
+            if length < len(self.buffer):
+                return self.buffer[:length]
+            # filled the buffer, the file may be longer, read again with twice the room
+            self.view.release()
+            self.buffer = bytearray(len(self.buffer) * 2)
+            self.view = memoryview(self.buffer)
+
+    def close(self):
+        if self.fd is not None:
+            self.view.release()
+            os.close(self.fd)
+            self.fd = None
+
+
+class CPUTimes:
+    # busy % of the whole cpu and every core since the previous call, like
+    # psutil.cpu_percent(interval=0): iowait counts as idle and the first call is 0
+    def __init__(self):
+        self.previous = None
+
+    def percents(self, times):
+        # times is one (busy, total) pair per line of /proc/stat, the "cpu" total line first
+        previous, self.previous = self.previous, times
+        if previous is None or len(previous) != len(times):
+            return [0.0] * len(times)
+
+        percents = []
+        for (busy, total), (last_busy, last_total) in zip(times, previous):
+            elapsed = total - last_total
+            percents.append(round(min(max((busy - last_busy) / elapsed * 100, 0.0), 100.0), 1) if elapsed > 0 else 0.0)
+        return percents
+
+
+class ProcProbes:
+    # drop-in replacements for sampler.probe_cpu, probe_cpu_cores, probe_memory and
+    # probe_network. cpu and cpu_cores share one read of /proc/stat when they are sampled
+    # in the same tick. raises OSError when /proc isn't there, e.g. on other platforms
+    def __init__(self, root="/proc"):
+        self.stat = ProcFile(os.path.join(root, "stat"))
+        self.meminfo = ProcFile(os.path.join(root, "meminfo"))
+        self.net_dev = ProcFile(os.path.join(root, "net", "dev"), size=16384)
+
+        self.cpu_times = CPUTimes()
+        self.core_times = CPUTimes()
+        self.stat_times = None
+        self.stat_read_at = 0.0
+
+        # fail now rather than on the sampler thread if a file has an unexpected layout
+        self.read_stat()
+        self.memory()
+
+    def read_stat(self, max_age=0.005):
+        # (busy, total) of the cpu line and every cpuN line, reused for max_age seconds
+        now = time.monotonic()
+        if self.stat_times is not None and now - self.stat_read_at < max_age:
+            return self.stat_times
+
+        times = []
+        for line in self.stat.read().split(b"\n"):
+            if not line.startswith(b"cpu"):
+                break  # the cpu lines come first, the interrupt counters after them aren't parsed
+            fields = [int(field) for field in line.split()[1:STAT_FIELDS + 1]]
+            total = sum(fields)
+            times.append((total - fields[IDLE] - fields[IOWAIT], total))
+
+        self.stat_times = times
+        self.stat_read_at = now
+        return times
+
+    def cpu(self):
+        times = self.read_stat()
+        return self.cpu_times.percents(times[:1])[0]
+
+    def cpu_cores(self):
+        times = self.read_stat()
+        return tuple(self.core_times.percents(times[1:]))
+
+    def memory(self):
+        # used % as psutil.virtual_memory().percent computes it, (total - available) / total
+        data = self.meminfo.read()
+        total = meminfo_kb(data, b"MemTotal:")
+        available = meminfo_kb(data, b"MemAvailable:")
+        return round((total - available) / total * 100, 1)
+
+    def network(self):
+        now = time.monotonic()
+        counters = {}
+        # two header lines, then "name: 8 receive counters, 8 transmit counters"
+        for line in self.net_dev.read().split(b"\n")[2:]:
+            name, separator, values = line.partition(b":")
+            if not separator:
+                continue
+            fields = values.split()
+            counters[name.strip().decode()] = InterfaceCounters(int(fields[8]), int(fields[0]))
+        return NetworkReading(now, MappingProxyType(counters))
+
+    def close(self):
+        for proc_file in (self.stat, self.meminfo, self.net_dev):
+            proc_file.close()
+
+
+def meminfo_kb(data, key):
+    start = data.find(key)
+    if start < 0:
+        raise OSError(f"/proc/meminfo has no {key.decode()} line")
+    end = data.find(b"\n", start)
+    return int(data[start + len(key):end].split()[0])
@@ -0,0 +1,44 @@
+import time
+
+DRAFT_DETAIL = 0.25  # share of the one-point-per-pixel budget charts use for draft renders
+
+
+class RedrawScheduler:
+    # merges every redraw request (new samples, slider moves, the shared time range) into at
+    # most one update_plot per chart per frame interval. interactive requests render in draft
+    # quality and get a final render once they have stopped for settle_ms
+    def __init__(self, root, frame_interval_ms=33, settle_ms=250):
+        self.root = root
+        self.frame_interval_ms = frame_interval_ms
+        self.settle_ms = settle_ms
+
+        self.dirty = {}  # chart -> draft, a final request always wins over a draft one
+        self.pending = None
+        self.last_flush = 0.0
+        self.settle_jobs = {}
+
+    def request(self, chart, draft=False):
+        self.dirty[chart] = draft and self.dirty.get(chart, True)
+
+        if draft:
+            job = self.settle_jobs.pop(chart, None)
+            if job is not None:
+                self.root.after_cancel(job)
+            self.settle_jobs[chart] = self.root.after(self.settle_ms, self.settle, chart)
+
+        if self.pending is None:
+            elapsed_ms = (time.monotonic() - self.last_flush) * 1000
+            delay = max(0, int(self.frame_interval_ms - elapsed_ms))
+            self.pending = self.root.after(delay, self.flush)
+
+    def settle(self, chart):
+        self.settle_jobs.pop(chart, None)
+        self.request(chart)
+
+    def flush(self):
+        self.pending = None
+        self.last_flush = time.monotonic()
+
+        dirty, self.dirty = self.dirty, {}
+        for chart, draft in dirty.items():
+            chart.update_plot(draft=draft)
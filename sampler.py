@@ -0,0 +1,275 @@
+import queue
+import sys
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+
+import psutil
+
+from gpu_providers import GPUPoller
+
+# one immutable reading of the probes that were due, taken on the sampler thread
+Snapshot = namedtuple("Snapshot", ["timestamp", "values"])
+
+# byte counters of every interface, keyed by interface name
+NetworkReading = namedtuple("NetworkReading", ["monotonic", "counters"])
+
+# io counters of every block device, keyed by device name
+DiskReading = namedtuple("DiskReading", ["monotonic", "counters"])
+
+# size of one mounted filesystem, in bytes
+FilesystemUsage = namedtuple("FilesystemUsage", ["mountpoint", "total", "used", "percent"])
+
+# pseudo filesystems that are always full or empty, e.g. snap packages
+IGNORED_FSTYPES = {"squashfs", "iso9660", "overlay", "tmpfs", "devtmpfs"}
+
+MIN_INTERVAL = 0.1
+MAX_INTERVAL = 60.0
+
+# probes that are slow or change slowly, used when no interval is configured for them
+DEFAULT_INTERVALS = {"filesystems": 30.0}
+
+# scalar each non-scalar probe is judged by in adaptive mode
+ADAPTIVE_MEASURES = {
+    "cpu_cores": lambda cores: max(cores, default=0),
+    "gpu": lambda devices: max((device.load for device in devices), default=0),
+}
+
+
+def probe_cpu():
+    return psutil.cpu_percent(interval=0)
+
+
+def probe_cpu_cores():
+    return tuple(psutil.cpu_percent(interval=0, percpu=True))
+
+
+def probe_memory():
+    return psutil.virtual_memory().percent
+
+
+def probe_network():
+    # one pernic call per tick for every interface, stamped with the monotonic time it was read at
+    # so rates don't depend on when the snapshot gets drained
+    now = time.monotonic()
+    return NetworkReading(now, MappingProxyType(psutil.net_io_counters(pernic=True)))
+
+
+def probe_disk():
+    # one perdisk call per tick for every block device
+    now = time.monotonic()
+    return DiskReading(now, MappingProxyType(psutil.disk_io_counters(perdisk=True) or {}))
+
+
+def probe_filesystems():
+    # a statvfs per mount, so this runs on a slow interval of its own
+    usage = []
+    for partition in psutil.disk_partitions(all=False):
+        if partition.fstype in IGNORED_FSTYPES:
+            continue
+        try:
+            disk_usage = psutil.disk_usage(partition.mountpoint)
+        except OSError:
+            continue
+        if disk_usage.total:
+            usage.append(FilesystemUsage(partition.mountpoint, disk_usage.total, disk_usage.used, disk_usage.percent))
+    return tuple(usage)
+
+
+def proc_probes():
+    # the /proc fast path on linux, None on other platforms or when /proc can't be read,
+    # those keep the psutil probes above
+    if not sys.platform.startswith("linux"):
+        return None
+    from procfs import ProcProbes
+
+    try:
+        return ProcProbes()
+    except (OSError, ValueError, IndexError) as e:
+        print(f"/proc sampler unavailable, using psutil: {e}")
+        return None
+
+
+def clamp_interval(seconds):
+    return min(max(float(seconds), MIN_INTERVAL), MAX_INTERVAL)
+
+
+def gpu_timeout(interval):
+    # cached gpu readings older than this count as gone, a couple of missed polls but never under 5 s
+    return max(5.0, interval * 2)
+
+
+class ProbeSchedule:
+    # when one probe is next due. adaptive schedules drop to `fastest` while the metric moves
+    # by at least `change` between readings or sits within `margin` of its alert threshold,
+    # and back off towards `slowest` while it is idle
+    def __init__(self, interval, adaptive=False, fastest=MIN_INTERVAL, slowest=None, change=5.0, margin=10.0):
+        self.interval = clamp_interval(interval)
+        self.adaptive = adaptive
+        self.fastest = clamp_interval(fastest)
+        self.slowest = clamp_interval(slowest if slowest is not None else self.interval * 5)
+        self.change = change
+        self.margin = margin
+
+        self.previous = None
+        self.next_due = 0.0
+
+    def observe(self, level, threshold=None):
+        if not self.adaptive or level is None:
+            return
+        busy = (self.previous is not None and abs(level - self.previous) >= self.change) or (
+            threshold is not None and level >= threshold - self.margin
+        )
+        self.previous = level
+        self.interval = self.fastest if busy else min(self.interval * 1.5, self.slowest)
+
+    def advance(self, now):
+        # no catching up with a burst after an overrun, the next reading is one interval from now
+        next_due = self.next_due + self.interval
+        self.next_due = next_due if next_due > now else now + self.interval
+
+
+class Sampler:
+    # every probe runs on its own interval (MIN_INTERVAL to MAX_INTERVAL seconds), a snapshot
+    # only carries the probes that were due, so consumers skip the keys that are missing
+    def __init__(
+        self,
+        interval=1.0,
+        max_pending=120,
+        gpu_provider=None,
+        intervals=None,
+        adaptive=(),
+        thresholds=None,
+        procfs=True,
+    ):
+        self.interval = clamp_interval(interval)  # default for probes without an interval of their own
+        intervals = intervals or {}
+
+        # gpu drivers can be slow, they get their own poller and the probe only reads its cache
+        gpu_interval = clamp_interval(intervals.get("gpu", self.interval))
+        self.gpu_poller = GPUPoller(gpu_provider, interval=gpu_interval, timeout=gpu_timeout(gpu_interval))
+
+        # alert thresholds the adaptive schedules speed up near, read live so edits apply at once
+        self.thresholds = thresholds if thresholds is not None else {}
+
+        # cpu, memory and network straight from /proc where possible, cheap enough for 10-100 Hz
+        self.proc_probes = proc_probes() if procfs else None
+        fast = self.proc_probes
+
+        self.probes = {}
+        self.schedules = {}
+        for name, probe in (
+            ("cpu", fast.cpu if fast else probe_cpu),
+            ("cpu_cores", fast.cpu_cores if fast else probe_cpu_cores),
+            ("memory", fast.memory if fast else probe_memory),
+            ("network", fast.network if fast else probe_network),
+            ("disk", probe_disk),
+            ("filesystems", probe_filesystems),
+            ("gpu", self.gpu_poller.latest),
+        ):
+            self.add_probe(name, probe, intervals.get(name, DEFAULT_INTERVALS.get(name)), adaptive=name in adaptive)
+
+        # bounded so a stalled ui can't grow it forever, oldest snapshots get dropped
+        self.snapshots = queue.Queue(maxsize=max_pending)
+        self.listeners = []  # called with every snapshot on the sampler thread, e.g. the exporter
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def add_probe(self, name, probe, interval=None, adaptive=False):
+        self.schedules[name] = ProbeSchedule(interval or self.interval, adaptive)
+        self.probes[name] = probe
+
+    # safe to call from the tk thread while sampling, a faster interval applies right away
+    def set_interval(self, name, interval, adaptive=False):
+        previous = self.schedules[name]
+        schedule = ProbeSchedule(interval, adaptive)
+        schedule.next_due = min(previous.next_due, time.monotonic() + schedule.interval)
+        self.schedules[name] = schedule
+        if name == "gpu":
+            self.gpu_poller.interval = schedule.interval
+            self.gpu_poller.timeout = gpu_timeout(schedule.interval)
+
+    def intervals(self):
+        return {name: schedule.interval for name, schedule in self.schedules.items()}
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self.gpu_poller.start()
+        self._thread = threading.Thread(target=self._run, name="sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval * 2)
+            self._thread = None
+        self.gpu_poller.stop()
+
+    def sample(self, names=None):
+        values = {}
+        for name in names if names is not None else list(self.probes):
+            try:
+                value = values[name] = self.probes[name]()
+            except Exception as e:
+                print(f"{name} probe error: {e}")
+                continue
+
+            schedule = self.schedules[name]
+            if schedule.adaptive:
+                measure = ADAPTIVE_MEASURES.get(name)
+                level = measure(value) if measure is not None else value
+                schedule.observe(level if isinstance(level, (int, float)) else None, self.thresholds.get(name))
+        return Snapshot(time.time(), MappingProxyType(values))
+
+    def subscribe(self, listener):
+        # for consumers that must not wait on the tk thread, keep them quick, they delay the next sample
+        self.listeners.append(listener)
+
+    def publish(self, snapshot):
+        try:
+            self.snapshots.put_nowait(snapshot)
+        except queue.Full:
+            try:
+                self.snapshots.get_nowait()
+            except queue.Empty:
+                pass
+            self.snapshots.put_nowait(snapshot)
+
+        for listener in self.listeners:
+            try:
+                listener(snapshot)
+            except Exception as e:
+                print(f"sample listener error: {e}")
+
+    def next(self, timeout=None):
+        # blocking read for consumers without a ui loop, None on timeout
+        try:
+            return self.snapshots.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def drain(self):
+        # called from the tk thread, never blocks
+        snapshots = []
+        while True:
+            try:
+                snapshots.append(self.snapshots.get_nowait())
+            except queue.Empty:
+                return snapshots
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            now = time.monotonic()
+            due = [name for name, schedule in list(self.schedules.items()) if schedule.next_due <= now]
+            if due:
+                snapshot = self.sample(due)
+                now = time.monotonic()
+                for name in due:
+                    self.schedules[name].advance(now)
+                self.publish(snapshot)
+
+            next_due = min(schedule.next_due for schedule in list(self.schedules.values()))
+            self._stop_event.wait(max(0, next_due - time.monotonic()))
@@ -0,0 +1,53 @@
+import customtkinter as ctk
+
+METRICS = {
+    "CPU": "cpu",
+    "CPU cores": "cpu_cores",
+    "Memory": "memory",
+    "Network": "network",
+    "Disk": "disk",
+    "Filesystems": "filesystems",
+    "GPU": "gpu",
+}
+INTERVALS = {"0.1 s": 0.1, "0.25 s": 0.25, "0.5 s": 0.5, "1 s": 1.0, "2 s": 2.0, "5 s": 5.0, "15 s": 15.0, "60 s": 60.0}
+ADAPTIVE = "Adaptive"
+
+
+class SamplingFrame(ctk.CTkFrame):
+    # changes a metric's sampling interval while running. buffers are sized for the configured
+    # interval, so sampling faster than that shortens how far back the charts can go
+    def __init__(self, parent, sampler):
+        super().__init__(parent, fg_color="white")
+
+        self.sampler = sampler
+
+        self.sampling_label = ctk.CTkLabel(
+            self,
+            text="Sampling",
+            font=("Segoe UI", 18, "bold"),
+            text_color="darkblue",
+        )
+        self.sampling_label.pack(anchor="w", padx=10, pady=10)
+
+        self.metric_menu = ctk.CTkOptionMenu(self, values=list(METRICS), command=self.show_interval)
+        self.metric_menu.pack(fill="x", padx=10, pady=5)
+
+        self.interval_menu = ctk.CTkOptionMenu(self, values=list(INTERVALS) + [ADAPTIVE], command=self.set_interval)
+        self.interval_menu.pack(fill="x", padx=10, pady=5)
+
+        self.show_interval(self.metric_menu.get())
+
+    def show_interval(self, metric):
+        schedule = self.sampler.schedules[METRICS[metric]]
+        if schedule.adaptive:
+            self.interval_menu.set(ADAPTIVE)
+            return
+        closest = min(INTERVALS, key=lambda label: abs(INTERVALS[label] - schedule.interval))
+        self.interval_menu.set(closest)
+
+    def set_interval(self, value):
+        name = METRICS[self.metric_menu.get()]
+        if value == ADAPTIVE:
+            self.sampler.set_interval(name, self.sampler.schedules[name].interval, adaptive=True)
+        else:
+            self.sampler.set_interval(name, INTERVALS[value])
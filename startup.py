@@ -0,0 +1,46 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupTimer:
+    # wall time of each startup phase, including probes that run on the startup thread pool
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = []
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        with self._lock:
+            self.phases.append((name, seconds))
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def timed(self, name, fn, *args):
+        # wraps a pool task so its own duration ends up in the report
+        with self.phase(name):
+            return fn(*args)
+
+    def mark(self, name):
+        # time from process start until now, e.g. the first rendered tick
+        self.record(name, time.perf_counter() - self.started)
+
+    def report(self):
+        with self._lock:
+            phases = list(self.phases)
+        lines = ["Startup times:"]
+        lines += [f"  {name:<24} {seconds * 1000:8.1f} ms" for name, seconds in phases]
+        return "\n".join(lines)
+
+    def write(self, path):
+        with self._lock:
+            phases = [{"phase": name, "ms": round(seconds * 1000, 3)} for name, seconds in self.phases]
+        with open(path, "w") as f:
+            json.dump({"phases": phases}, f, indent=2)
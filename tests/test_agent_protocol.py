@@ -0,0 +1,41 @@
+import pytest
+
+from agent_protocol import HEADER, ProtocolError, batch_message, decode_batch, read_varint, write_varint
+
+
+@pytest.mark.parametrize("value", [0, 1, -1, 63, -64, 64, -65, 300, -300, 2**40, -(2**40)])
+def test_varint_round_trip(value):
+    out = bytearray()
+    write_varint(out, value)
+    assert read_varint(bytes(out), 0) == (value, len(out))
+
+
+def test_small_negative_changes_stay_one_byte():
+    out = bytearray()
+    write_varint(out, -3)
+    assert len(out) == 1
+
+
+def test_batch_round_trip_with_falling_values_and_gaps():
+    samples = [
+        (1000.0, {"cpu": 80.5, "memory": 40.0, "upload": 12.345, "download": 100.0, "gpu": 30.0}),
+        (1001.0, {"cpu": 10.25, "memory": 39.5, "upload": 0.0, "download": 2.5, "gpu": None}),
+        (1001.5, {"cpu": 0.0, "memory": float("nan")}),
+        (1002.0, {"cpu": 99.99, "memory": 12.0, "gpu": 5.0}),
+    ]
+    data = batch_message(samples)
+    payload = data[HEADER.size:]
+
+    decoded = decode_batch(payload)
+    assert [timestamp for timestamp, _ in decoded] == [1000.0, 1001.0, 1001.5, 1002.0]
+    assert decoded[0][1] == pytest.approx(samples[0][1])
+    assert decoded[1][1] == pytest.approx({"cpu": 10.25, "memory": 39.5, "upload": 0.0, "download": 2.5})
+    assert decoded[2][1] == {"cpu": 0.0}
+    # gpu fell from 30 before the gap it skipped
+    assert decoded[3][1] == pytest.approx({"cpu": 99.99, "memory": 12.0, "gpu": 5.0})
+
+
+def test_truncated_batch_is_a_protocol_error():
+    payload = batch_message([(1000.0, {"cpu": 50.0}), (1001.0, {"cpu": 20.0})])[HEADER.size:]
+    with pytest.raises(ProtocolError):
+        decode_batch(payload[:-1])
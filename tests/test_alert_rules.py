@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from alert_rules import PERCENT_EDGES, AlertRule, RuleEngine, WindowStats, validate_rule
+from timeseries import RingBuffer, TimeSeriesStore
+
+
+def test_window_stats_percentile_and_mean():
+    buffer = RingBuffer(1000)
+    stats = WindowStats(buffer, 100, PERCENT_EDGES)
+    for second in range(100):
+        buffer.append(float(second), float(second))
+    stats.update()
+
+    assert stats.count == 100
+    assert stats.mean()[0] == pytest.approx(49.5)
+    # half-point bins, the bin's upper edge is reported
+    assert stats.percentile(95)[0] == pytest.approx(np.percentile(np.arange(100), 95), abs=0.5)
+    assert stats.percentile(50)[0] == pytest.approx(49.5, abs=0.5)
+
+
+def test_window_stats_drops_expired_samples():
+    buffer = RingBuffer(1000)
+    stats = WindowStats(buffer, 10, PERCENT_EDGES)
+    for second in range(50):
+        buffer.append(float(second), 100.0 if second < 40 else 0.0)
+        stats.update()
+
+    assert stats.count == 11  # seconds 39 to 49, both ends of the window included
+    assert stats.mean()[0] == pytest.approx(100 / 11)
+    assert stats.percentile(50)[0] == 0.0
+
+
+def feed(store, engine, values, start=0.0):
+    fired = []
+    for offset, value in enumerate(values):
+        store.append("cpu", start + offset, value)
+        fired += engine.evaluate()
+    return fired
+
+
+def test_hysteresis_only_fires_again_after_clearing():
+    store = TimeSeriesStore()
+    engine = RuleEngine(store, [AlertRule("cpu high", "cpu", "last", 0, ">", 90, 80, 2)])
+
+    # sustain of two samples, then no repeat while the value stays above the clear level
+    assert len(feed(store, engine, [95, 95, 95, 85, 95])) == 1
+    # dropping below clear re-arms it
+    assert len(feed(store, engine, [70, 95, 95], start=10)) == 1
+
+
+def test_set_rules_keeps_state_of_unchanged_rules():
+    store = TimeSeriesStore()
+    rule = AlertRule("cpu high", "cpu", "last", 0, ">", 90, 80, 1)
+    engine = RuleEngine(store, [rule])
+    assert len(feed(store, engine, [95])) == 1
+
+    # saving the thresholds again, or adding an unrelated rule, must not fire it a second time
+    engine.set_rules([rule, AlertRule("memory high", "memory", "last", 0, ">", 90)])
+    assert feed(store, engine, [96, 97], start=1) == []
+
+    # a changed threshold starts over
+    engine.set_rules([rule._replace(threshold=85)])
+    assert len(feed(store, engine, [96], start=3)) == 1
+
+
+def test_validate_rule_rejects_unknown_metrics():
+    validate_rule(AlertRule("gpu 1", "gpu.1", "last"))
+    validate_rule(AlertRule("disk", "disk.utilization", "mean", 30))
+    with pytest.raises(ValueError, match="unknown metric"):
+        validate_rule(AlertRule("typo", "cpuu", "last"))
@@ -0,0 +1,45 @@
+import collector
+from collector import StoreFeed, gpu_device_series, storage_devices
+from gpu_providers import GPUDevice
+from sampler import Snapshot
+from timeseries import TimeSeriesStore
+
+NAMES = ["sda", "sda1", "nvme0n1", "nvme0n1p1", "nvme0n10", "dm-1", "dm-10", "md1", "md12", "loop0"]
+
+
+def fake_sys_block(path, partitions):
+    for name in NAMES:
+        (path / name).mkdir()
+    for name in partitions:
+        (path / name / "partition").write_text("1\n")
+    return str(path)
+
+
+def test_storage_devices_reads_partitions_from_sys(tmp_path):
+    sys_block = fake_sys_block(tmp_path, ["sda1", "nvme0n1p1"])
+    assert storage_devices(NAMES, sys_block) == ("sda", "nvme0n1", "nvme0n10", "dm-1", "dm-10", "md1", "md12")
+
+
+def test_storage_devices_keeps_devices_named_like_partitions(tmp_path):
+    # nothing marked as a partition, so nothing is dropped for its name alone
+    sys_block = fake_sys_block(tmp_path, [])
+    assert storage_devices(["nvme0n1", "nvme0n10", "dm-1", "dm-10", "md1", "md12"], sys_block) == (
+        "nvme0n1", "nvme0n10", "dm-1", "dm-10", "md1", "md12",
+    )
+
+
+def test_storage_devices_falls_back_to_mounted_partitions(tmp_path, monkeypatch):
+    monkeypatch.setattr(collector, "mounted_partitions", lambda: {"sda1", "nvme0n1p1"})
+    assert storage_devices(NAMES, str(tmp_path / "missing")) == (
+        "sda", "nvme0n1", "nvme0n10", "dm-1", "dm-10", "md1", "md12",
+    )
+
+
+def test_single_gpu_line_shows_restored_history():
+    store = TimeSeriesStore(history_seconds=60)
+    store.append("gpu", 1.0, 40.0)  # restored from disk, see GPUFrame.load_history
+    StoreFeed(store).append(Snapshot(2.0, {"gpu": (GPUDevice(0, "card0", 55.0, None, None, None),)}))
+
+    _, values = store.series(gpu_device_series(0, 1)).window(60)
+    assert values.tolist() == [40.0, 55.0]
+    assert gpu_device_series(1, 2) == "gpu.1"
@@ -0,0 +1,22 @@
+import json
+
+import pytest
+
+from config import ConfigError, ConfigWatcher, load_config, validate_rules
+
+
+@pytest.mark.parametrize("field, value", [("stat", 5), ("op", [">"])])
+def test_rule_fields_of_the_wrong_type_are_config_errors(field, value):
+    with pytest.raises(ConfigError, match=rf"rules\[0\]\.{field}"):
+        validate_rules([{"name": "cpu", "metric": "cpu", field: value}])
+
+
+def test_bad_rule_on_reload_is_a_config_error(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"rules": []}))
+    watcher = ConfigWatcher(str(path), every=0)
+    assert load_config(str(path))["rules"] == []
+
+    path.write_text(json.dumps({"rules": [{"name": "cpu", "metric": "cpu", "op": [">"]}]}) + "\n")
+    with pytest.raises(ConfigError):
+        watcher.check()
@@ -0,0 +1,37 @@
+import json
+
+from exporter import MetricsExporter
+from gpu_providers import GPUDevice
+from sampler import Snapshot
+
+
+def test_unreported_gpu_values_are_left_out():
+    exporter = MetricsExporter("127.0.0.1:9101")
+    exporter.update(Snapshot(1000.0, {"gpu": (GPUDevice(0, "card0", 12.0, None, None, None),)}))
+
+    text = exporter.payloads["/metrics"][1].decode()
+    assert 'dashboard_gpu_load_percent{gpu="0",name="card0"} 12.0' in text
+    assert "dashboard_gpu_memory_used_bytes{" not in text
+    assert "dashboard_gpu_temperature_celsius{" not in text
+
+
+def test_history_covers_a_time_span_not_a_sample_count():
+    exporter = MetricsExporter("127.0.0.1:9101", history_seconds=10)
+    for tick in range(100):
+        exporter.update(Snapshot(1000.0 + tick * 0.5, {"cpu": 1.0}))
+
+    history = json.loads(exporter.payload("/history.json")[1])
+    assert history[0]["timestamp"] == 1039.5
+    assert history[-1]["timestamp"] == 1049.5
+
+
+def test_history_body_is_only_joined_again_after_new_samples():
+    exporter = MetricsExporter("127.0.0.1:9101")
+    assert exporter.payload("/history.json") is None
+
+    exporter.update(Snapshot(1000.0, {"cpu": 1.0}))
+    body = exporter.payload("/history.json")[1]
+    assert exporter.payload("/history.json")[1] is body
+
+    exporter.update(Snapshot(1001.0, {"cpu": 2.0}))
+    assert [record["cpu"] for record in json.loads(exporter.payload("/history.json")[1])] == [1.0, 2.0]
@@ -0,0 +1,34 @@
+import sys
+
+import pytest
+
+from history_storage import MetricsHistory
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="the history lock uses flock")
+
+
+def test_second_history_only_reads(tmp_path):
+    writer = MetricsHistory(tmp_path, flush_interval=60)
+    reader = MetricsHistory(tmp_path, flush_interval=60)
+    assert writer.start()
+    assert not reader.start()
+
+    writer.append(100.0, {"cpu": 10.0})
+    reader.append(101.0, {"cpu": 20.0})
+    writer.write_pending()
+    reader.write_pending()
+
+    records = reader.read_range(0, 200)
+    assert records["timestamp"].tolist() == [100.0]
+    assert records["cpu"].tolist() == [10.0]
+    reader.stop()
+    writer.stop()
+
+
+def test_lock_passes_on_after_stop(tmp_path):
+    first = MetricsHistory(tmp_path, flush_interval=60)
+    second = MetricsHistory(tmp_path, flush_interval=60)
+    assert first.start()
+    first.stop()
+    assert second.start()
+    second.stop()
@@ -0,0 +1,130 @@
+import os
+import pickle
+import struct
+import sys
+import threading
+import uuid
+from collections import OrderedDict
+
+import pytest
+
+from metrics_bus import RECORD, SHM_DIR, BusReader, BusWriter, dumps, loads
+from sampler import NetworkReading, Sampler, Snapshot
+
+linux_only = pytest.mark.skipif(
+    not sys.platform.startswith("linux") or not os.path.isdir(SHM_DIR), reason="the bus needs linux shared memory"
+)
+
+
+@pytest.fixture
+def bus():
+    writer = BusWriter(f"dashboard-test-{uuid.uuid4().hex[:8]}", ring_bytes=4096, state_bytes=1024)
+    reader = BusReader(writer.name)
+    yield writer, reader
+    reader.close()
+    writer.close()
+
+
+def test_snapshot_values_round_trip():
+    reading = NetworkReading(1.0, {"eth0": (1, 2)})
+    assert loads(dumps({"cpu": 12.5, "network": reading})) == {"cpu": 12.5, "network": reading}
+
+
+@pytest.mark.parametrize("value", [OrderedDict(a=1), threading.Event, Sampler])
+def test_unpickler_rejects_anything_but_snapshot_tuples(value):
+    with pytest.raises(pickle.UnpicklingError):
+        loads(pickle.dumps(value))
+
+
+def test_unpickler_rejects_unknown_modules():
+    with pytest.raises(pickle.UnpicklingError):
+        loads(pickle.dumps(os.stat_result((0,) * 10)))
+
+
+@linux_only
+def test_publish_and_drain(bus):
+    writer, reader = bus
+    for second in range(3):
+        writer.publish(Snapshot(100.0 + second, {"cpu": float(second)}))
+
+    snapshots = reader.drain()
+    assert [snapshot.timestamp for snapshot in snapshots] == [100.0, 101.0, 102.0]
+    assert snapshots[-1].values["cpu"] == 2.0
+    assert reader.drain() == []
+
+
+@linux_only
+def test_overwritten_snapshots_are_skipped(bus):
+    writer, reader = bus
+    reader.drain()
+    for second in range(200):
+        writer.publish(Snapshot(float(second), {"cpu": float(second)}))
+
+    snapshots = reader.drain()
+    assert snapshots[-1].timestamp == 199.0
+    assert len(snapshots) < 200
+    assert reader.skipped == 1
+
+
+@linux_only
+def test_seqlock_read_retries_when_the_sequence_moves(bus):
+    writer, reader = bus
+    calls = []
+
+    def copy():
+        calls.append(None)
+        if len(calls) == 1:
+            # a write lands while the viewer copies
+            writer.begin()
+            writer.end()
+        return len(calls)
+
+    assert reader.read(copy) == 2
+
+
+@linux_only
+def test_seqlock_read_waits_for_a_write_in_progress(bus):
+    writer, reader = bus
+    writer.begin()
+    finish = threading.Timer(0.05, writer.end)
+    finish.start()
+
+    sequences = []
+    reader.read(lambda: sequences.append(writer.sequence))
+    finish.join()
+    assert sequences and all(sequence % 2 == 0 for sequence in sequences)
+
+
+@linux_only
+def test_corrupt_record_is_dropped(bus):
+    writer, reader = bus
+    writer.publish(Snapshot(100.0, {"cpu": 1.0}))
+    garbage = b"\x80\x05not a pickle"
+    with writer._lock:
+        writer.begin()
+        writer.ring_write(writer.head, RECORD.pack(len(garbage), 101.0) + garbage)
+        writer.head += RECORD.size + len(garbage)
+        writer.end()
+    writer.publish(Snapshot(102.0, {"cpu": 3.0}))
+
+    snapshots = reader.drain()
+    assert [snapshot.timestamp for snapshot in snapshots] == [100.0, 102.0]
+    assert reader.corrupt == 1
+
+
+@linux_only
+def test_positions_are_written_while_the_sequence_is_odd(bus, monkeypatch):
+    writer, reader = bus
+    seen = []
+    write_header = writer.write_header
+
+    def recording_write_header():
+        write_header()
+        seen.append(struct.unpack_from("<QQ", reader.buf, 8))
+
+    monkeypatch.setattr(writer, "write_header", recording_write_header)
+    writer.publish(Snapshot(100.0, {"cpu": 1.0}))
+
+    (sequence, head), = seen
+    assert sequence % 2 == 1 and head == writer.head
+    assert struct.unpack_from("<Q", reader.buf, 8)[0] == sequence + 1
@@ -0,0 +1,9 @@
+from sampler import Sampler
+
+
+def test_gpu_timeout_is_the_same_after_set_interval():
+    sampler = Sampler(intervals={"gpu": 4.0}, procfs=False)
+    startup_timeout = sampler.gpu_poller.timeout
+
+    sampler.set_interval("gpu", 4.0, adaptive=True)
+    assert sampler.gpu_poller.timeout == startup_timeout == 8.0
@@ -0,0 +1,29 @@
+from timeseries import TimeSeriesStore
+
+
+def test_matrix_is_replaced_when_its_rows_are_renamed():
+    store = TimeSeriesStore(history_seconds=60)
+    matrix = store.matrix("disk.utilization", 2, labels=("sda", "sdb"))
+    matrix.append(1.0, [10.0, 20.0])
+
+    assert store.matrix("disk.utilization", 2, labels=("sda", "sdb")) is matrix
+    replaced = store.matrix("disk.utilization", 2, labels=("sda", "nvme0n1"))
+    assert replaced is not matrix
+    assert len(replaced) == 0
+    assert replaced.labels == ("sda", "nvme0n1")
+
+
+def test_since_only_returns_samples_appended_after_clear():
+    buffer = TimeSeriesStore(history_seconds=60).series("cpu")
+    for second in range(5):
+        buffer.append(float(second), float(second))
+    index = buffer.appended - 2
+
+    buffer.clear()
+    assert len(buffer.since(index)[0]) == 0
+
+    buffer.append(10.0, 50.0)
+    timestamps, values = buffer.since(index)
+    assert timestamps.tolist() == [10.0]
+    assert values.tolist() == [50.0]
+    assert len(buffer.since(buffer.appended + 3)[0]) == 0
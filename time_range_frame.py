@@ -0,0 +1,41 @@
+import customtkinter as ctk
+
+
+class TimeRangeFrame(ctk.CTkFrame):
+    # one slider for every chart, each move queues all of them on the redraw scheduler
+    # so they come back in a single coalesced pass instead of one render per chart
+    def __init__(self, parent, chart_frames, scheduler):
+        super().__init__(parent, fg_color="white")
+
+        self.chart_frames = chart_frames
+        self.scheduler = scheduler
+
+        self.time_range_label = ctk.CTkLabel(
+            self,
+            text="All Charts",
+            font=("Segoe UI", 18, "bold"),
+            text_color="darkblue",
+        )
+        self.time_range_label.pack(anchor="w", padx=10, pady=10)
+
+        self.time_range_text = ctk.StringVar(value="Last 1 minute(s)")
+        time_range_value = ctk.CTkLabel(self, textvariable=self.time_range_text, text_color="gray")
+        time_range_value.pack(anchor="w", padx=10)
+
+        self.time_slider = ctk.CTkSlider(self, from_=60, to=3600, number_of_steps=59, command=self.set_time_range)
+        self.time_slider.set(60)
+        self.time_slider.pack(fill="x", padx=10, pady=10)
+
+    def set_time_range(self, value):
+        time_range = int(float(value))
+        self.time_slider.set(time_range)  # when it comes from the config file rather than the slider
+        self.time_range_text.set(f"Last {time_range//60} minute(s)")
+
+        for frame in self.chart_frames:
+            if not frame.set_time_range(time_range):
+                continue
+            # keep the per-chart sliders in step, set() doesn't fire their command
+            slider = getattr(frame, "time_slider", None)
+            if slider is not None:
+                slider.set(time_range)
+            frame.request_redraw(draft=True)
@@ -0,0 +1,178 @@
+import math
+
+import numpy as np
+
+
+class RingBuffer:
+    def __init__(self, capacity, dtype=np.float32):
+        self.capacity = capacity
+
+        # every sample is written twice, at i and i + capacity, so the newest n samples
+        # are always one contiguous slice and can be handed out as a view without copying
+        self._values = np.zeros(capacity * 2, dtype=dtype)
+        self._timestamps = np.zeros(capacity * 2, dtype=np.float64)
+
+        self.head = 0  # next write position, always in [0, capacity)
+        self.count = 0
+        self.appended = 0  # samples ever appended, an absolute index readers can resume from
+
+    def __len__(self):
+        return self.count
+
+    def append(self, timestamp, value):
+        head = self.head
+        mirror = head + self.capacity
+        self._values[head] = value
+        self._values[mirror] = value
+        self._timestamps[head] = timestamp
+        self._timestamps[mirror] = timestamp
+
+        self.head = head + 1 if head + 1 < self.capacity else 0
+        if self.count < self.capacity:
+            self.count += 1
+        self.appended += 1
+
+    def update_latest(self, timestamp, value):
+        # overwrite the newest sample in place, used for buckets that are still filling up
+        if self.count == 0:
+            self.append(timestamp, value)
+            return
+        index = self.head - 1 if self.head > 0 else self.capacity - 1
+        mirror = index + self.capacity
+        self._values[index] = value
+        self._values[mirror] = value
+        self._timestamps[index] = timestamp
+        self._timestamps[mirror] = timestamp
+
+    def latest(self):
+        if self.count == 0:
+            return None
+        return float(self._values[self.head + self.capacity - 1])
+
+    def last(self, n):
+        # (timestamps, values) views of the newest n samples, oldest first
+        n = min(max(int(n), 0), self.count)
+        end = self.head + self.capacity
+        return self._timestamps[end - n:end], self._values[end - n:end]
+
+    def since(self, index):
+        # (timestamps, values) views of the samples appended from absolute index `index` on,
+        # as far back as the buffer still holds them. clamped to what is held, so an index
+        # from before clear() only gets the samples appended after it
+        return self.last(min(max(self.appended - index, 0), self.count))
+
+    def window(self, seconds, now=None):
+        # (timestamps, values) views of every sample from the last `seconds` seconds
+        timestamps, values = self.last(self.count)
+        if self.count == 0:
+            return timestamps, values
+        if now is None:
+            now = timestamps[-1]
+        start = np.searchsorted(timestamps, now - seconds, side="left")
+        return timestamps[start:], values[start:]
+
+    def clear(self):
+        # appended keeps counting, indexes readers hold stay valid and since() clamps them
+        self.head = 0
+        self.count = 0
+
+
+class RingMatrix:
+    # same mirrored layout as RingBuffer, but every sample is a column of `rows` values,
+    # e.g. one utilization value per cpu core. labels optionally names the rows
+    def __init__(self, rows, capacity, dtype=np.float32, labels=None):
+        self.rows = rows
+        self.labels = labels
+        self.capacity = capacity
+        self._values = np.zeros((rows, capacity * 2), dtype=dtype)
+        self._timestamps = np.zeros(capacity * 2, dtype=np.float64)
+
+        self.head = 0
+        self.count = 0
+        self.appended = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, timestamp, column):
+        head = self.head
+        mirror = head + self.capacity
+        self._values[:, head] = column
+        self._values[:, mirror] = column
+        self._timestamps[head] = timestamp
+        self._timestamps[mirror] = timestamp
+
+        self.head = head + 1 if head + 1 < self.capacity else 0
+        if self.count < self.capacity:
+            self.count += 1
+        self.appended += 1
+
+    def last(self, n):
+        # (timestamps, rows x n values) views of the newest n samples, oldest first
+        n = min(max(int(n), 0), self.count)
+        end = self.head + self.capacity
+        return self._timestamps[end - n:end], self._values[:, end - n:end]
+
+    def since(self, index):
+        # (timestamps, rows x n values) views of the samples appended from absolute index `index` on
+        return self.last(self.appended - index)
+
+    def window(self, seconds, now=None):
+        # (timestamps, rows x n values) views of every sample from the last `seconds` seconds
+        timestamps, values = self.last(self.count)
+        if self.count == 0:
+            return timestamps, values
+        if now is None:
+            now = timestamps[-1]
+        start = np.searchsorted(timestamps, now - seconds, side="left")
+        return timestamps[start:], values[:, start:]
+
+
+class TimeSeriesStore:
+    # shared history for every metric, keyed by series name e.g. "cpu" or "network.upload".
+    # buffers hold history_seconds at the metric's sampling interval, the part of the name
+    # before the first dot, so a 100 ms cpu series gets ten times the slots of a 1 s one
+    def __init__(self, history_seconds=3600, intervals=None):
+        self.history_seconds = history_seconds
+        self.intervals = dict(intervals or {})
+        self._series = {}
+
+        # scratch x positions, charts copy them on set_data so every series can reuse them
+        self._positions = np.zeros(0, dtype=np.float32)
+
+    def capacity_for(self, name):
+        interval = self.intervals.get(name.split(".", 1)[0], 1.0)
+        return math.ceil(self.history_seconds / interval)
+
+    def __contains__(self, name):
+        return name in self._series
+
+    def names(self):
+        return list(self._series)
+
+    def series(self, name, capacity=None):
+        buffer = self._series.get(name)
+        if buffer is None:
+            buffer = RingBuffer(capacity or self.capacity_for(name))
+            self._series[name] = buffer
+        return buffer
+
+    def append(self, name, timestamp, value):
+        self.series(name).append(timestamp, value)
+
+    def matrix(self, name, rows, capacity=None, labels=None):
+        # a new, empty matrix when the rows change, in number or in what they stand for
+        matrix = self._series.get(name)
+        if matrix is None or matrix.rows != rows or matrix.labels != labels:
+            matrix = RingMatrix(rows, capacity or self.capacity_for(name), labels=labels)
+            self._series[name] = matrix
+        return matrix
+
+    def positions_for(self, timestamps, time_range):
+        # x positions on the "seconds ago" axis from the real timestamps, newest sample at the right edge
+        if len(self._positions) < len(timestamps):
+            self._positions = np.zeros(len(timestamps), dtype=np.float32)
+        positions = self._positions[:len(timestamps)]
+        if len(timestamps):
+            np.subtract(timestamps, timestamps[-1] - time_range, out=positions, casting="unsafe")
+        return positions
@@ -0,0 +1,28 @@
+class WindowVisibility:
+    # tracks whether the dashboard window can be seen at all, so rendering can be
+    # suspended while it is minimized, withdrawn or fully covered by another window
+    def __init__(self, root):
+        self.root = root
+        self.mapped = True
+        self.obscured = False
+
+        root.bind("<Map>", self.on_map, add="+")
+        root.bind("<Unmap>", self.on_unmap, add="+")
+        # only reported by x11 window managers, other platforms just never set obscured
+        root.bind("<Visibility>", self.on_visibility, add="+")
+
+    @property
+    def visible(self):
+        return self.mapped and not self.obscured and self.root.state() not in ("iconic", "withdrawn")
+
+    def on_map(self, event):
+        if event.widget is self.root:
+            self.mapped = True
+
+    def on_unmap(self, event):
+        if event.widget is self.root:
+            self.mapped = False
+
+    def on_visibility(self, event):
+        if event.widget is self.root:
+            self.obscured = event.state == "VisibilityFullyObscured"